@@ -0,0 +1,221 @@
+# analytics.py - STREAMING ANALYTICS OVER DISCREPANCY HISTORY
+from collections import Counter, defaultdict
+from functools import lru_cache
+import argparse
+import json
+import time
+
+from offset_detector import conflict_deviations, time_to_minutes
+from leagues import display_league
+
+
+def iter_json_array(filename, chunk_size=1 << 20):
+    """
+    Yield the items of a top-level JSON array one at a time.
+    Only the current chunk and the record being decoded are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    separators = ' \t\r\n,'
+
+    with open(filename, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer:
+            return
+        if buffer[0] != '[':
+            raise ValueError(f"{filename} is not a JSON array")
+
+        pos = 1
+        eof = False
+        while True:
+            # Skip separators without copying the buffer
+            size = len(buffer)
+            while pos < size and buffer[pos] in separators:
+                pos += 1
+
+            if pos < size and buffer[pos] == ']':
+                return
+
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Record runs past the chunk: keep the tail and read more
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+
+
+@lru_cache(maxsize=65536)
+def _classify_times(times_items):
+    """
+    Kickoff hour and per-source blame for one set of source times.
+    The same handful of time patterns repeat across millions of records,
+    so this is cached (bounded) rather than recomputed per record.
+    """
+    times = dict(times_items)
+
+    # Kickoff hour of the most common time across sources
+    reference = time_to_minutes(Counter(times.values()).most_common(1)[0][0])
+    kickoff_hour = reference // 60 if reference is not None else None
+
+    # Majority-backed deviations carry full blame, two-source disputes half each
+    blame = tuple(
+        (source, offset, 1.0 if weight == 2 else 0.5)
+        for source, offset, partners, weight in conflict_deviations({'times': times})
+    )
+    return kickoff_hour, blame
+
+
+class DiscrepancyStats:
+    """
+    Running counters over conflict records. Memory depends on the number of
+    sources, leagues and distinct offsets, never on the number of records.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.appearances = Counter()  # source -> conflicts it took part in
+        self.blame = Counter()  # source -> share of conflicts it was wrong in
+        self.offsets = defaultdict(Counter)  # source -> offset minutes -> count
+        self.league_conflicts = Counter()
+        self.league_blame = defaultdict(Counter)  # league -> source -> blame
+        self.kickoff_hours = Counter()
+        self.detected_hours = Counter()
+        self.hour_blame = defaultdict(Counter)  # kickoff hour -> source -> blame
+
+    def add(self, record):
+        times = record.get('times') or {}
+        if len(times) < 2:
+            return
+
+        self.records += 1
+        # Older log entries carry each source's raw league string
+        league = display_league(record.get('league') or 'Unknown')
+        self.league_conflicts[league] += 1
+        for source in times:
+            self.appearances[source] += 1
+
+        kickoff_hour, blame = _classify_times(tuple(times.items()))
+        if kickoff_hour is not None:
+            self.kickoff_hours[kickoff_hour] += 1
+
+        timestamp = record.get('timestamp') or ''
+        if timestamp[11:13].isdigit():
+            self.detected_hours[int(timestamp[11:13])] += 1
+
+        for source, offset, share in blame:
+            self.blame[source] += share
+            self.offsets[source][offset] += 1
+            self.league_blame[league][source] += share
+            if kickoff_hour is not None:
+                self.hour_blame[kickoff_hour][source] += share
+
+    def disagreement_rates(self):
+        return {
+            source: self.blame[source] / count
+            for source, count in self.appearances.items()
+        }
+
+    def typical_offsets(self, source):
+        """(most common offset, median absolute offset) in minutes"""
+        counts = self.offsets.get(source)
+        if not counts:
+            return None, None
+
+        most_common = counts.most_common(1)[0][0]
+        half = sum(counts.values()) / 2
+        seen = 0
+        for offset in sorted(counts, key=abs):
+            seen += counts[offset]
+            if seen >= half:
+                return most_common, abs(offset)
+        return most_common, None
+
+    def summary(self, top=10):
+        rates = self.disagreement_rates()
+        return {
+            'records': self.records,
+            'sources': {
+                source: {
+                    'conflicts': self.appearances[source],
+                    'disagreement_rate': round(rates[source], 3),
+                    'most_common_offset': self.typical_offsets(source)[0],
+                    'median_abs_offset': self.typical_offsets(source)[1],
+                }
+                for source in sorted(rates, key=rates.get, reverse=True)
+            },
+            'top_leagues': [
+                {
+                    'league': league,
+                    'conflicts': count,
+                    'most_wrong': self.league_blame[league].most_common(1)[0][0] if self.league_blame[league] else None,
+                }
+                for league, count in self.league_conflicts.most_common(top)
+            ],
+            'kickoff_hours': {hour: self.kickoff_hours[hour] for hour in sorted(self.kickoff_hours)},
+            'detected_hours': {hour: self.detected_hours[hour] for hour in sorted(self.detected_hours)},
+            'most_wrong_by_hour': {
+                hour: self.hour_blame[hour].most_common(1)[0][0]
+                for hour in sorted(self.hour_blame) if self.hour_blame[hour]
+            },
+        }
+
+
+def print_report(summary, elapsed):
+    print("=" * 80)
+    print(f"📊 DISCREPANCY ANALYTICS - {summary['records']} conflicts ({elapsed:.2f}s)")
+    print("=" * 80)
+
+    print(f"\n{'SOURCE':<15} {'CONFLICTS':>10} {'WRONG RATE':>11} {'TYPICAL OFFSET':>15} {'MEDIAN |OFFSET|':>16}")
+    print("-" * 80)
+    for source, stats in summary['sources'].items():
+        offset = stats['most_common_offset']
+        median = stats['median_abs_offset']
+        print(f"{source:<15} {stats['conflicts']:>10} {stats['disagreement_rate']:>10.1%} "
+              f"{(f'{offset:+d} min' if offset is not None else '-'):>15} "
+              f"{(f'{median} min' if median is not None else '-'):>16}")
+
+    print(f"\n🏆 Top conflicting leagues:")
+    for i, league in enumerate(summary['top_leagues'], 1):
+        print(f"   {i:>2}. {league['league'][:45]:<45} {league['conflicts']:>6}  (most wrong: {league['most_wrong']})")
+
+    print(f"\n⏰ Conflicts by kickoff hour:")
+    peak = max(summary['kickoff_hours'].values(), default=0)
+    for hour, count in summary['kickoff_hours'].items():
+        bar = '█' * max(1, round(40 * count / peak)) if peak else ''
+        wrong = summary['most_wrong_by_hour'].get(hour, '-')
+        print(f"   {hour:02d}:00 {count:>7} {bar:<40} {wrong}")
+
+    print(f"\n🕵️ Conflicts by detection hour:")
+    for hour, count in summary['detected_hours'].items():
+        print(f"   {hour:02d}:00 {count:>7}")
+    print("=" * 80)
+
+
+def analyze(log_filename="discrepancy_log.json", top=10):
+    stats = DiscrepancyStats()
+    for record in iter_json_array(log_filename):
+        stats.add(record)
+    return stats.summary(top)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Which source is wrong most often, per league, per hour of day")
+    parser.add_argument('log', nargs='?', default="discrepancy_log.json", help="discrepancy log (JSON array)")
+    parser.add_argument('--top', type=int, default=10, help="number of leagues to list")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = analyze(args.log, args.top)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary, elapsed)
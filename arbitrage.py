@@ -0,0 +1,154 @@
+# arbitrage.py - 1X2 ODDS ARBITRAGE ACROSS BOOKMAKERS
+from array import array
+import re
+
+OUTCOMES = ('home', 'draw', 'away')
+
+ODDS_PATTERN = re.compile(r'^\d+\.\d+$')
+
+
+def parse_1x2(values):
+    """
+    Build {'home', 'draw', 'away'} odds from the first three price strings.
+    Returns None unless all three are valid decimal odds (> 1.0).
+    """
+    prices = []
+    for value in values:
+        value = value.strip()
+        if not ODDS_PATTERN.match(value):
+            continue
+        price = float(value)
+        if price <= 1.0:
+            return None
+        prices.append(price)
+        if len(prices) == 3:
+            return dict(zip(OUTCOMES, prices))
+    return None
+
+
+def join_best_odds(matches_by_source, normalize_team):
+    """
+    Join fixtures across sources and keep the best price per outcome.
+    Teams are matched order-independently: every fixture is oriented by sorted
+    team name and a source listing it the other way round has its home/away
+    prices swapped to line up.
+    Returns (fixtures, best, sources): best[outcome] is an array of the best
+    price per fixture and sources[outcome] the bookmaker offering it.
+    """
+    index = {}
+    fixtures = []
+    best = {outcome: array('d') for outcome in OUTCOMES}
+    sources = {outcome: [] for outcome in OUTCOMES}
+
+    for source, matches in matches_by_source.items():
+        for match in matches:
+            odds = match.get('odds')
+            if not odds:
+                continue
+
+            home_norm = normalize_team(match['home'])
+            away_norm = normalize_team(match['away'])
+            swapped = home_norm > away_norm
+            key = (away_norm, home_norm) if swapped else (home_norm, away_norm)
+            key += (match.get('date'),)
+
+            row = index.get(key)
+            if row is None:
+                row = index[key] = len(fixtures)
+                # Fixture names follow the sorted team order so outcomes line up
+                fixture = dict(match)
+                if swapped:
+                    fixture['home'], fixture['away'] = match['away'], match['home']
+                fixtures.append(fixture)
+                for outcome in OUTCOMES:
+                    best[outcome].append(0.0)
+                    sources[outcome].append(None)
+
+            prices = {'home': odds['away'], 'draw': odds['draw'], 'away': odds['home']} if swapped else odds
+
+            for outcome in OUTCOMES:
+                if prices[outcome] > best[outcome][row]:
+                    best[outcome][row] = prices[outcome]
+                    sources[outcome][row] = source
+
+    return fixtures, best, sources
+
+
+def find_arbitrage(matches_by_source, normalize_team, bankroll=100.0, min_margin=0.0):
+    """
+    Evaluate every joined fixture at once: implied probability sum of the
+    best prices, arbitrage margin and the stake split that returns the same
+    amount whatever the result.
+    """
+    fixtures, best, sources = join_best_odds(matches_by_source, normalize_team)
+    home, draw, away = best['home'], best['draw'], best['away']
+
+    # Column-wise over all fixtures; fixtures missing an outcome get implied 1.0+ and drop out
+    implied = [
+        (1 / h if h else 1.0) + (1 / d if d else 1.0) + (1 / a if a else 1.0)
+        for h, d, a in zip(home, draw, away)
+    ]
+
+    opportunities = []
+    for row, total in enumerate(implied):
+        margin = 1 - total
+        if margin <= min_margin:
+            continue
+
+        match = fixtures[row]
+        prices = {outcome: best[outcome][row] for outcome in OUTCOMES}
+        stakes = {outcome: round(bankroll * (1 / prices[outcome]) / total, 2) for outcome in OUTCOMES}
+        opportunities.append({
+            'home': match['home'],
+            'away': match['away'],
+            'league': match.get('league', 'Unknown'),
+            'date': match.get('date', 'Unknown'),
+            'margin': round(margin, 4),
+            'best': {outcome: (prices[outcome], sources[outcome][row]) for outcome in OUTCOMES},
+            'stakes': stakes,
+            'payout': round(bankroll / total, 2),
+        })
+
+    opportunities.sort(key=lambda o: o['margin'], reverse=True)
+    return opportunities
+
+
+def print_arbitrage(opportunities, bankroll=100.0, limit=10):
+    """Print the best opportunities"""
+    if not opportunities:
+        print("\n💤 No arbitrage opportunities this run")
+        return
+
+    print("\n" + "$" * 70)
+    print(f"💰 {len(opportunities)} ARBITRAGE OPPORTUNITIES (stake {bankroll:.0f})")
+    print("$" * 70)
+    for arb in opportunities[:limit]:
+        print(f"\n⚽ {arb['home']} vs {arb['away']} [{arb['date']}] - margin {arb['margin']:.2%}")
+        for outcome in OUTCOMES:
+            price, source = arb['best'][outcome]
+            print(f"   {outcome:<5} {price:>6.2f} @ {source:<12} stake {arb['stakes'][outcome]:>7.2f}")
+        print(f"   Payout: {arb['payout']:.2f}")
+    print("$" * 70)
+
+
+# Quick test
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(7)
+    bookies = ['Betika', 'Odibets', 'MozzartBet']
+    matches_by_source = {b: [] for b in bookies}
+    for n in range(5000):
+        fair = [random.uniform(0.2, 0.5) for _ in OUTCOMES]
+        total = sum(fair)
+        for b in bookies:
+            # Each bookmaker prices every outcome with its own -3%..+10% error
+            odds = {o: round(total / (p * random.uniform(0.97, 1.1)), 2) for o, p in zip(OUTCOMES, fair)}
+            matches_by_source[b].append({'home': f"Home {n}", 'away': f"Away {n}", 'date': '20/10', 'odds': odds})
+
+    started = time.perf_counter()
+    arbs = find_arbitrage(matches_by_source, str.lower)
+    elapsed = time.perf_counter() - started
+    print(f"📊 {sum(len(m) for m in matches_by_source.values())} listings evaluated in {elapsed * 1000:.1f} ms")
+    print_arbitrage(arbs, limit=2)
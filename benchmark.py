@@ -0,0 +1,170 @@
+# benchmark.py - CORE PATH BENCHMARKS AGAINST RECORDED BASELINES
+from contextlib import redirect_stdout
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+from main import normalize_team_name, normalize_match_key, compare_all_sources, save_discrepancies
+from scheduler import DynamicScheduler
+from workload import generate_fixtures, render_page_text, SOURCE_NAMES
+from betika_scraper import parse_betika_lines
+from mozzart_scraper import parse_mozzartbet_lines
+
+# Machine-specific, so it lives next to this file (whatever the cwd) and is gitignored
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+
+
+def stage_normalize(workload, discrepancies):
+    """normalize_team_name + normalize_match_key over every listing"""
+    count = 0
+    for matches in workload.values():
+        for match in matches:
+            normalize_team_name(match['home'])
+            normalize_match_key(match['home'], match['away'])
+            count += 1
+    return count
+
+
+def stage_compare(workload, discrepancies):
+    """compare_all_sources over the four sources it takes"""
+    lists = [workload.get(name, []) for name in SOURCE_NAMES]
+    discrepancies[:] = compare_all_sources(*lists)
+    return sum(len(matches) for matches in lists)
+
+
+def stage_parse(workload, discrepancies):
+    """Betika + MozzartBet body-text parse of their listings rendered as page text"""
+    if _page_texts.get('workload') is not workload:
+        _page_texts['workload'] = workload
+        _page_texts['betika'] = render_page_text(workload.get('Betika', []), 'betika')
+        _page_texts['mozzartbet'] = render_page_text(workload.get('MozzartBet', []), 'mozzartbet')
+    return len(parse_betika_lines(_page_texts['betika'])) + len(parse_mozzartbet_lines(_page_texts['mozzartbet']))
+
+
+# Rendered once per workload, so only the parse is timed (the first of `repeat` runs includes it)
+_page_texts = {}
+
+
+def stage_scheduler(workload, discrepancies):
+    """A fresh DynamicScheduler deciding every listing twice (first sight, then a repeat)"""
+    scheduler = DynamicScheduler()
+    count = 0
+    for _ in range(2):
+        for source, matches in workload.items():
+            for match in matches:
+                key = scheduler.generate_match_key(match['home'], match['away'], match['date'])
+                minutes = scheduler.parse_match_datetime(match['date'], match['kickoff'])
+                scheduler.should_scrape(
+                    key, minutes, match['league'], source,
+                    kickoff_at=scheduler.get_kickoff_datetime(match['date'], match['kickoff'])
+                )
+                count += 1
+    return count
+
+
+def stage_save(workload, discrepancies):
+    """save_discrepancies of the compare stage's output into an empty directory"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            save_discrepancies(discrepancies)
+        finally:
+            os.chdir(cwd)
+    return len(discrepancies)
+
+
+# Run in this order: save needs the compare stage's discrepancies
+STAGES = {
+    'normalize': stage_normalize,
+    'parse': stage_parse,
+    'compare': stage_compare,
+    'scheduler': stage_scheduler,
+    'save': stage_save,
+}
+
+
+def run_benchmarks(sizes, sources=4, repeat=3, seed=42):
+    """{'stage@size': items/second} (best of `repeat`)"""
+    results = {}
+    for size in sizes:
+        # One of the compared bookmakers on a constant +3h, as seen in the real logs
+        workload = generate_fixtures(size, sources=sources, seed=seed, offset_sources={'MozzartBet': 180})
+        discrepancies = []
+
+        for stage, func in STAGES.items():
+            best = None
+            for _ in range(repeat):
+                # The core path prints per match; measure the work, not the terminal
+                with redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    count = func(workload, discrepancies)
+                    elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+
+            results[f"{stage}@{size}"] = count / best if best > 0 else float('inf')
+            print(f"⏱️ {stage:<10} {size:>7} fixtures: {count:>8} items in {best * 1000:>9.1f} ms "
+                  f"({results[f'{stage}@{size}']:>12,.0f}/s)")
+    return results
+
+
+def check_baselines(results, baselines, tolerance):
+    """Names of the stages that fell more than `tolerance` below their baseline"""
+    regressions = []
+    for name, throughput in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"➖ {name:<20} no baseline")
+            continue
+
+        ratio = throughput / baseline
+        ok = ratio >= 1 - tolerance
+        print(f"{'✅' if ok else '❌'} {name:<20} {ratio:>6.0%} of baseline ({baseline:,.0f}/s)")
+        if not ok:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the core fetch-free path at several sizes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="fixture counts")
+    parser.add_argument('--sources', type=int, default=10, help="number of sources in the workload")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per stage (best is kept)")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline throughput file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed drop below baseline (0.25 = 25%%)")
+    parser.add_argument('--record', action='store_true', help="save this run as the new baseline")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"📊 BENCHMARK - {args.sources} sources, sizes {args.sizes}")
+    print("=" * 80)
+    results = run_benchmarks(args.sizes, args.sources, args.repeat)
+
+    if args.record:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                baselines = json.load(f)
+        baselines.update({name: round(value, 1) for name, value in results.items()})
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\n💾 Recorded baselines in {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️ No baselines yet, run with --record to create {args.baseline}")
+        sys.exit(0)
+
+    with open(args.baseline, 'r') as f:
+        baselines = json.load(f)
+
+    print("\n" + "-" * 80)
+    regressions = check_baselines(results, baselines, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} stages below baseline: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ All stages within baseline")
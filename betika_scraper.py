@@ -1,12 +1,34 @@
 # betika_scraper.py - WITH TIMEZONE CONVERSION
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from datetime import datetime, timedelta
-import time
 import re
 import json
 
+from browser import browser_session, dismiss_popup, get_profile, load_page, BudgetExceeded, FETCH_BUDGET_SECONDS
+from arbitrage import parse_1x2
+from result_cache import cached_fetch
+from page_tokenizer import PageGrammar, iter_rows
+from fixture_index import local_kickoff_date
+
+SOCCER_URL = "https://www.betika.com/en-ke/s/soccer"
+
+# "England • Premier League" (no prices on the line), then "21/02, 12:30" starts each fixture
+PAGE_GRAMMAR = PageGrammar(r'(\d{2}/\d{2}),?\s*(\d{2}:\d{2})', league=r'^(?!.*\d+\.\d+).*•')
+TRUNCATED = re.compile(r'\.\.\.$')
+
+# League pages for targeted fetches, keyed by canonical league ID (see leagues.py)
+LEAGUE_URLS = {
+    'ENG-PL': "https://www.betika.com/en-ke/s/soccer/england-premier-league",
+    'ENG-CH': "https://www.betika.com/en-ke/s/soccer/england-championship",
+    'ENG-FAC': "https://www.betika.com/en-ke/s/soccer/england-fa-cup",
+    'ESP-LL': "https://www.betika.com/en-ke/s/soccer/spain-laliga",
+    'GER-BL': "https://www.betika.com/en-ke/s/soccer/germany-bundesliga",
+    'ITA-SA': "https://www.betika.com/en-ke/s/soccer/italy-serie-a",
+    'FRA-L1': "https://www.betika.com/en-ke/s/soccer/france-ligue-1",
+    'UEFA-CL': "https://www.betika.com/en-ke/s/soccer/international-clubs-uefa-champions-league",
+    'UEFA-EL': "https://www.betika.com/en-ke/s/soccer/international-clubs-uefa-europa-league",
+}
+
 
 def convert_to_kenya_time(time_str):
     """
@@ -21,114 +43,106 @@ def convert_to_kenya_time(time_str):
         return time_str
 
 
-def fetch_betika_matches(headless=True):
+def iter_betika_matches(text):
+    """
+    Yield Betika matches from the body text (or its lines) as they are parsed:
+    league line (with "•"), "DD/MM, HH:MM" line, home, away, then 1X2 odds
+    """
+    for row in iter_rows(text, PAGE_GRAMMAR):
+        if not row['teams']:
+            continue
+
+        # Clean home team name (long names are cut off with dots)
+        home = TRUNCATED.sub('', row['teams'][0]).strip()
+        away = row['teams'][1] if len(row['teams']) > 1 else "Unknown"
+
+        # Validate we have real team names
+        if not home or home == "Unknown" or len(home) <= 2:
+            continue
+
+        gmt_date, gmt_time = row['header'].group(1, 2)  # Original time (likely UTC)
+
+        # CONVERT TO KENYA TIME (a late GMT kickoff is on the next day in Kenya)
+        kenya_time = convert_to_kenya_time(gmt_time)
+        date = local_kickoff_date(gmt_date, gmt_time, kenya_time)
+
+        print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{date}]")
+        yield {
+            'home': home,
+            'away': away if away != "Unknown" else home,
+            'kickoff': kenya_time,  # KENYA TIME
+            'original_gmt': gmt_time,  # For reference
+            'date': date,
+            'league': row['league'],
+            'bookie': 'Betika',
+            'odds': parse_1x2(row['odds'])
+        }
+
+
+def parse_betika_lines(lines):
+    """All matches in the body text (or its lines)"""
+    return list(iter_betika_matches(lines))
+
+
+def fetch_betika_matches(headless=True, fingerprint=None, leagues=None, budget_seconds=FETCH_BUDGET_SECONDS):
     """
     Fetch football matches from Betika Kenya with proper timezone conversion
+    If a SourceFingerprint is given and the page text is unchanged, the previous parse is reused
+    With `leagues`, only those leagues' pages are loaded (see LEAGUE_URLS)
+    Loads (retried in the same browser) and waits share one `budget_seconds` time budget
     """
 
     print("=" * 70)
     print("⚽ FETCHING BETIKA KENYA FOOTBALL MATCHES")
     print("=" * 70)
 
-    options = Options()
-    if headless:
-        options.add_argument("--headless")
-
-    options.add_argument("--width=1920")
-    options.add_argument("--height=1080")
-    options.set_preference("dom.webnotifications.enabled", False)
+    missing = sorted(league for league in leagues or () if league not in LEAGUE_URLS)
+    if missing:
+        print(f"⚠️ No league page configured for {missing}, loading full listing")
+    urls = [LEAGUE_URLS[league] for league in sorted(leagues)] if leagues and not missing else []
+    if urls:
+        # A partial page says nothing about the full listing's fingerprint
+        fingerprint = None
 
-    driver = webdriver.Firefox(options=options)
     matches = []
+    profile = get_profile("betika")
 
     try:
-        url = "https://www.betika.com/en-ke/s/soccer"
-        print(f"\n📡 Loading Betika football page...")
-        driver.get(url)
-        time.sleep(8)
-
-        # Handle any popups
-        try:
-            close_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Close')]")
-            close_btn.click()
-            print("✅ Closed popup")
-            time.sleep(2)
-        except:
-            pass
-
-        # Scroll to load matches
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)
-
-        # Get page text
-        page_text = driver.find_element(By.TAG_NAME, "body").text
-        lines = page_text.split('\n')
-
-        print(f"\n📦 Scanning for match containers...")
-
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-
-            # Look for league pattern (contains "•")
-            if '•' in line and not re.search(r'\d+\.\d+', line):
-                league = line.strip()
-
-                # Next line should have date/time
-                if i + 1 < len(lines):
-                    time_line = lines[i + 1].strip()
-                    time_match = re.search(r'(\d{2}/\d{2}),?\s*(\d{2}:\d{2})', time_line)
-
-                    if time_match:
-                        date = time_match.group(1)
-                        gmt_time = time_match.group(2)  # Original time (likely UTC)
-
-                        # CONVERT TO KENYA TIME
-                        kenya_time = convert_to_kenya_time(gmt_time)
-
-                        # Next line should have home team (may have dots)
-                        if i + 2 < len(lines):
-                            home_line = lines[i + 2].strip()
-
-                            # Clean home team name
-                            home = re.sub(r'\.\.\.$', '', home_line).strip()
-
-                            # Next line should have away team
-                            away = "Unknown"
-                            if i + 3 < len(lines):
-                                away_candidate = lines[i + 3].strip()
-                                # Check if it's a team name (not odds)
-                                if not re.match(r'^\d+\.\d+', away_candidate):
-                                    away = away_candidate
-
-                            # Validate we have real team names
-                            if home and home != "Unknown" and len(home) > 2:
-                                match = {
-                                    'home': home,
-                                    'away': away if away != "Unknown" else home,
-                                    'kickoff': kenya_time,  # KENYA TIME
-                                    'original_gmt': gmt_time,  # For reference
-                                    'date': date,
-                                    'league': league,
-                                    'bookie': 'Betika'
-                                }
-                                matches.append(match)
-                                print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{date}]")
-
-                                # Skip ahead 4 lines (league, date, home, away)
-                                i += 4
-                                continue
-
-            i += 1
+        with browser_session(headless, budget_seconds, profile=profile) as (driver, budget):
+            for n, url in enumerate(urls or [SOCCER_URL]):
+                print(f"\n📡 Loading Betika {'league' if urls else 'football'} page: {url}")
+                load_page(driver, url, budget)
+                budget.sleep(8 if n == 0 else 4)
+
+                # Handle any popups
+                if n == 0:
+                    dismiss_popup(driver, "//button[contains(text(), 'Close')]", "✅ Closed popup", profile, budget=budget)
+
+                # Scroll to load matches
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                budget.sleep(3)
+
+                # Get page text
+                page_text = driver.find_element(By.TAG_NAME, "body").text
+
+                if fingerprint is not None and fingerprint.check(page_text):
+                    print("♻️ Page unchanged since last run, reusing previous matches")
+                    return fingerprint.previous_matches()
+
+                print(f"\n📦 Scanning for match containers...")
+                matches.extend(parse_betika_lines(page_text))
 
         print(f"\n📊 Total matches found: {len(matches)}")
+        if fingerprint is not None:
+            fingerprint.update(matches)
         return matches
 
+    except BudgetExceeded as e:
+        print(f"⌛ Betika: {e}, giving up")
+        return []
     except Exception as e:
         print(f"❌ Error: {e}")
         return []
-    finally:
-        driver.quit()
 
 
 def save_matches(matches):
@@ -158,7 +172,7 @@ def quick_test():
     print("🔧 TESTING BETIKA FOOTBALL SCRAPER")
     print("-" * 50)
 
-    matches = fetch_betika_matches(headless=False)
+    matches = cached_fetch("Betika", lambda: fetch_betika_matches(headless=False))
 
     if matches:
         print(f"\n✅ Betika: {len(matches)} valid matches with kickoff times")
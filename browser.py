@@ -0,0 +1,375 @@
+# browser.py - SHARED FIREFOX DRIVER SETUP FOR ALL SCRAPERS
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.firefox.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import json
+import os
+import random
+import shutil
+import time
+import urllib.request
+
+# Default page load timeout (seconds) so one hung page can't block a fetch forever
+PAGE_LOAD_TIMEOUT = 60
+
+# Total wall-clock budget for one source fetch (browser start, loads, retries, settle waits).
+# Kept under isolation.DEFAULT_DEADLINE_SECONDS so a worker gives up before it gets killed.
+FETCH_BUDGET_SECONDS = 120
+
+# In-session retries of a page load: backoff doubles from this (seconds)
+LOAD_RETRY_BACKOFF_SECONDS = 2
+
+# Remote WebDriver endpoints (Selenium Grid hubs or standalone nodes), comma separated.
+# Unset = start Firefox locally. An environment variable so isolated workers inherit it.
+WEBDRIVER_NODES_ENV = "WEBDRIVER_NODES"
+
+# How long a node that refused a session or didn't answer /status is skipped
+NODE_COOLDOWN_SECONDS = 120
+NODE_STATUS_TIMEOUT = 3
+
+# Root for persistent per-source profiles (disk cache, cookies, dismissed popups).
+# Unset = a fresh temporary profile every fetch. Ignored for remote nodes.
+PROFILE_DIR_ENV = "BROWSER_PROFILE_DIR"
+
+# Forget a dismissed popup after this long, in case the site asks again
+CONSENT_TTL_DAYS = 7
+
+
+def build_firefox_options(headless=True):
+    """Options every scraper uses"""
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+
+    options.add_argument("--width=1920")
+    options.add_argument("--height=1080")
+    options.set_preference("dom.webnotifications.enabled", False)
+    return options
+
+
+class BrowserProfile:
+    """
+    A persistent Firefox profile for one source. Cache and cookies survive
+    between runs, and consent.json remembers which popups were already
+    dismissed so repeat loads skip the lookup and its wait.
+    """
+
+    def __init__(self, root, source, consent_ttl_days=CONSENT_TTL_DAYS):
+        self.path = os.path.abspath(os.path.join(root, source))
+        self.state_file = os.path.join(self.path, "consent.json")
+        self.consent_ttl = timedelta(days=consent_ttl_days)
+        os.makedirs(self.path, exist_ok=True)
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+
+    def apply(self, options):
+        """Point Firefox at this profile and keep its disk cache inside it"""
+        if self.path not in options.arguments:
+            # Retries reuse the same options object
+            options.add_argument("-profile")
+            options.add_argument(self.path)
+        options.set_preference("browser.cache.disk.enable", True)
+        options.set_preference("browser.cache.disk.parent_directory", self.path)
+
+        state = self._load_state()
+        state['last_used'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._save_state(state)
+
+    def dismissed(self, step):
+        """True if `step` was dismissed within the consent TTL"""
+        at = self._load_state().get('dismissed', {}).get(step)
+        if not at:
+            return False
+        return datetime.now() - datetime.strptime(at, '%Y-%m-%d %H:%M:%S') < self.consent_ttl
+
+    def mark(self, step):
+        state = self._load_state()
+        state.setdefault('dismissed', {})[step] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._save_state(state)
+
+
+def get_profile(source):
+    """Persistent profile for a source, or None when profiles are off or sessions run remotely"""
+    root = os.environ.get(PROFILE_DIR_ENV)
+    if not root or remote_nodes():
+        return None
+    return BrowserProfile(root, source)
+
+
+def dismiss_popup(driver, xpath, message, profile=None, step="popup", js_click=False, budget=None):
+    """
+    Click a consent/popup button if it's there. With a persistent profile a
+    successful click is remembered, so later runs skip it entirely. The wait
+    after the click comes out of the fetch's budget when one is given.
+    """
+    if profile is not None and profile.dismissed(step):
+        return False
+
+    try:
+        button = driver.find_element(By.XPATH, xpath)
+        if js_click:
+            driver.execute_script("arguments[0].click();", button)
+        else:
+            button.click()
+    except Exception:
+        return False
+
+    print(message)
+    if budget is not None:
+        budget.sleep(2)
+    else:
+        time.sleep(2)
+    if profile is not None:
+        profile.mark(step)
+    return True
+
+
+def _dir_size_mb(path):
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total / (1024 * 1024)
+
+
+def cleanup_profiles(root=None, max_cache_mb=256, max_age_days=14):
+    """
+    Drop the disk cache of profiles over `max_cache_mb` and whole profiles
+    unused for `max_age_days`. Call between runs, never while a fetch is running.
+    """
+    root = root or os.environ.get(PROFILE_DIR_ENV)
+    if not root or not os.path.isdir(root):
+        return 0
+
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for source in os.listdir(root):
+        path = os.path.join(root, source)
+        if not os.path.isdir(path):
+            continue
+
+        state_file = os.path.join(path, "consent.json")
+        last_used = os.path.getmtime(state_file) if os.path.exists(state_file) else os.path.getmtime(path)
+        if last_used < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+            print(f"🧹 Removed unused browser profile {source}")
+            removed += 1
+            continue
+
+        cache = os.path.join(path, "cache2")
+        if os.path.isdir(cache) and _dir_size_mb(cache) > max_cache_mb:
+            shutil.rmtree(cache, ignore_errors=True)
+            print(f"🧹 Cleared {source} browser cache (over {max_cache_mb} MB)")
+            removed += 1
+
+    return removed
+
+
+def remote_nodes():
+    """WebDriver endpoints from WEBDRIVER_NODES (empty list = run locally)"""
+    return [url.strip().rstrip('/') for url in os.environ.get(WEBDRIVER_NODES_ENV, '').split(',') if url.strip()]
+
+
+class RemoteNodePool:
+    """
+    Remote WebDriver endpoints with least-loaded dispatch and failover.
+    Load is read from each node's /status (busy slots / total slots), so it is
+    right even when every scraper runs in its own worker process.
+    """
+
+    def __init__(self, urls, status_timeout=NODE_STATUS_TIMEOUT, cooldown_seconds=NODE_COOLDOWN_SECONDS):
+        self.urls = list(urls)
+        self.status_timeout = status_timeout
+        self.cooldown_seconds = cooldown_seconds
+        self.down_until = {}
+
+    def node_load(self, url):
+        """Fraction of the node's session slots in use (1.0 = full)"""
+        with urllib.request.urlopen(f"{url}/status", timeout=self.status_timeout) as response:
+            status = json.load(response).get('value', {})
+
+        slots = [slot for node in status.get('nodes', []) for slot in node.get('slots', [])]
+        if not slots:
+            # Selenium 3 / plain drivers only say whether they are ready
+            return 0.0 if status.get('ready', True) else 1.0
+
+        busy = sum(1 for slot in slots if slot.get('session'))
+        return busy / len(slots)
+
+    def mark_down(self, url):
+        self.down_until[url] = time.monotonic() + self.cooldown_seconds
+
+    def ranked(self):
+        """Reachable nodes, least loaded first (ties in random order)"""
+        now = time.monotonic()
+        loads = []
+
+        for url in self.urls:
+            if self.down_until.get(url, 0) > now:
+                continue
+            try:
+                load = self.node_load(url)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ WebDriver node {url} unreachable: {e}")
+                self.mark_down(url)
+                continue
+            loads.append((load, random.random(), url))
+
+        loads.sort()
+        return [(url, load) for load, _, url in loads]
+
+    def create_driver(self, options):
+        """Start a session on the least-loaded node, failing over to the next one"""
+        for url, load in self.ranked():
+            try:
+                driver = webdriver.Remote(command_executor=url, options=options)
+                print(f"🖥️ Browser session on {url} (load {load:.0%})")
+                return driver
+            except Exception as e:
+                print(f"⚠️ Could not start a session on {url}: {e}")
+                self.mark_down(url)
+
+        raise RuntimeError(f"No WebDriver node available out of {len(self.urls)}")
+
+
+_pools = {}
+
+
+def get_node_pool(urls):
+    """One pool per node list, so cooldowns persist across fetches in a process"""
+    key = tuple(urls)
+    if key not in _pools:
+        _pools[key] = RemoteNodePool(urls)
+    return _pools[key]
+
+
+def create_firefox_driver(headless=True, page_load_timeout=PAGE_LOAD_TIMEOUT, options=None, nodes=None, profile=None):
+    """
+    Start Firefox with a page load timeout, on a remote node when WEBDRIVER_NODES
+    (or `nodes`) lists any, otherwise locally (in `profile` if given).
+    Call this inside the scraper's try block so a failed start still reaches finally.
+    """
+    options = options or build_firefox_options(headless)
+    nodes = remote_nodes() if nodes is None else nodes
+
+    if nodes:
+        driver = get_node_pool(nodes).create_driver(options)
+    else:
+        if profile is not None:
+            profile.apply(options)
+        driver = webdriver.Firefox(options=options)
+
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+
+class BudgetExceeded(Exception):
+    """A source's fetch budget ran out"""
+
+
+class FetchBudget:
+    """Wall-clock budget for one fetch; waits and page loads are cut to what is left"""
+
+    def __init__(self, seconds=FETCH_BUDGET_SECONDS, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.deadline = clock() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - self.clock())
+
+    def check(self):
+        if self.remaining() <= 0:
+            raise BudgetExceeded(f"fetch budget of {self.seconds}s used up")
+
+    def timeout(self, cap):
+        """A page load timeout (whole seconds, at least 1) that doesn't overrun the budget"""
+        self.check()
+        return max(1, min(cap, int(self.remaining())))
+
+    def sleep(self, seconds):
+        """time.sleep, cut short at the deadline (raises once nothing is left)"""
+        self.check()
+        time.sleep(min(seconds, self.remaining()))
+
+
+def load_page(driver, url, budget, attempts=3, page_load_timeout=PAGE_LOAD_TIMEOUT, reload=False):
+    """
+    driver.get(url) within the budget, retrying in the same browser session
+    (refresh, with doubling backoff) instead of starting a new Firefox.
+    reload=True refreshes a loaded page on the first attempt too. Raises the last load error
+    after `attempts`, or BudgetExceeded when time runs out first.
+    """
+    for attempt in range(attempts):
+        driver.set_page_load_timeout(budget.timeout(page_load_timeout))
+        try:
+            # A timed-out load has usually navigated already; refresh it rather than re-navigate
+            # (a repeated get of the same hash route doesn't reload the page)
+            if (reload or attempt > 0) and driver.current_url not in ('', 'about:blank'):
+                driver.refresh()
+            else:
+                driver.get(url)
+            return
+        except (TimeoutException, WebDriverException) as e:
+            print(f"⏱️ Load attempt {attempt + 1}/{attempts} failed ({type(e).__name__}), "
+                  f"{budget.remaining():.0f}s of budget left")
+            if attempt == attempts - 1:
+                raise
+            budget.sleep(LOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+
+@contextmanager
+def browser_session(headless=True, budget_seconds=FETCH_BUDGET_SECONDS, page_load_timeout=PAGE_LOAD_TIMEOUT,
+                    options=None, profile=None):
+    """
+    One Firefox for a whole fetch with a total time budget: yields (driver, budget)
+    and always quits the browser. Scrapers load pages with load_page() and wait
+    with budget.sleep(), so a fetch ends by its deadline however often it retries.
+    """
+    budget = FetchBudget(budget_seconds)
+    driver = None
+    try:
+        driver = create_firefox_driver(headless, page_load_timeout=budget.timeout(page_load_timeout),
+                                       options=options, profile=profile)
+        yield driver, budget
+    finally:
+        if driver:
+            driver.quit()
+
+
+# Quick test
+if __name__ == "__main__":
+    nodes = remote_nodes()
+    if not nodes:
+        print(f"❌ Set {WEBDRIVER_NODES_ENV}=http://localhost:4444,http://localhost:4445 to test remote nodes")
+        raise SystemExit(1)
+
+    pool = get_node_pool(nodes)
+    for url, load in pool.ranked():
+        print(f"📊 {url}: {load:.0%} busy")
+
+    # Hold several sessions at once to watch them spread across the nodes
+    drivers = []
+    try:
+        for n in range(len(nodes) * 2):
+            drivers.append(create_firefox_driver())
+            drivers[-1].get("about:blank")
+        print(f"✅ {len(drivers)} sessions started")
+    finally:
+        for driver in drivers:
+            driver.quit()
@@ -0,0 +1,147 @@
+# change_rate.py - DECAYED KICKOFF-CHANGE RATES PER SOURCE AND LEAGUE
+import json
+import os
+
+CHANGE_RATE_FILE = "change_rates.json"
+
+
+class ChangeRateEstimator:
+    """
+    Kickoff changes per listing-hour, per source and per league, with old
+    evidence fading out (half_life_hours). Keys with little history are
+    pulled towards the overall rate, so a new source starts out average.
+    """
+
+    def __init__(self, half_life_hours=72, prior_hours=200, max_gap_hours=6,
+                 min_factor=0.25, max_factor=4.0, refresh_minutes=10):
+        self.half_life_hours = half_life_hours
+        self.prior_hours = prior_hours
+        self.max_gap_hours = max_gap_hours
+        self.min_factor = min_factor
+        self.max_factor = max_factor
+
+        # 'all' / 'source:X' / 'league:Y' -> [changes, listing_hours, updated_at (epoch seconds)]
+        self.stats = {}
+        # 'source|league' -> epoch seconds of the last observation
+        self.last_seen = {}
+
+        # Interval factors are recomputed at most every refresh_minutes of observations
+        self.refresh_minutes = refresh_minutes
+        self.factors = {}
+        self.factors_at = None
+
+    def _decay(self, key, now):
+        """Age one key's counts to `now` and return them"""
+        entry = self.stats.setdefault(key, [0.0, 0.0, now])
+        hours = max(0.0, (now - entry[2]) / 3600)
+        if hours:
+            weight = 0.5 ** (hours / self.half_life_hours)
+            entry[0] *= weight
+            entry[1] *= weight
+            entry[2] = now
+        return entry
+
+    def observe(self, source, league, listing_hours, changes=0, now=None):
+        """Add `listing_hours` of exposure and `changes` seen during it (now: datetime)"""
+        if listing_hours <= 0 and not changes:
+            return
+        timestamp = now.timestamp() if now else 0.0
+        for key in ('all', f"source:{source}", f"league:{league}"):
+            entry = self._decay(key, timestamp)
+            entry[0] += changes
+            entry[1] += listing_hours
+
+        if self.factors_at is None or timestamp - self.factors_at >= self.refresh_minutes * 60:
+            self.factors = {}
+            self.factors_at = timestamp
+
+    def observe_listings(self, source, listings_by_league, changes_by_league, now):
+        """
+        One fetch of a source: {league: listing count} and {league: moves seen}.
+        Exposure is the listing count times the time since that league was last
+        fetched from this source (capped, so downtime doesn't count as quiet).
+        """
+        timestamp = now.timestamp()
+        for league, count in listings_by_league.items():
+            key = f"{source}|{league}"
+            last = self.last_seen.get(key)
+            self.last_seen[key] = timestamp
+            if last is None:
+                continue
+            gap_hours = min(max(0.0, (timestamp - last) / 3600), self.max_gap_hours)
+            self.observe(source, league, count * gap_hours, changes_by_league.get(league, 0), now)
+
+    def rate(self, key):
+        """Smoothed changes per listing-hour for a key (None with no history at all)"""
+        overall = self.stats.get('all')
+        if not overall or overall[1] <= 0 or overall[0] <= 0:
+            return None
+        base = overall[0] / overall[1]
+        changes, hours = self.stats.get(key, [0.0, 0.0, 0])[:2]
+        return (changes + self.prior_hours * base) / (hours + self.prior_hours)
+
+    def relative(self, source, league):
+        """How much more often than average this source/league moves kickoffs (1.0 = average)"""
+        overall = self.rate('all')
+        if not overall:
+            return 1.0
+        source_rate = self.rate(f"source:{source}") if source else overall
+        league_rate = self.rate(f"league:{league}") if league else overall
+        return (source_rate / overall) * (league_rate / overall)
+
+    def interval_factor(self, source, league):
+        """
+        Multiplier for the fixed interval. 1/sqrt(relative rate) is the split
+        of a fixed number of scrapes that minimizes total detection latency,
+        so busy sources/leagues get checked more and quiet ones less. This
+        only sets the shape; DynamicScheduler.plan_budget() scales the level
+        to its target_latency_minutes and scrape budget.
+        """
+        key = (source, league)
+        factor = self.factors.get(key)
+        if factor is None:
+            relative = self.relative(source, league)
+            factor = 1 / relative ** 0.5 if relative > 0 else self.max_factor
+            factor = self.factors[key] = min(self.max_factor, max(self.min_factor, factor))
+        return factor
+
+    def summary(self):
+        """{key: changes per listing-hour} for status output"""
+        return {key: round(self.rate(key), 4) for key in self.stats if self.rate(key) is not None}
+
+    def save(self, filename=CHANGE_RATE_FILE):
+        try:
+            with open(filename, 'w') as f:
+                json.dump({'stats': self.stats, 'last_seen': self.last_seen}, f)
+        except Exception as e:
+            print(f"⚠️ Could not save {filename}: {e}")
+
+    def load(self, filename=CHANGE_RATE_FILE):
+        if not os.path.exists(filename):
+            return
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+            self.stats = data.get('stats', {})
+            self.last_seen = data.get('last_seen', {})
+            self.factors = {}
+            self.factors_at = None
+        except Exception as e:
+            print(f"⚠️ Could not read {filename}: {e}")
+
+
+# Quick test
+if __name__ == "__main__":
+    from datetime import datetime, timedelta
+
+    estimator = ChangeRateEstimator()
+    now = datetime(2026, 1, 1)
+    for hour in range(48):
+        now += timedelta(hours=1)
+        estimator.observe_listings("Flashscore", {'ENG-PL': 10, 'TUR-SL': 10}, {}, now)
+        estimator.observe_listings("Betika", {'ENG-PL': 10, 'TUR-SL': 10}, {'TUR-SL': 1 if hour % 2 else 0}, now)
+
+    for source in ("Flashscore", "Betika"):
+        for league in ('ENG-PL', 'TUR-SL'):
+            print(f"📈 {source:<10} {league:<7} relative {estimator.relative(source, league):>5.2f} "
+                  f"-> interval x{estimator.interval_factor(source, league):.2f}")
@@ -0,0 +1,109 @@
+# circuit_breaker.py - PER-SOURCE CIRCUIT BREAKER IN FRONT OF FETCHES
+from datetime import datetime, timedelta
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    closed: every fetch goes through; `failure_threshold` failures in a row open it.
+    open: fetches are skipped (no browser, no worker) until the cooldown is over.
+    half_open: one probe fetch; success closes the circuit, failure re-opens it
+    with the cooldown doubled (up to max_cooldown_minutes).
+    """
+
+    def __init__(self, name, failure_threshold=3, cooldown_minutes=5, max_cooldown_minutes=120, clock=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_cooldown_minutes = cooldown_minutes
+        self.max_cooldown_minutes = max_cooldown_minutes
+        self.clock = clock or datetime.now
+
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown_minutes = cooldown_minutes
+        self.opened_at = None
+        self.retry_at = None
+
+        # Counters for the status endpoint
+        self.trips = 0
+        self.skipped = 0
+        self.probes = 0
+
+    def allow(self):
+        """Whether a fetch may run now (moves open -> half_open once the cooldown is over)"""
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN and self.clock() >= self.retry_at:
+            self.state = HALF_OPEN
+            self.probes += 1
+            print(f"🔌 {self.name}: circuit half-open, probing")
+            return True
+
+        if self.state == HALF_OPEN:
+            return True
+
+        self.skipped += 1
+        return False
+
+    def record_success(self):
+        if self.state != CLOSED:
+            print(f"✅ {self.name}: probe succeeded, circuit closed")
+        self.state = CLOSED
+        self.failures = 0
+        self.cooldown_minutes = self.base_cooldown_minutes
+        self.opened_at = None
+        self.retry_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN:
+            self.cooldown_minutes = min(self.cooldown_minutes * 2, self.max_cooldown_minutes)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self.trips += 1
+            self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+        self.retry_at = self.opened_at + timedelta(minutes=self.cooldown_minutes)
+        print(f"⛔ {self.name}: circuit open after {self.failures} failures, "
+              f"next probe at {self.retry_at.strftime('%H:%M:%S')}")
+
+    def status(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'cooldown_minutes': self.cooldown_minutes,
+            'opened_at': self.opened_at.strftime('%Y-%m-%d %H:%M:%S') if self.opened_at else None,
+            'retry_at': self.retry_at.strftime('%Y-%m-%d %H:%M:%S') if self.retry_at else None,
+            'trips': self.trips,
+            'skipped': self.skipped,
+            'probes': self.probes,
+        }
+
+
+# Quick test
+if __name__ == "__main__":
+    class Clock:
+        now = datetime(2026, 1, 1, 12, 0)
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    breaker = CircuitBreaker("MozzartBet", clock=clock)
+
+    for minute, ok in [(0, False), (1, False), (2, False), (3, None), (8, False), (12, None), (18, True), (19, True)]:
+        clock.now = datetime(2026, 1, 1, 12, minute)
+        if not breaker.allow():
+            print(f"   12:{minute:02d} skipped ({breaker.state})")
+            continue
+        breaker.record_success() if ok else breaker.record_failure()
+        print(f"   12:{minute:02d} fetch {'ok' if ok else 'failed'} -> {breaker.state}")
+
+    print(f"📊 {breaker.status()}")
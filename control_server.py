@@ -0,0 +1,80 @@
+# control_server.py - LOCAL HEALTH + CONTROL HTTP ENDPOINT
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import json
+import threading
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET  /health                -> monitor status, backoff state, queue depth
+    GET  /fixtures, /conflicts  -> latest fixture table / open conflicts (see query_api.py)
+    POST /scrape?source=Betika  -> queue a targeted refresh of one source
+    POST /scrape                -> queue a full refresh
+    """
+
+    # Set by start_control_server
+    daemon = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, indent=2).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_query(self, url):
+        status, etag, body = self.daemon.query_api.respond(url.path, url.query, self.headers.get('If-None-Match'))
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        # Clients may keep the body but must revalidate, which is a cheap 304 until the next run changes something
+        self.send_header('Cache-Control', 'no-cache')
+        if body is None:
+            self.end_headers()
+            return
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path
+        if path == '/health':
+            self._send_json(200, self.daemon.status())
+        elif self.daemon.query_api.handles(path):
+            self._send_query(url)
+        else:
+            self._send_json(404, {'error': f"unknown path {path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != '/scrape':
+            self._send_json(404, {'error': f"unknown path {url.path}"})
+            return
+
+        source = parse_qs(url.query).get('source', [None])[0]
+        try:
+            depth = self.daemon.request_scrape(source)
+        except KeyError:
+            self._send_json(400, {'error': f"unknown source {source}"})
+            return
+
+        self._send_json(202, {'queued': source or 'all', 'queue_depth': depth})
+
+    def log_message(self, format, *args):
+        # Keep the console for scraper output
+        pass
+
+
+def start_control_server(daemon, host="127.0.0.1", port=8765):
+    """Serve the control endpoint from a background thread"""
+    handler = type('BoundControlRequestHandler', (ControlRequestHandler,), {'daemon': daemon})
+    server = ThreadingHTTPServer((host, port), handler)
+
+    thread = threading.Thread(target=server.serve_forever, name="control-server", daemon=True)
+    thread.start()
+
+    print(f"🌐 Control endpoint listening on http://{host}:{port}")
+    return server
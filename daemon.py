@@ -0,0 +1,142 @@
+# daemon.py - DAEMON MODE WITH SIGNAL HANDLING AND LOCAL CONTROL ENDPOINT
+from datetime import datetime
+import queue
+import signal
+import time
+
+from main import KickoffMonitor, SOURCES
+from control_server import start_control_server
+
+# Queue item asking the loop to stop
+STOP = object()
+
+# Queue item asking for a refresh of every source
+ALL_SOURCES = None
+
+# Returned when the wait times out: the regular run, which may target only urgent leagues
+SCHEDULED = object()
+
+# Returned when SIGHUP asked for a reload: rebuild offset history, then refresh everything
+RELOAD = object()
+
+# How often the wait checks the flags signal handlers set
+SIGNAL_POLL_SECONDS = 1
+
+
+class MonitorDaemon:
+    """
+    Runs KickoffMonitor until SIGTERM/SIGINT.
+    SIGHUP reloads offset history and triggers an immediate full refresh;
+    the control endpoint can queue targeted "scrape source X now" runs.
+    """
+
+    def __init__(self, monitor=None, host="127.0.0.1", port=8765):
+        self.monitor = monitor or KickoffMonitor()
+        self.host = host
+        self.port = port
+        self.requests = queue.Queue()
+        self.running = False
+        self.reload_requested = False
+        self.next_run_at = None
+        self.server = None
+
+    def request_scrape(self, source=None):
+        """Queue a refresh of one source (or all). Returns the queue depth."""
+        if source is not None and source not in SOURCES:
+            raise KeyError(source)
+        self.requests.put(source)
+        return self.requests.qsize()
+
+    @property
+    def query_api(self):
+        return self.monitor.query_api
+
+    def status(self):
+        status = self.monitor.status()
+        status['queue_depth'] = self.requests.qsize()
+        status['next_run_at'] = self.next_run_at.strftime('%Y-%m-%d %H:%M:%S') if self.next_run_at else None
+        return status
+
+    # Signal handlers can interrupt the main thread anywhere (mid-detect(), holding the
+    # queue's lock), so they only set flags; the loop acts on them between runs
+
+    def _handle_stop(self, signum, frame):
+        print(f"\n👋 Received {signal.Signals(signum).name}, stopping after current run...")
+        self.running = False
+
+    def _handle_reload(self, signum, frame):
+        print("\n🔁 Received SIGHUP, reloading offset history and refreshing all sources...")
+        self.reload_requested = True
+
+    def _wait_for_request(self, timeout):
+        """Block until the next scheduled run, a queued request or a signal"""
+        deadline = time.monotonic() + max(0, timeout)
+        while True:
+            if not self.running:
+                return STOP
+            if self.reload_requested:
+                return RELOAD
+            try:
+                return self.requests.get(timeout=max(0, min(SIGNAL_POLL_SECONDS, deadline - time.monotonic())))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    return SCHEDULED
+
+    def _reload(self):
+        """Rebuild the offset window from the log (replacing it, so nothing is counted twice)"""
+        self.reload_requested = False
+        self.monitor.offset_detector.load_history()
+
+    def _run(self, sources=None, leagues=None, refresh=False):
+        try:
+            return self.monitor.run_once(sources, leagues, refresh)
+        except Exception as e:
+            self.monitor.publish_status()
+            print(f"\n❌ Error in daemon run: {e}")
+            print("⏳ Retrying in 5 minutes...")
+            return 5
+
+    def serve_forever(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        self.server = start_control_server(self, self.host, self.port)
+        self.running = True
+
+        print(f"📅 Daemon started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        next_wait = self._run()
+        deadline = time.monotonic() + next_wait * 60
+        self.next_run_at = datetime.fromtimestamp(time.time() + next_wait * 60)
+        print(f"\n⏳ Dynamic scheduling: Next check in {next_wait:.1f} minutes")
+
+        while self.running:
+            request = self._wait_for_request(deadline - time.monotonic())
+            if request is STOP or not self.running:
+                break
+
+            if request is RELOAD:
+                self._reload()
+                request = ALL_SOURCES
+
+            if request is SCHEDULED or request is ALL_SOURCES:
+                # A requested full refresh (SIGHUP, POST /scrape) always scrapes live
+                leagues = self.monitor.next_leagues if request is SCHEDULED else None
+                next_wait = self._run(leagues=leagues, refresh=request is ALL_SOURCES)
+                deadline = time.monotonic() + next_wait * 60
+                self.next_run_at = datetime.fromtimestamp(time.time() + next_wait * 60)
+                print(f"\n⏳ Dynamic scheduling: Next check in {next_wait:.1f} minutes")
+            else:
+                # Targeted refresh keeps the regular schedule
+                print(f"\n🎯 Targeted refresh requested for {request}")
+                self._run([request], refresh=True)
+
+        self.server.shutdown()
+        print("👋 Daemon stopped")
+
+
+def run_daemon(host="127.0.0.1", port=8765, profile=False, scrape_budget_per_hour=None, target_latency_minutes=None):
+    monitor = KickoffMonitor(profile=profile, scrape_budget_per_hour=scrape_budget_per_hour,
+                             target_latency_minutes=target_latency_minutes)
+    MonitorDaemon(monitor, host=host, port=port).serve_forever()
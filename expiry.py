@@ -0,0 +1,127 @@
+# expiry.py - TIME-BUCKET WHEEL FOR EVICTING STALE MATCH STATE
+from datetime import datetime, timedelta
+
+
+class ExpiryWheel:
+    """
+    Keys grouped into fixed-width time buckets by expiry time.
+    Adding, re-scheduling and removing a key is O(1); expire() only walks the
+    buckets that became due since the last sweep, so each key is touched once
+    on the way out and a run costs amortized O(1) per key.
+    """
+
+    def __init__(self, bucket_minutes=5):
+        self.bucket_seconds = bucket_minutes * 60
+        self.buckets = {}  # bucket index -> set of keys
+        self.expires = {}  # key -> bucket index
+        self.cursor = None  # lowest bucket index not swept yet
+
+    def _bucket(self, when):
+        return int(when.timestamp() // self.bucket_seconds)
+
+    def add(self, key, expire_at):
+        """Schedule (or re-schedule) a key to expire at a datetime"""
+        bucket = self._bucket(expire_at)
+        if self.cursor is not None and bucket < self.cursor:
+            # Already due: park it in the next bucket to be swept
+            bucket = self.cursor
+
+        old = self.expires.get(key)
+        if old == bucket:
+            return
+        if old is not None:
+            self._remove_from_bucket(key, old)
+
+        self.expires[key] = bucket
+        self.buckets.setdefault(bucket, set()).add(key)
+        if self.cursor is None:
+            self.cursor = bucket
+
+    def discard(self, key):
+        """Forget a key without expiring it"""
+        bucket = self.expires.pop(key, None)
+        if bucket is not None:
+            self._remove_from_bucket(key, bucket)
+
+    def _remove_from_bucket(self, key, bucket):
+        keys = self.buckets.get(bucket)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.buckets[bucket]
+
+    def expire(self, now=None):
+        """Remove and return every key whose expiry time has passed"""
+        now_bucket = self._bucket(now or datetime.now())
+        if self.cursor is None or self.cursor >= now_bucket:
+            return []
+
+        # After a long sleep, jumping through the occupied buckets is cheaper
+        # than stepping through every empty one
+        if now_bucket - self.cursor > len(self.buckets):
+            due = sorted(b for b in self.buckets if b < now_bucket)
+        else:
+            due = [b for b in range(self.cursor, now_bucket) if b in self.buckets]
+
+        expired = []
+        for bucket in due:
+            keys = self.buckets.pop(bucket)
+            for key in keys:
+                del self.expires[key]
+            expired.extend(keys)
+
+        self.cursor = now_bucket
+        return expired
+
+    def __contains__(self, key):
+        return key in self.expires
+
+    def __len__(self):
+        return len(self.expires)
+
+
+# Quick test - simulate a month of fixtures through the scheduler
+if __name__ == "__main__":
+    import random
+    from scheduler import DynamicScheduler
+
+    print("\n📊 Simulating 30 days of fixtures (200 new per day)...")
+
+    clock = {'now': datetime(2026, 3, 1, 6, 0)}
+    scheduler = DynamicScheduler(clock=lambda: clock['now'])
+    alerted_conflicts = ExpiryWheel()
+
+    fixtures = []
+    peak = 0
+    for day in range(30):
+        start = clock['now'].replace(hour=6, minute=0)
+        # Listings show today's and tomorrow's fixtures
+        for n in range(200):
+            kickoff = start + timedelta(days=1, hours=random.randint(6, 17), minutes=random.choice([0, 15, 30, 45]))
+            fixtures.append((f"Team{day}_{n}", f"Rival{day}_{n}", kickoff))
+
+        # One run every 15 minutes from 06:00 to 23:45
+        for step in range(72):
+            clock['now'] = start + timedelta(minutes=15 * step)
+            now = clock['now']
+            fixtures = [f for f in fixtures if f[2] + timedelta(hours=2) > now]
+
+            for home, away, kickoff in fixtures:
+                key = scheduler.generate_match_key(home, away, kickoff.strftime('%d/%m'))
+                minutes_until = max(0, (kickoff - now).total_seconds() / 60)
+                scheduler.should_scrape(key, minutes_until, "Premier League", "Betika", kickoff_at=kickoff)
+                if random.random() < 0.01:
+                    alerted_conflicts.add(f"{key}_{kickoff:%H:%M}", kickoff + timedelta(minutes=scheduler.grace_minutes))
+
+            scheduler.evict_expired()
+            alerted_conflicts.expire(now)
+            peak = max(peak, len(scheduler.last_scrape))
+
+        clock['now'] = start + timedelta(days=1)
+
+    print(f"   last_scrape entries now: {len(scheduler.last_scrape)} (peak {peak})")
+    print(f"   alerted_conflicts entries now: {len(alerted_conflicts)}")
+    # Only today's and tomorrow's fixtures (~400) should ever be held
+    assert peak < 600, "last_scrape grew without bound"
+    assert len(alerted_conflicts) < 600, "alerted_conflicts grew without bound"
+    print("✅ Memory stays bounded over a month of fixtures")
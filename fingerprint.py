@@ -0,0 +1,56 @@
+# fingerprint.py - SKIP RE-PARSING SOURCES WHOSE CONTENT HASN'T CHANGED
+import hashlib
+
+
+def content_fingerprint(content):
+    """Short stable hash of extracted page content"""
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SourceFingerprint:
+    """
+    Fingerprint of a source's last raw content plus the matches parsed from it.
+    Scrapers call check() on the raw content before parsing and update() after;
+    `unchanged` tells the comparer the previous parse was reused.
+    """
+
+    def __init__(self):
+        self.digest = None
+        self.matches = None
+        self.unchanged = False
+        self._pending = None
+
+    def check(self, content):
+        """True if the content matches the last run (previous matches can be reused)"""
+        self._pending = content_fingerprint(content)
+        self.unchanged = self._pending == self.digest and self.matches is not None
+        return self.unchanged
+
+    def update(self, matches):
+        """
+        Remember the matches parsed from the content passed to check(). An empty
+        parse (skeleton page, nothing rendered yet) is never remembered, so the
+        same content is parsed again instead of short-circuiting a retry.
+        """
+        if not matches:
+            self.digest = self.matches = None
+            return
+        self.digest = self._pending
+        self.matches = matches
+
+    def previous_matches(self):
+        return [dict(m) for m in self.matches]
+
+    def merge(self, other):
+        """Copy back state that was updated in a worker process"""
+        if other is not self:
+            self.__dict__.update(other.__dict__)
+
+
+def fetch_with_fingerprint(scraper_func, fingerprint):
+    """
+    Run a scraper with its fingerprint and return both, so the updated
+    fingerprint survives the trip back from an isolated worker
+    """
+    matches = scraper_func(fingerprint=fingerprint)
+    return matches, fingerprint
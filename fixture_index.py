@@ -0,0 +1,294 @@
+# fixture_index.py - MULTI-MAP FIXTURE INDEX AND CROSS-SOURCE JOIN
+from contextlib import contextmanager
+from datetime import date, timedelta
+import gc
+import re
+
+from offset_detector import time_to_minutes
+
+# Listings of the same pair further apart than this are different fixtures
+# (wide enough for the +/-3h timezone offsets the offset detector has to see)
+DEFAULT_JOIN_WINDOW_MINUTES = 720
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+@contextmanager
+def _gc_paused():
+    """
+    Building rows for a big listing allocates enough small tuples/lists to set
+    off repeated full collections over the whole heap (4x slower at 100k
+    fixtures). Nothing here creates reference cycles, so pause collection.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def resolve_date(date_str, today=None):
+    """
+    'DD/MM' as a date in whichever year puts it nearest today (31/12 read on
+    01/01 is last year's, 29/02 only exists in leap years); None if it can't be parsed
+    """
+    today = today or date.today()
+    try:
+        day, month = map(int, date_str.split('/')[:2])
+    except (AttributeError, ValueError):
+        return None
+    candidates = []
+    for year in (today.year - 1, today.year, today.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:
+            continue
+    return min(candidates, key=lambda d: abs(d - today)) if candidates else None
+
+
+def day_ordinal(date_str, today=None):
+    """'DD/MM' as a day number (None if it can't be parsed)"""
+    resolved = resolve_date(date_str, today)
+    return resolved.toordinal() if resolved else None
+
+
+def roll_date(date_str, days=1, today=None):
+    """'DD/MM' moved by `days` (unchanged if it can't be parsed)"""
+    resolved = resolve_date(date_str, today)
+    return (resolved + timedelta(days=days)).strftime('%d/%m') if resolved else date_str
+
+
+def local_kickoff_date(date_str, gmt_time, local_time, today=None):
+    """
+    The date of a kickoff after the GMT -> local (+3h) shift: a 22:30 GMT
+    kickoff on 20/10 is 01:30 on 21/10 in Kenya
+    """
+    gmt = time_to_minutes(re.sub(r'[^0-9:]', '', gmt_time or ''))
+    local = time_to_minutes(local_time)
+    if gmt is not None and local is not None and local < gmt:
+        return roll_date(date_str, today=today)
+    return date_str
+
+
+def weekday_date(name, today=None):
+    """
+    'DD/MM' of the next day (today included) called `name` ('Thu', 'Today',
+    'Tomorrow'); today's date if the name isn't a day
+    """
+    today = today or date.today()
+    name = (name or '').strip().lower()
+    if name.startswith('tom'):
+        ahead = 1
+    elif name[:3] in WEEKDAYS:
+        ahead = (WEEKDAYS.index(name[:3]) - today.weekday()) % 7
+    else:
+        ahead = 0
+    return (today + timedelta(days=ahead)).strftime('%d/%m')
+
+
+class FixtureIndex:
+    """
+    One source's fixtures keyed by (team pair, kickoff day). Nothing is
+    overwritten: a rematch or two sides that normalize to the same pair keep
+    every row, each bucket sorted by kickoff.
+    """
+
+    def __init__(self, matches, key_func, today=None):
+        self.buckets = {}
+        self.pair_days = {}
+        self.rows = 0
+
+        with _gc_paused():
+            self._build(matches, key_func, today or date.today())
+
+    def _build(self, matches, key_func, today):
+        # A listing only has a few distinct dates and kickoffs, parse each once
+        days = {}
+        kickoffs = {}
+
+        for match in matches:
+            pair = key_func(match['home'], match['away'])
+            date_str = match.get('date')
+            if date_str not in days:
+                days[date_str] = day_ordinal(date_str, today)
+            day = days[date_str]
+            kickoff = match.get('kickoff')
+            if kickoff not in kickoffs:
+                kickoffs[kickoff] = time_to_minutes(kickoff) or 0
+            at = (day or 0) * 1440 + kickoffs[kickoff]
+
+            bucket = self.buckets.get((pair, day))
+            if bucket is None:
+                bucket = self.buckets[(pair, day)] = []
+                self.pair_days.setdefault(pair, []).append(day)
+            bucket.append((at, match))
+            self.rows += 1
+
+        for bucket in self.buckets.values():
+            if len(bucket) > 1:
+                bucket.sort(key=lambda row: row[0])
+
+    def lookup(self, pair, day=None):
+        """Matches for a pair, on one day or on every day"""
+        days = [day] if day is not None else self.pair_days.get(pair, [])
+        return [match for d in days for at, match in self.buckets.get((pair, d), [])]
+
+    def pairs(self):
+        """(pair, [(at, match), ...]) with rows sorted by kickoff across days"""
+        for pair, days in self.pair_days.items():
+            if len(days) == 1:
+                yield pair, self.buckets[(pair, days[0])]
+            else:
+                yield pair, sorted(
+                    (row for day in days for row in self.buckets[(pair, day)]),
+                    key=lambda row: row[0]
+                )
+
+    def __len__(self):
+        return self.rows
+
+
+def align(reference, other):
+    """
+    Order-preserving assignment of each `other` kickoff to a distinct
+    `reference` slot with the smallest total distance (len(other) <= len(reference))
+    """
+    m, n = len(other), len(reference)
+    inf = float('inf')
+    cost = [[0.0] * (n + 1)] + [[inf] * (n + 1) for _ in range(m)]
+
+    for i in range(1, m + 1):
+        for j in range(i, n + 1):
+            cost[i][j] = min(cost[i][j - 1], cost[i - 1][j - 1] + abs(other[i - 1] - reference[j - 1]))
+
+    slots = [None] * m
+    i, j = m, n
+    while i > 0:
+        if j > i and cost[i][j] == cost[i][j - 1]:
+            j -= 1
+        else:
+            slots[i - 1] = j - 1
+            i -= 1
+            j -= 1
+    return slots
+
+
+def _join_pair(lists, join_window):
+    """Split one pair's listings (one sorted row list per source) into fixtures"""
+    # Common case: every source lists the pair once
+    if max(len(rows) for source, rows in lists) == 1:
+        first = min(rows[0][0] for source, rows in lists)
+        cluster = []
+        rest = []
+        for source, rows in lists:
+            at, match = rows[0]
+            # Sources can date a fixture a day apart around midnight (GMT dates, listings
+            # stamped with today); a pair listed once each a day apart is still one fixture
+            if at - first > join_window and abs(at - 1440 - first) <= join_window:
+                at -= 1440
+            if at - first <= join_window:
+                cluster.append((source, at, match))
+            else:
+                rest.append([(source, at, match)])
+        return [cluster] + rest
+
+    # Duplicates: the source with most listings sets the fixtures, the others line up in kickoff order
+    ref_source, ref_rows = max(lists, key=lambda item: len(item[1]))
+    clusters = [[(ref_source, at, match)] for at, match in ref_rows]
+    reference = [at for at, match in ref_rows]
+    leftovers = []
+
+    for source, rows in lists:
+        if source == ref_source:
+            continue
+        slots = align(reference, [at for at, match in rows])
+        for (at, match), slot in zip(rows, slots):
+            if abs(at - reference[slot]) <= join_window:
+                clusters[slot].append((source, at, match))
+            else:
+                leftovers.append([(source, at, match)])
+
+    return clusters + leftovers
+
+
+def join_fixtures(indexes, join_window_minutes=DEFAULT_JOIN_WINDOW_MINUTES):
+    """
+    Pair fixtures across sources. `indexes` is {source: FixtureIndex} in display
+    order; returns clusters of (source, at, match), one per real-world fixture,
+    each listing its sources in that order. Linear in rows apart from the
+    (rare) pairs a source lists more than once.
+    """
+    order = {source: n for n, source in enumerate(indexes)}
+    by_pair = {}
+    with _gc_paused():
+        for source, index in indexes.items():
+            for pair, rows in index.pairs():
+                by_pair.setdefault(pair, []).append((source, rows))
+
+    with _gc_paused():
+        return _join(by_pair, order, join_window_minutes)
+
+
+def _join(by_pair, order, join_window_minutes):
+    clusters = []
+    for pair, lists in by_pair.items():
+        if len(lists) == 1 and len(lists[0][1]) == 1:
+            # Listed by one source only
+            source, rows = lists[0]
+            clusters.append((pair, [(source, rows[0][0], rows[0][1])]))
+            continue
+
+        for cluster in _join_pair(lists, join_window_minutes):
+            cluster.sort(key=lambda member: order[member[0]])
+            clusters.append((pair, cluster))
+    return clusters
+
+
+# Quick test
+if __name__ == "__main__":
+    import time
+
+    from workload import generate_fixtures
+
+    key = lambda home, away: '-'.join(sorted([home.lower(), away.lower()]))
+    rows = lambda source, *times: [{'home': 'Arsenal', 'away': 'Chelsea', 'kickoff': t, 'date': d} for d, t in times]
+
+    # Men's and women's sides on the same day, one source 3h ahead, plus a rematch tomorrow
+    indexes = {
+        'A': FixtureIndex(rows('A', ('20/10', '15:00'), ('20/10', '19:00'), ('21/10', '15:00')), key),
+        'B': FixtureIndex(rows('B', ('20/10', '18:00'), ('20/10', '22:00')), key),
+        'C': FixtureIndex(rows('C', ('20/10', '19:00')), key),
+    }
+    for pair, cluster in join_fixtures(indexes):
+        print(f"⚽ {pair}: " + ', '.join(f"{s} {m['date']} {m['kickoff']}" for s, at, m in cluster))
+
+    # One source dates the fixture a day earlier: still one fixture, 3h apart
+    indexes = {'A': FixtureIndex(rows('A', ('21/10', '18:00')), key), 'B': FixtureIndex(rows('B', ('20/10', '21:00')), key)}
+    [(pair, cluster)] = join_fixtures(indexes)
+    assert [at for s, at, m in cluster] == [cluster[0][1], cluster[0][1] + 180], cluster
+    print("✅ " + ', '.join(f"{s} {m['date']} {m['kickoff']}" for s, at, m in cluster) + " joined a day apart")
+
+    today = date(2026, 10, 19)  # a Monday
+    assert weekday_date('Thu', today) == '22/10' and weekday_date('Mon', today) == '19/10'
+    assert local_kickoff_date('31/12', '22:30', '01:30') == '01/01' and local_kickoff_date('20/10', '12:00', '15:00') == '20/10'
+    print("✅ weekday headers and post-midnight local kickoffs get the right date")
+
+    new_year = date(2027, 1, 1)
+    assert day_ordinal('01/01', new_year) - day_ordinal('31/12', new_year) == 1
+    assert day_ordinal('31/12', date(2026, 12, 31)) - day_ordinal('01/01', date(2026, 12, 31)) == -1
+    assert roll_date('28/02', today=date(2027, 3, 1)) == '01/03' and roll_date('29/02', today=date(2028, 2, 1)) == '01/03'
+    assert resolve_date('29/02', date(2027, 3, 1)) == date(2028, 2, 29) and day_ordinal('32/01') is None
+    indexes = {'A': FixtureIndex(rows('A', ('01/01', '00:30')), key, new_year),
+               'B': FixtureIndex(rows('B', ('31/12', '21:30')), key, new_year)}
+    [(pair, cluster)] = join_fixtures(indexes)
+    assert len(cluster) == 2 and cluster[0][1] - cluster[1][1] == 180, cluster
+    print("✅ dates resolve to the year nearest today: New Year and 29/02 join and roll")
+
+    workload = generate_fixtures(100000, sources=4)
+    started = time.perf_counter()
+    built = {source: FixtureIndex(matches, key) for source, matches in workload.items()}
+    joined = join_fixtures(built)
+    elapsed = time.perf_counter() - started
+    print(f"📊 {sum(len(i) for i in built.values())} rows -> {len(joined)} fixtures in {elapsed * 1000:.0f} ms")
@@ -1,12 +1,27 @@
 # flashscore_scraper.py - WITH TIMEZONE CONVERSION
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from datetime import datetime, timedelta
-import time
 import re
 import json
 
+from browser import browser_session, dismiss_popup, get_profile, load_page, BudgetExceeded, FETCH_BUDGET_SECONDS
+from leagues import league_name
+from result_cache import cached_fetch
+from fixture_index import local_kickoff_date
+
+# League fixture pages for targeted fetches, keyed by canonical league ID (see leagues.py)
+LEAGUE_URLS = {
+    'ENG-PL': "https://www.flashscore.co.ke/football/england/premier-league/fixtures/",
+    'ENG-CH': "https://www.flashscore.co.ke/football/england/championship/fixtures/",
+    'ENG-FAC': "https://www.flashscore.co.ke/football/england/fa-cup/fixtures/",
+    'ESP-LL': "https://www.flashscore.co.ke/football/spain/laliga/fixtures/",
+    'GER-BL': "https://www.flashscore.co.ke/football/germany/bundesliga/fixtures/",
+    'ITA-SA': "https://www.flashscore.co.ke/football/italy/serie-a/fixtures/",
+    'FRA-L1': "https://www.flashscore.co.ke/football/france/ligue-1/fixtures/",
+    'UEFA-CL': "https://www.flashscore.co.ke/football/europe/champions-league/fixtures/",
+    'UEFA-EL': "https://www.flashscore.co.ke/football/europe/europa-league/fixtures/",
+}
+
 
 def convert_to_kenya_time(time_str):
     """
@@ -23,129 +38,175 @@ def convert_to_kenya_time(time_str):
         return time_str
 
 
-def fetch_flashscore_matches(headless=True):
+def accept_cookies(driver, profile=None, budget=None):
+    """Handle cookie consent (skipped while the profile remembers accepting)"""
+    dismiss_popup(driver, "//button[contains(text(), 'Accept')]", "✅ Accepted cookies", profile, step="cookies",
+                  budget=budget)
+
+
+def parse_flashscore_html(html, today_date, default_league="Football"):
+    """
+    Parse Flashscore page HTML (event__match rows) into matches.
+    Rows without a date prefix are today's.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    matches = []
+
+    # Find all match elements
+    match_elements = soup.find_all('div', class_=re.compile(r'event__match'))
+    print(f"\n📦 Found {len(match_elements)} match elements")
+
+    for match in match_elements:
+        try:
+            # Extract time
+            time_elem = match.find('div', class_=re.compile(r'event__time'))
+            if not time_elem:
+                continue
+            gmt_time = time_elem.text.strip()
+
+            # League fixture pages prefix the time with "DD.MM."
+            date = today_date
+            date_match = re.match(r'(\d{2})\.(\d{2})\.\s*', gmt_time)
+            if date_match:
+                date = f"{date_match.group(1)}/{date_match.group(2)}"
+                gmt_time = gmt_time[date_match.end():]
+
+            # CONVERT TO KENYA TIME (a late GMT kickoff is on the next day in Kenya)
+            kenya_time = convert_to_kenya_time(gmt_time)
+            date = local_kickoff_date(date, gmt_time, kenya_time)
+
+            # Extract home team
+            home_elem = match.find('div', class_=re.compile(r'event__homeParticipant'))
+            home = home_elem.text.strip() if home_elem else "Unknown"
+
+            # Extract away team
+            away_elem = match.find('div', class_=re.compile(r'event__awayParticipant'))
+            away = away_elem.text.strip() if away_elem else "Unknown"
+
+            # Extract league/tournament
+            league_elem = match.find_previous('div', class_=re.compile(r'tournament__header'))
+            league = league_elem.text.strip() if league_elem else default_league
+
+            if home != "Unknown" and away != "Unknown" and kenya_time:
+                match_data = {
+                    'home': home,
+                    'away': away,
+                    'kickoff': kenya_time,  # NOW IN KENYA TIME
+                    'original_gmt': gmt_time,  # For reference
+                    'date': date,
+                    'league': league,
+                    'bookie': 'Flashscore'
+                }
+                matches.append(match_data)
+                print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{date}] (was {gmt_time} GMT)")
+
+        except Exception as e:
+            continue
+
+    return matches
+
+
+def fetch_flashscore_matches(headless=True, fingerprint=None, leagues=None, budget_seconds=FETCH_BUDGET_SECONDS):
     """
     Fetch football matches from Flashscore Kenya and convert to Kenya time
+    If a SourceFingerprint is given and the page text is unchanged, the previous parse is reused
+    With `leagues`, only those leagues' fixture pages are loaded (see LEAGUE_URLS)
+    Loads (retried in the same browser) and waits share one `budget_seconds` time budget
     """
     print("=" * 70)
     print("⚽ FETCHING FLASHSCORE KENYA FOOTBALL MATCHES")
     print("=" * 70)
 
-    options = Options()
-    if headless:
-        options.add_argument("--headless")
-
-    options.add_argument("--width=1920")
-    options.add_argument("--height=1080")
-    options.set_preference("dom.webnotifications.enabled", False)
+    missing = sorted(league for league in leagues or () if league not in LEAGUE_URLS)
+    if missing:
+        print(f"⚠️ No league page configured for {missing}, loading full listing")
+    urls = [LEAGUE_URLS[league] for league in sorted(leagues)] if leagues and not missing else []
 
-    driver = webdriver.Firefox(options=options)
     matches = []
+    profile = get_profile("flashscore")
 
     try:
-        url = "https://www.flashscore.co.ke/"
-        print(f"\n📡 Loading Flashscore Kenya...")
-        driver.get(url)
-        time.sleep(8)
+        with browser_session(headless, budget_seconds, profile=profile) as (driver, budget):
+            today_date = datetime.now().strftime('%d/%m')
 
-        # Handle cookie consent
-        try:
-            cookie_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Accept')]")
-            cookie_btn.click()
-            print("✅ Accepted cookies")
-            time.sleep(2)
-        except:
-            pass
-
-        # Navigate to football section
-        try:
-            football_link = driver.find_element(By.XPATH, "//a[contains(text(), 'Football')]")
-            football_link.click()
-            print("✅ Clicked on Football")
-            time.sleep(3)
-        except:
-            pass
-
-        # Click on "Today" tab
-        try:
-            today_tab = driver.find_element(By.XPATH, "//*[contains(text(), 'TODAY')]")
-            today_tab.click()
-            print("✅ Clicked on TODAY tab")
-            time.sleep(3)
-        except:
-            pass
+            if urls:
+                for n, (league, url) in enumerate(zip(sorted(leagues), urls)):
+                    print(f"\n📡 Loading Flashscore league page: {url}")
+                    load_page(driver, url, budget)
+                    budget.sleep(5 if n == 0 else 3)
 
-        # Scroll to load more matches
-        for _ in range(3):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+                    if n == 0:
+                        accept_cookies(driver, profile, budget)
 
-        # Get page source and parse
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+                    matches.extend(parse_flashscore_html(driver.page_source, today_date, league_name(league)))
 
-        # Find all match elements
-        match_elements = soup.find_all('div', class_=re.compile(r'event__match'))
-        print(f"\n📦 Found {len(match_elements)} match elements")
+                print(f"\n📊 Total matches found: {len(matches)}")
+                return matches
 
-        today_date = datetime.now().strftime('%d/%m')
+            url = "https://www.flashscore.co.ke/"
+            print(f"\n📡 Loading Flashscore Kenya...")
+            load_page(driver, url, budget)
+            budget.sleep(8)
 
-        for match in match_elements:
+            # Handle cookie consent
+            accept_cookies(driver, profile, budget)
+
+            # Navigate to football section
             try:
-                # Extract time
-                time_elem = match.find('div', class_=re.compile(r'event__time'))
-                if not time_elem:
-                    continue
-                gmt_time = time_elem.text.strip()
-
-                # CONVERT TO KENYA TIME
-                kenya_time = convert_to_kenya_time(gmt_time)
-
-                # Extract home team
-                home_elem = match.find('div', class_=re.compile(r'event__homeParticipant'))
-                home = home_elem.text.strip() if home_elem else "Unknown"
-
-                # Extract away team
-                away_elem = match.find('div', class_=re.compile(r'event__awayParticipant'))
-                away = away_elem.text.strip() if away_elem else "Unknown"
-
-                # Extract league/tournament
-                league_elem = match.find_previous('div', class_=re.compile(r'tournament__header'))
-                league = league_elem.text.strip() if league_elem else "Football"
-
-                if home != "Unknown" and away != "Unknown" and kenya_time:
-                    match_data = {
-                        'home': home,
-                        'away': away,
-                        'kickoff': kenya_time,  # NOW IN KENYA TIME
-                        'original_gmt': gmt_time,  # For reference
-                        'date': today_date,
-                        'league': league,
-                        'bookie': 'Flashscore'
-                    }
-                    matches.append(match_data)
-                    print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{today_date}] (was {gmt_time} GMT)")
-
-            except Exception as e:
-                continue
+                football_link = driver.find_element(By.XPATH, "//a[contains(text(), 'Football')]")
+                football_link.click()
+                print("✅ Clicked on Football")
+                budget.sleep(3)
+            except:
+                pass
+
+            # Click on "Today" tab
+            try:
+                today_tab = driver.find_element(By.XPATH, "//*[contains(text(), 'TODAY')]")
+                today_tab.click()
+                print("✅ Clicked on TODAY tab")
+                budget.sleep(3)
+            except:
+                pass
+
+            # Scroll to load more matches
+            for _ in range(3):
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                budget.sleep(2)
+
+            # Matches are stamped with today's date, so a new day is new content
+            if fingerprint is not None:
+                page_text = driver.find_element(By.TAG_NAME, "body").text
+                if fingerprint.check(datetime.now().strftime('%d/%m') + page_text):
+                    print("♻️ Page unchanged since last run, reusing previous matches")
+                    return fingerprint.previous_matches()
+
+            # Get page source and parse
+            html = driver.page_source
+
+        matches = parse_flashscore_html(html, today_date)
 
         print(f"\n📊 Total matches found: {len(matches)}")
+        if fingerprint is not None:
+            fingerprint.update(matches)
         return matches
 
+    except BudgetExceeded as e:
+        print(f"⌛ Flashscore: {e}, giving up")
+        return []
     except Exception as e:
         print(f"❌ Error: {e}")
         return []
-    finally:
-        driver.quit()
 
 
-def get_flashscore_matches():
+def get_flashscore_matches(fingerprint=None, leagues=None):
     """Wrapper function for main system"""
-    return fetch_flashscore_matches(headless=True)
+    return fetch_flashscore_matches(headless=True, fingerprint=fingerprint, leagues=leagues)
 
 
 if __name__ == "__main__":
-    matches = fetch_flashscore_matches(headless=False)
+    matches = cached_fetch("Flashscore", lambda: fetch_flashscore_matches(headless=False))
     if matches:
         print(f"\n✅ Found {len(matches)} matches")
     else:
@@ -0,0 +1,120 @@
+# isolation.py - RUN EACH SCRAPER IN A SUPERVISED WORKER PROCESS
+import multiprocessing
+import os
+import signal
+import time
+
+# Wall-clock deadline and memory cap for one source fetch
+DEFAULT_DEADLINE_SECONDS = 300
+DEFAULT_MAX_RSS_MB = 2048
+
+
+class IsolatedFetchError(Exception):
+    """Worker timed out, ran out of memory or crashed"""
+
+
+def _worker(conn, func, args, kwargs):
+    """
+    Child side: become a process group leader so geckodriver and Firefox
+    inherit the group and can all be killed together, then send the result back.
+    """
+    if hasattr(os, 'setsid'):
+        os.setsid()
+
+    try:
+        conn.send(('ok', func(*args, **kwargs)))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def process_group_rss_mb(pgid):
+    """Total resident memory of every process in a group (None if /proc is unavailable)"""
+    if not os.path.isdir('/proc'):
+        return None
+
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total_pages = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue
+
+        # Fields after the ")" that closes the command name: state, ppid, pgrp, ...
+        fields = stat[stat.rfind(b')') + 2:].split()
+        if int(fields[2]) == pgid:
+            total_pages += int(fields[21])
+
+    return total_pages * page_size / (1024 * 1024)
+
+
+def kill_process_group(pgid):
+    """Kill a worker and anything it left behind (geckodriver, Firefox)"""
+    if not hasattr(os, 'killpg'):
+        return
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_isolated(func, args=(), kwargs=None, deadline_seconds=DEFAULT_DEADLINE_SECONDS,
+                 max_rss_mb=DEFAULT_MAX_RSS_MB, poll_interval=1.0):
+    """
+    Run func(*args, **kwargs) in a fresh process and return its result over a pipe.
+    Raises IsolatedFetchError when the deadline or memory cap is hit or the
+    worker dies; the whole process tree is killed either way.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_worker, args=(child_conn, func, args, kwargs or {}), daemon=True)
+
+    started = time.monotonic()
+    process.start()
+    child_conn.close()
+
+    try:
+        while True:
+            if parent_conn.poll(poll_interval):
+                try:
+                    status, payload = parent_conn.recv()
+                except EOFError:
+                    raise IsolatedFetchError(f"worker exited with code {process.exitcode}")
+
+                if status == 'error':
+                    raise IsolatedFetchError(payload)
+                return payload
+
+            if not process.is_alive():
+                raise IsolatedFetchError(f"worker exited with code {process.exitcode}")
+
+            elapsed = time.monotonic() - started
+            if elapsed > deadline_seconds:
+                raise IsolatedFetchError(f"deadline of {deadline_seconds}s exceeded")
+
+            rss = process_group_rss_mb(process.pid)
+            if rss is not None and rss > max_rss_mb:
+                raise IsolatedFetchError(f"memory cap exceeded ({rss:.0f} MB > {max_rss_mb} MB)")
+    finally:
+        kill_process_group(process.pid)
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        parent_conn.close()
+
+
+# Quick test
+if __name__ == "__main__":
+    print("\n📊 Testing isolated worker:")
+    print(f"   Result: {run_isolated(sorted, args=([3, 1, 2],))}")
+
+    try:
+        run_isolated(time.sleep, args=(10,), deadline_seconds=2)
+    except IsolatedFetchError as e:
+        print(f"   Hung worker stopped: {e}")
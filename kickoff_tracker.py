@@ -0,0 +1,157 @@
+# kickoff_tracker.py - DETECT WHEN A BOOKMAKER MOVES A FIXTURE
+from datetime import datetime, timedelta
+from collections import Counter
+
+from expiry import ExpiryWheel
+from fixture_index import align, day_ordinal
+from offset_detector import time_offset_minutes, time_to_minutes
+
+
+class KickoffTracker:
+    """
+    Remembers the last kickoffs per (fixture, source) and emits a 'moved'
+    event when a source reports a different date or time than it did before
+    (23:30 on 19/10 -> 00:30 on 20/10, or a postponement to another day).
+    A source can list the same pair more than once (two spellings, men's and
+    women's sides, a rematch); those kickoffs are kept together and lined up
+    with the previous ones, so only a kickoff that really changed is a move.
+    Entries are dropped once the match kicked off plus a grace period.
+    """
+
+    def __init__(self, key_func, grace_minutes=180, systematic_share=0.5, systematic_min=5):
+        # key_func(home, away) -> normalized fixture key
+        self.key_func = key_func
+        self.grace_minutes = grace_minutes
+
+        # (fixture_key, source) -> last [(date, 'HH:MM'), ...] sorted by time
+        self.last_kickoff = {}
+        self.expiry = ExpiryWheel()
+
+        # If most of a source's fixtures move by the same amount at once it's a
+        # timezone/offset change, not a real kickoff move
+        self.systematic_share = systematic_share
+        self.systematic_min = systematic_min
+
+    @staticmethod
+    def _at(date_str, kickoff):
+        """Minutes on a common timeline; date-less listings fall back to time of day"""
+        day = day_ordinal(date_str)
+        return (day or 0) * 1440 + (time_to_minutes(kickoff) or 0)
+
+    def observe(self, matches, kickoff_at=None):
+        """
+        Record one source's listings of one fixture (usually a single match);
+        returns the 'moved' events
+        """
+        match = matches[0]
+        source = match.get('source') or match.get('bookie')
+        key = (self.key_func(match['home'], match['away']), source)
+        listed = sorted(matches, key=lambda m: self._at(m.get('date'), m['kickoff']))
+        kickoffs = [(m.get('date'), m['kickoff']) for m in listed]
+
+        previous = self.last_kickoff.get(key)
+        self.last_kickoff[key] = kickoffs
+        if kickoff_at is not None:
+            self.expiry.add(key, kickoff_at + timedelta(minutes=self.grace_minutes))
+
+        if previous is None or previous == kickoffs:
+            return []
+
+        # Line the old and new kickoffs up (closest in order, across days); a
+        # listing that appeared or disappeared is left unpaired and isn't a move
+        timeline = lambda entries: [self._at(d, k) for d, k in entries]
+        if len(kickoffs) <= len(previous):
+            pairs = [(previous[slot], n) for n, slot in enumerate(align(timeline(previous), timeline(kickoffs)))]
+        else:
+            pairs = [(old, slot) for old, slot in zip(previous, align(timeline(kickoffs), timeline(previous)))]
+
+        events = []
+        for (old_date, old_kickoff), n in pairs:
+            match = listed[n]
+            new_date = match.get('date')
+            if (old_date, old_kickoff) == (new_date, match['kickoff']):
+                continue
+            if day_ordinal(old_date) is not None and day_ordinal(new_date) is not None:
+                shift = self._at(new_date, match['kickoff']) - self._at(old_date, old_kickoff)
+            else:
+                shift = time_offset_minutes(match['kickoff'], old_kickoff)
+            events.append({
+                'type': 'moved',
+                'home': match['home'],
+                'away': match['away'],
+                'league': match.get('league', 'Unknown'),
+                'date': new_date or 'Unknown',
+                'old_date': old_date or 'Unknown',
+                'source': source,
+                'old_kickoff': old_kickoff,
+                'new_kickoff': match['kickoff'],
+                'shift_minutes': shift,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            })
+        return events
+
+    def observe_source(self, matches, kickoff_at_func=None):
+        """
+        Observe one source's full match list.
+        Returns the moved events, minus mass shifts that look like a timezone change.
+        """
+        by_fixture = {}
+        for match in matches:
+            by_fixture.setdefault(self.key_func(match['home'], match['away']), []).append(match)
+
+        events = []
+        for listed in by_fixture.values():
+            kickoff_at = None
+            if kickoff_at_func:
+                times = [at for at in map(kickoff_at_func, listed) if at is not None]
+                kickoff_at = max(times) if times else None
+            events.extend(self.observe(listed, kickoff_at))
+
+        if len(events) >= self.systematic_min and len(events) > self.systematic_share * len(matches):
+            shift, count = Counter(e['shift_minutes'] for e in events).most_common(1)[0]
+            if count > self.systematic_share * len(events):
+                print(f"🕒 {events[0]['source']}: {count} fixtures shifted {shift:+d} mins at once, "
+                      f"treating as an offset change, not moves")
+                events = [e for e in events if e['shift_minutes'] != shift]
+
+        return events
+
+    def evict_expired(self, now=None):
+        """Forget fixtures that kicked off more than grace_minutes ago"""
+        expired = self.expiry.expire(now)
+        for key in expired:
+            self.last_kickoff.pop(key, None)
+        return len(expired)
+
+    def __len__(self):
+        return len(self.last_kickoff)
+
+
+def move_times(event):
+    """('old', 'new') kickoff strings of a move, with dates when the day changed"""
+    if event.get('old_date', event.get('date')) == event.get('date'):
+        return event['old_kickoff'], event['new_kickoff']
+    return f"{event['old_date']} {event['old_kickoff']}", f"{event['date']} {event['new_kickoff']}"
+
+
+# Quick test
+if __name__ == "__main__":
+    key = lambda home, away: '-'.join(sorted([home.lower(), away.lower()]))
+    listing = lambda date_str, kickoff, home='Arsenal': {
+        'home': home, 'away': 'Chelsea', 'date': date_str, 'kickoff': kickoff, 'league': 'Premier League', 'source': 'Betika'
+    }
+    tracker = KickoffTracker(key)
+
+    assert tracker.observe_source([listing('19/10', '23:30')]) == []
+    [event] = tracker.observe_source([listing('20/10', '00:30')])
+    assert event['shift_minutes'] == 60 and move_times(event) == ('19/10 23:30', '20/10 00:30'), event
+    print(f"✅ move across midnight: {' -> '.join(move_times(event))} ({event['shift_minutes']:+d} mins)")
+
+    [event] = tracker.observe_source([listing('27/10', '00:30')])
+    assert event['shift_minutes'] == 7 * 1440 and len(tracker) == 1, event
+    print(f"✅ postponement: {' -> '.join(move_times(event))}, still one tracked fixture")
+
+    # Two listings of the pair; one drops off, the other is not a move
+    tracker.observe_source([listing('27/10', '00:30'), listing('03/11', '20:00')])
+    assert tracker.observe_source([listing('03/11', '20:00')]) == []
+    print("✅ a second listing appearing or disappearing is not a move")
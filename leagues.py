@@ -0,0 +1,158 @@
+# leagues.py - CANONICAL LEAGUE TAXONOMY
+import re
+
+# Canonical competitions: ID -> display name, scraping priority and the names
+# sources use for it. Aliases are matched as whole words against the normalized
+# league string ("England • FA Cup" -> "england fa cup"). An alias starting with
+# "^" only matches with no country in front, so "Israel • Premier League" is not
+# the English Premier League. An alias followed by a qualifier ("Premier League 2",
+# "LaLiga 2", "Serie A Women", "Euro U21") is a different competition and doesn't match.
+COMPETITIONS = {
+    'ENG-PL': {'name': 'Premier League', 'priority': 'high',
+               'aliases': ['england premier league', 'english premier league', 'epl', '^premier league']},
+    'ENG-CH': {'name': 'Championship', 'priority': 'medium',
+               'aliases': ['england championship', 'efl championship', '^championship']},
+    'ENG-FAC': {'name': 'FA Cup', 'priority': 'medium',
+                'aliases': ['england fa cup', 'emirates fa cup', '^fa cup']},
+    'ENG-LC': {'name': 'Carabao Cup', 'priority': 'medium',
+               'aliases': ['carabao cup', 'england efl cup', 'england league cup', '^efl cup', '^league cup']},
+    'ESP-LL': {'name': 'LaLiga', 'priority': 'high',
+               'aliases': ['spain laliga', 'spain la liga', 'spain primera division', '^laliga', '^la liga']},
+    'GER-BL': {'name': 'Bundesliga', 'priority': 'high',
+               'aliases': ['germany bundesliga', '^bundesliga']},
+    'ITA-SA': {'name': 'Serie A', 'priority': 'high',
+               'aliases': ['italy serie a', '^serie a']},
+    'FRA-L1': {'name': 'Ligue 1', 'priority': 'high',
+               'aliases': ['france ligue 1', '^ligue 1']},
+    'POR-PL': {'name': 'Primeira Liga', 'priority': 'medium',
+               'aliases': ['portugal primeira liga', 'portugal liga portugal', '^primeira liga', '^liga portugal']},
+    'NED-ED': {'name': 'Eredivisie', 'priority': 'medium',
+               'aliases': ['netherlands eredivisie', '^eredivisie']},
+    'TUR-SL': {'name': 'Super Lig', 'priority': 'medium',
+               'aliases': ['turkey super lig', '^super lig']},
+    'UEFA-CL': {'name': 'Champions League', 'priority': 'high',
+                'aliases': ['uefa champions league', 'europe champions league', '^champions league']},
+    'UEFA-EL': {'name': 'Europa League', 'priority': 'high',
+                'aliases': ['uefa europa league', 'europe europa league', '^europa league']},
+    'FIFA-WC': {'name': 'World Cup', 'priority': 'high',
+                'aliases': ['fifa world cup', 'world world cup', '^world cup']},
+    'UEFA-EURO': {'name': 'Euro', 'priority': 'high',
+                  'aliases': ['uefa euro', 'europe euro', '^euro']},
+}
+
+PRIORITY_ORDER = ('high', 'medium', 'low')
+
+# Words after a competition name that make it a second-tier, youth, reserve or women's competition
+QUALIFIERS = r'(?:\d+|u ?\d+|ii|b|w|women|womens|woman|ladies|feminine|femenina|femminile|frauen|reserves?|youth)'
+
+
+def normalize_league_text(league):
+    """Lowercase, drop separators ("•", ":", "-", ...) and collapse whitespace"""
+    return ' '.join(re.sub(r'[^\w]+', ' ', (league or '').lower()).split())
+
+
+class LeagueTaxonomy:
+    """
+    Maps any source's league string to a canonical competition ID with one
+    compiled alternation (longest alias first) and a memo of strings already seen
+    """
+
+    def __init__(self, competitions=None, cache_size=4096):
+        self.competitions = competitions if competitions is not None else COMPETITIONS
+        self.cache_size = cache_size
+        self._cache = {}
+
+        self.alias_ids = {}
+        patterns = []
+        for league_id, info in self.competitions.items():
+            for alias in info['aliases']:
+                anchored = alias.startswith('^')
+                text = normalize_league_text(alias)
+                self.alias_ids[text] = league_id
+                patterns.append((
+                    len(text),
+                    ('^' if anchored else r'\b') + re.escape(text) + r'\b(?! ' + QUALIFIERS + r'\b)'
+                ))
+
+        # Leftmost match wins and, at the same position, the longest alias
+        patterns.sort(key=lambda p: p[0], reverse=True)
+        self.matcher = re.compile('|'.join(p for _, p in patterns)) if patterns else None
+
+    def canonical(self, league):
+        """Canonical competition ID for a league string (None if unknown)"""
+        try:
+            return self._cache[league]
+        except KeyError:
+            pass
+
+        league_id = None
+        if self.matcher is not None:
+            match = self.matcher.search(normalize_league_text(league))
+            if match:
+                league_id = self.alias_ids[match.group(0)]
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[league] = league_id
+        return league_id
+
+    def name(self, league_id):
+        """Display name of a canonical ID"""
+        return self.competitions[league_id]['name']
+
+    def priority(self, league):
+        """'high', 'medium' or 'low' for a league string"""
+        league_id = self.canonical(league)
+        return self.competitions[league_id]['priority'] if league_id else 'low'
+
+    def display(self, league):
+        """Canonical name for reporting, or the source's own string if unknown"""
+        league_id = self.canonical(league)
+        return self.competitions[league_id]['name'] if league_id else (league or 'Unknown')
+
+
+# Shared default taxonomy
+TAXONOMY = LeagueTaxonomy()
+
+canonical_league = TAXONOMY.canonical
+league_name = TAXONOMY.name
+league_priority = TAXONOMY.priority
+display_league = TAXONOMY.display
+
+
+# Quick test
+if __name__ == "__main__":
+    import time
+
+    samples = {
+        "England • FA Cup": 'ENG-FAC',
+        "England: Championship": 'ENG-CH',
+        "ENGLAND PREMIER LEAGUE": 'ENG-PL',
+        "Israel • Premier League": None,
+        "Premier League": 'ENG-PL',
+        "Europe: Europa League - Play Offs": 'UEFA-EL',
+        "Europe: Conference League": None,
+        "International Clubs • UEFA Champions League": 'UEFA-CL',
+        "Germany: 2. Bundesliga": None,
+        "Portugal: Liga Portugal": 'POR-PL',
+        "England • Premier League 2": None,
+        "Premier League U21": None,
+        "England: Premier League U-18": None,
+        "Spain • LaLiga 2": None,
+        "Italy: Serie A Women": None,
+        "Euro U21": None,
+        "Germany: Bundesliga Women's": None,
+        "England Premier League Reserves": None,
+        "Spain: LaLiga": 'ESP-LL',
+        "Football": None,
+    }
+    for league, expected in samples.items():
+        got = canonical_league(league)
+        print(f"{'✅' if got == expected else '❌'} {league:<45} -> {got} ({league_priority(league)})")
+        assert got == expected, league
+
+    strings = list(samples) * 25000
+    started = time.perf_counter()
+    for league in strings:
+        league_priority(league)
+    print(f"📊 {len(strings)} lookups in {(time.perf_counter() - started) * 1000:.1f} ms")
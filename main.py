@@ -1,27 +1,120 @@
 # main.py
+from contextlib import nullcontext
+from functools import partial
 import time
 from datetime import datetime, timedelta
 import json
 import os
 
 # Import your scrapers
-from flashscore_scraper import get_flashscore_matches
-from odibets_scraper import fetch_odibets_matches
-from mozzart_scraper import fetch_mozzartbet_matches
-from betika_scraper import fetch_betika_matches
+from flashscore_scraper import get_flashscore_matches, LEAGUE_URLS as FLASHSCORE_LEAGUES
+from odibets_scraper import fetch_odibets_matches, LEAGUE_URLS as ODIBETS_LEAGUES
+from mozzart_scraper import fetch_mozzartbet_matches, LEAGUE_URLS as MOZZARTBET_LEAGUES
+from betika_scraper import fetch_betika_matches, LEAGUE_URLS as BETIKA_LEAGUES
 
 # Import the dynamic scheduler
 from scheduler import DynamicScheduler
 
-# Import Telegram alert
-from telegram_alert import TelegramAlert
+# Import alert sinks (Telegram, desktop, webhook, file)
+from notifiers import NotifierDispatcher, default_sinks
 
+# Import the systematic offset detector
+from offset_detector import OffsetDetector
 
-def safe_get_matches(scraper_func, source_name, scheduler=None, match_data=None):
+# Import the expiry wheel used to trim long-running state
+from expiry import ExpiryWheel
+
+# Import the supervised worker used to isolate each scraper
+from isolation import run_isolated, DEFAULT_DEADLINE_SECONDS, DEFAULT_MAX_RSS_MB
+
+# Import content fingerprints used to skip unchanged sources
+from fingerprint import SourceFingerprint, fetch_with_fingerprint
+
+# Import the delta-encoded archive of raw per-run snapshots
+from snapshot_archive import SnapshotArchive
+
+# Import the tracker that spots bookmakers moving fixtures between runs
+from kickoff_tracker import KickoffTracker, move_times
+
+# Import the 1X2 arbitrage engine
+from arbitrage import find_arbitrage, print_arbitrage
+
+# Import the canonical league taxonomy
+from leagues import canonical_league, league_name
+
+# Import the cleanup for persistent browser profiles
+from browser import cleanup_profiles
+
+# Import the opt-in per-stage profiler
+from profiler import StageProfiler, profiled_call
+
+# Import the fixture index used to join listings across sources
+from fixture_index import FixtureIndex, join_fixtures, DEFAULT_JOIN_WINDOW_MINUTES
+
+# Import the learned per-source/league kickoff change rates
+from change_rate import ChangeRateEstimator
+
+# Import the per-source circuit breaker
+from circuit_breaker import CircuitBreaker, CLOSED
+
+# Import the cross-process cache of last-good listings
+from result_cache import ResultCache, DEFAULT_MAX_AGE_SECONDS
+
+# Import the read-only query API over the joined fixture table
+from query_api import QueryApi
+
+# Import the compact match record the comparer works on
+from match_record import Match
+
+
+def _call_scraper(scraper_func, fingerprint, leagues, isolated, deadline_seconds, max_rss_mb, profile_path):
+    """Run one scraper as safe_get_matches was asked to (targeted, fingerprinted, isolated, profiled)"""
+    if leagues:
+        fingerprint = None
+        call, args = partial(scraper_func, leagues=sorted(leagues)), ()
+    elif fingerprint is not None:
+        fingerprint.unchanged = False
+        call, args = fetch_with_fingerprint, (scraper_func, fingerprint)
+    else:
+        call, args = scraper_func, ()
+
+    if isolated and profile_path:
+        matches = run_isolated(profiled_call, args=(call, args, profile_path),
+                               deadline_seconds=deadline_seconds, max_rss_mb=max_rss_mb)
+    elif isolated:
+        matches = run_isolated(call, args=args, deadline_seconds=deadline_seconds, max_rss_mb=max_rss_mb)
+    else:
+        matches = call(*args)
+
+    if fingerprint is not None:
+        matches, updated = matches
+        fingerprint.merge(updated)
+    return matches
+
+
+def safe_get_matches(scraper_func, source_name, scheduler=None, match_data=None, isolated=False,
+                     deadline_seconds=DEFAULT_DEADLINE_SECONDS, max_rss_mb=DEFAULT_MAX_RSS_MB, fingerprint=None,
+                     leagues=None, profile_path=None, breaker=None, cache=None, max_age_seconds=None):
     """
     Safely fetch matches and ensure they have the required fields
     Now with scheduler integration for failure tracking
+    With isolated=True the scraper runs in its own process with a hard deadline and memory cap
+    With a SourceFingerprint the scraper can skip parsing when the page hasn't changed
+    With `leagues` only those leagues' pages are fetched (the fingerprint is not used)
+    With `profile_path` an isolated worker profiles itself (fetch + parse) into that .prof file
+    With a CircuitBreaker an open circuit skips the fetch entirely, and every outcome is recorded on it
+    With a ResultCache a full listing at most `max_age_seconds` old is reused, and live ones are stored
     """
+    if breaker is not None and not breaker.allow():
+        print(f"\n⛔ {source_name}: circuit open, skipping fetch until {breaker.retry_at.strftime('%H:%M:%S')}")
+        return []
+
+    def record_failure():
+        if scheduler:
+            scheduler.record_failure(source_name)
+        if breaker is not None:
+            breaker.record_failure()
+
     try:
         print(f"\n📡 Fetching from {source_name}...")
 
@@ -31,20 +124,33 @@ def safe_get_matches(scraper_func, source_name, scheduler=None, match_data=None)
             print(f"   Type: {type(scraper_func)}")
             return []
 
-        # Call the function
-        matches = scraper_func()
+        # Another process (or an earlier check) may have fetched this full listing moments ago
+        matches = None
+        if cache is not None and not leagues and max_age_seconds:
+            matches = cache.get(source_name, max_age_seconds)
+        cached = matches is not None
+
+        if cached:
+            print(f"♻️ {source_name}: using cached result ({cache.age(source_name):.0f}s old)")
+            if fingerprint is not None:
+                fingerprint.unchanged = False
+        else:
+            matches = _call_scraper(scraper_func, fingerprint, leagues, isolated, deadline_seconds, max_rss_mb,
+                                    profile_path)
+
+            # Share the full listing with other processes (targeted fetches are partial)
+            if cache is not None and not leagues and isinstance(matches, list):
+                cache.put(source_name, matches)
 
         # Check what we got
         if matches is None:
             print(f"⚠️ {source_name} returned None")
-            if scheduler:
-                scheduler.record_failure(source_name)
+            record_failure()
             return []
 
         if not isinstance(matches, list):
             print(f"⚠️ {source_name} returned {type(matches)}, expected list")
-            if scheduler:
-                scheduler.record_failure(source_name)
+            record_failure()
             return []
 
         # Filter out matches without kickoff times
@@ -52,35 +158,42 @@ def safe_get_matches(scraper_func, source_name, scheduler=None, match_data=None)
         for match in matches:
             if match and isinstance(match, dict):
                 if 'kickoff' in match and match['kickoff']:
-                    valid_matches.append({
-                        'home': match.get('home', 'Unknown'),
-                        'away': match.get('away', 'Unknown'),
-                        'kickoff': match['kickoff'],
-                        'league': match.get('league', 'Unknown'),
-                        'date': match.get('date', datetime.now().strftime('%d/%m')),
-                        'source': source_name
-                    })
+                    valid_matches.append(Match(
+                        match.get('home', 'Unknown'),
+                        match.get('away', 'Unknown'),
+                        match['kickoff'],
+                        match.get('league', 'Unknown'),
+                        canonical_league(match.get('league', 'Unknown')),
+                        match.get('date', datetime.now().strftime('%d/%m')),
+                        match.get('odds'),
+                        source_name
+                    ))
                 else:
                     print(
                         f"⚠️ Skipping match without kickoff: {match.get('home', 'Unknown')} vs {match.get('away', 'Unknown')}")
 
-        # Record success if we got valid matches
-        if scheduler and valid_matches:
+        # Record success if we got valid matches (a cached listing says nothing about the site now)
+        if scheduler and valid_matches and not cached:
             scheduler.record_success(source_name)
 
+        # Scrapers swallow their own errors and return [], so an empty full listing counts as a failure
+        if breaker is not None and not cached:
+            if valid_matches:
+                breaker.record_success()
+            elif not leagues:
+                breaker.record_failure()
+
         print(f"✅ {source_name}: {len(valid_matches)} valid matches with kickoff times")
         return valid_matches
 
     except TypeError as e:
         print(f"❌ TypeError in {source_name}: {e}")
         print(f"   This usually means you're trying to call a list as a function")
-        if scheduler:
-            scheduler.record_failure(source_name)
+        record_failure()
         return []
     except Exception as e:
         print(f"❌ Error fetching from {source_name}: {e}")
-        if scheduler:
-            scheduler.record_failure(source_name)
+        record_failure()
         return []
 
 
@@ -132,15 +245,45 @@ def calculate_time_difference(time1, time2):
         return 999
 
 
-def compare_all_sources(flashscore_matches, odibets_matches, mozzartbet_matches, betika_matches):
+def _source_index(source_name, matches, unchanged_sources, comparison_cache):
+    """Fixture index for one source, reused from the last run if the source is unchanged"""
+    indexes = comparison_cache.setdefault('indexes', {}) if comparison_cache is not None else {}
+
+    if source_name in unchanged_sources and source_name in indexes:
+        return indexes[source_name]
+
+    index = FixtureIndex(matches, normalize_match_key)
+    indexes[source_name] = index
+    return index
+
+
+def compare_all_sources(flashscore_matches, odibets_matches, mozzartbet_matches, betika_matches,
+                        unchanged_sources=(), comparison_cache=None,
+                        join_window_minutes=DEFAULT_JOIN_WINDOW_MINUTES, tolerance_minutes=0):
     """
     Compare kickoff times across all FOUR sources
     Returns list of discrepancies
+    Listings of the same pair are paired per fixture (rematches and duplicate
+    pairs stay separate) when within `join_window_minutes` of each other, and
+    only kickoffs more than `tolerance_minutes` apart count as a conflict
+    Sources in `unchanged_sources` reuse their fixture index from `comparison_cache`;
+    if none of the four changed, the previous discrepancies are returned as-is.
+    With a comparison_cache the full fixture table is left in comparison_cache['fixtures']
     """
     print("\n" + "=" * 80)
     print("🔍 COMPARING KICKOFF TIMES ACROSS ALL SOURCES")
     print("=" * 80)
 
+    unchanged_sources = set(unchanged_sources)
+    if (comparison_cache is not None and 'discrepancies' in comparison_cache
+            and unchanged_sources >= {"Flashscore", "Odibets", "MozzartBet", "Betika"}):
+        print("♻️ No source changed since last run, reusing previous comparison")
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for discrepancy in comparison_cache['discrepancies']:
+            discrepancy['timestamp'] = timestamp
+        print(f"\n📊 Total conflicts found: {len(comparison_cache['discrepancies'])}")
+        return list(comparison_cache['discrepancies'])
+
     # Get today's and tomorrow's dates
     today = datetime.now().strftime('%d/%m')
     tomorrow = (datetime.now() + timedelta(days=1)).strftime('%d/%m')
@@ -157,79 +300,92 @@ def compare_all_sources(flashscore_matches, odibets_matches, mozzartbet_matches,
     print(f"📊 MozzartBet: {len(mozzartbet_matches)} matches")
     print(f"📊 Betika: {len(betika_matches)} matches")
 
-    # Create lookup dictionaries
-    flashscore_dict = {normalize_match_key(m['home'], m['away']): m for m in flashscore_matches}
-    odibets_dict = {normalize_match_key(m['home'], m['away']): m for m in odibets_matches}
-    mozzartbet_dict = {normalize_match_key(m['home'], m['away']): m for m in mozzartbet_matches}
-    betika_dict = {normalize_match_key(m['home'], m['away']): m for m in betika_matches}
+    # Index every source by (team pair, day) without dropping duplicate pairs
+    indexes = {
+        "Flashscore": _source_index("Flashscore", flashscore_matches, unchanged_sources, comparison_cache),
+        "Odibets": _source_index("Odibets", odibets_matches, unchanged_sources, comparison_cache),
+        "MozzartBet": _source_index("MozzartBet", mozzartbet_matches, unchanged_sources, comparison_cache),
+        "Betika": _source_index("Betika", betika_matches, unchanged_sources, comparison_cache),
+    }
 
-    # Get all unique match keys
-    all_keys = set(flashscore_dict.keys()) | set(odibets_dict.keys()) | set(mozzartbet_dict.keys()) | set(
-        betika_dict.keys())
+    # Pair listings across sources into fixtures
+    fixtures = join_fixtures(indexes, join_window_minutes)
 
-    print(f"\n📊 Total unique matches found across all sources: {len(all_keys)}")
+    print(f"\n📊 Total unique matches found across all sources: {len(fixtures)}")
 
     all_discrepancies = []
 
-    for key in all_keys:
-        match_info = {}
-        times = {}
-
-        if key in flashscore_dict:
-            match_info['flashscore'] = flashscore_dict[key]
-            times['Flashscore'] = flashscore_dict[key]['kickoff']
-        if key in odibets_dict:
-            match_info['odibets'] = odibets_dict[key]
-            times['Odibets'] = odibets_dict[key]['kickoff']
-        if key in mozzartbet_dict:
-            match_info['mozzartbet'] = mozzartbet_dict[key]
-            times['MozzartBet'] = mozzartbet_dict[key]['kickoff']
-        if key in betika_dict:
-            match_info['betika'] = betika_dict[key]
-            times['Betika'] = betika_dict[key]['kickoff']
-
-        # If match appears in at least 2 sources, check for conflicts
-        if len(times) >= 2:
-            # Get the first match for display info
-            sample_match = next(iter(match_info.values()))
-
-            # Check if all times are the same
-            unique_times = set(times.values())
-
-            if len(unique_times) > 1:
-                # Create unique conflict ID to prevent duplicate alerts
-                conflict_id = f"{key}_{list(times.values())[0]}"
-
-                # Conflict found!
-                discrepancy = {
-                    'home': sample_match['home'],
-                    'away': sample_match['away'],
-                    'times': times,
-                    'league': sample_match.get('league', 'Unknown'),
-                    'date': sample_match.get('date', 'Unknown'),
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'conflict_id': conflict_id
-                }
-                all_discrepancies.append(discrepancy)
-
-                # Print immediately when found
-                print("\n" + "!" * 70)
-                print("🚨 CONFLICT FOUND!")
-                print("!" * 70)
-                print(f"Match: {sample_match['home']} vs {sample_match['away']}")
-                print(f"League: {sample_match.get('league', 'Unknown')}")
-                print(f"Date: {sample_match.get('date', 'Unknown')}")
-                for source, time in times.items():
-                    print(f"   {source}: {time}")
-
-                # Calculate and show time differences
-                time_values = list(times.values())
-                if len(time_values) == 2:
-                    diff = calculate_time_difference(time_values[0], time_values[1])
-                    print(f"   Difference: {diff} minutes")
-                print("!" * 70)
+    # The monitor keeps the whole joined table (every fixture, conflicting or not) for the query API
+    table = [] if comparison_cache is not None else None
+
+    for key, cluster in fixtures:
+        # If match appears in at least 2 sources, check if the kickoffs differ by more than the tolerance
+        conflicting = len(cluster) >= 2 and (
+            max(at for source, at, match in cluster) - min(at for source, at, match in cluster) > tolerance_minutes
+        )
+        if not conflicting and table is None:
+            continue
+
+        match_info = {source: match for source, at, match in cluster}
+        times = {source: match['kickoff'] for source, at, match in cluster}
+
+        # Get the first match for display info
+        sample_match = cluster[0][2]
+
+        # Create unique conflict ID to prevent duplicate alerts
+        conflict_id = f"{key}_{list(times.values())[0]}"
+
+        # Report the canonical competition if any source names one (Odibets only says 'Football')
+        league_id = next((m.get('league_id') for m in match_info.values() if m.get('league_id')), None)
+        league = league_name(league_id) if league_id else sample_match.get('league', 'Unknown')
+
+        if table is not None:
+            table.append({
+                'fixture_id': conflict_id,
+                'home': sample_match['home'],
+                'away': sample_match['away'],
+                'league': league,
+                'league_id': league_id,
+                'date': sample_match.get('date', 'Unknown'),
+                'kickoffs': times,
+                'conflict': conflicting,
+            })
+
+        if conflicting:
+            # Conflict found!
+            discrepancy = {
+                'home': sample_match['home'],
+                'away': sample_match['away'],
+                'times': times,
+                'league': league,
+                'league_id': league_id,
+                'date': sample_match.get('date', 'Unknown'),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'conflict_id': conflict_id
+            }
+            all_discrepancies.append(discrepancy)
+
+            # Print immediately when found
+            print("\n" + "!" * 70)
+            print("🚨 CONFLICT FOUND!")
+            print("!" * 70)
+            print(f"Match: {sample_match['home']} vs {sample_match['away']}")
+            print(f"League: {league}")
+            print(f"Date: {sample_match.get('date', 'Unknown')}")
+            for source, time in times.items():
+                print(f"   {source}: {time}")
+
+            # Calculate and show time differences
+            time_values = list(times.values())
+            if len(time_values) == 2:
+                diff = calculate_time_difference(time_values[0], time_values[1])
+                print(f"   Difference: {diff} minutes")
+            print("!" * 70)
 
     print(f"\n📊 Total conflicts found: {len(all_discrepancies)}")
+    if comparison_cache is not None:
+        comparison_cache['discrepancies'] = list(all_discrepancies)
+        comparison_cache['fixtures'] = table
     return all_discrepancies
 
 
@@ -290,115 +446,467 @@ def print_summary(flashscore_count, odibets_count, mozzartbet_count, betika_coun
     print("=" * 80)
 
 
-def send_desktop_alert(discrepancies):
-    """Send desktop notification for conflicts"""
-    if not discrepancies:
-        return
+# Scrapers in the order they are fetched and passed to compare_all_sources
+SOURCES = {
+    "Flashscore": get_flashscore_matches,
+    "Odibets": fetch_odibets_matches,
+    "MozzartBet": fetch_mozzartbet_matches,
+    "Betika": fetch_betika_matches,
+}
 
-    try:
-        for d in discrepancies[:3]:
-            times_str = ' vs '.join([f"{s}:{t}" for s, t in d['times'].items()])
-            os.system(f'notify-send "🚨 Time Conflict" "{d["home"]} vs {d["away"]}: {times_str}"')
-    except:
-        pass
+# League pages each source can load on its own, keyed by canonical league ID
+SOURCE_LEAGUES = {
+    "Flashscore": FLASHSCORE_LEAGUES,
+    "Odibets": ODIBETS_LEAGUES,
+    "MozzartBet": MOZZARTBET_LEAGUES,
+    "Betika": BETIKA_LEAGUES,
+}
 
+# Time categories close enough to kickoff to justify a league-targeted run
+URGENT_CATEGORIES = ('critical', 'very_close')
 
-def main_loop():
-    """
-    Main loop that runs with dynamic scheduling and Telegram alerts
-    """
-    print("=" * 80)
-    print("⚽ KICKOFF TIME COMPARISON MONITOR - 4 SOURCES (DYNAMIC + TELEGRAM)")
-    print("=" * 80)
+# Trim persistent browser profiles (cache size, unused profiles) every N runs
+PROFILE_CLEANUP_EVERY = 50
 
-    # Initialize the dynamic scheduler
-    scheduler = DynamicScheduler()
+# The monitor only reuses another process's listing if it is this fresh
+MONITOR_CACHE_MAX_AGE_SECONDS = 60
 
-    # Initialize Telegram alert
-    telegram_alert = TelegramAlert()
 
-    # Track conflicts we've already alerted on Telegram
-    alerted_conflicts = set()
+class KickoffMonitor:
+    """
+    One fetch -> compare -> alert -> save cycle with all the state that has to
+    survive between runs (scheduler, offsets, alerted conflicts, last results)
+    """
 
-    print(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
+    def __init__(self, isolated=True, deadline_seconds=DEFAULT_DEADLINE_SECONDS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 profile=False, scrape_budget_per_hour=None, cache_max_age_seconds=MONITOR_CACHE_MAX_AGE_SECONDS,
+                 target_latency_minutes=None):
+        # Each source runs in its own worker process so one hung page can't stall the others
+        self.isolated = isolated
+        self.deadline_seconds = deadline_seconds
+        self.max_rss_mb = max_rss_mb
+
+        # How often each source/league moves kickoffs, learned across restarts
+        self.change_rates = ChangeRateEstimator()
+        self.change_rates.load()
+
+        # Initialize the dynamic scheduler (intervals adapt to the change rates and target latency, under the budget)
+        self.scheduler = DynamicScheduler(
+            change_rates=self.change_rates, scrape_budget_per_hour=scrape_budget_per_hour,
+            target_latency_minutes=target_latency_minutes
+        )
+
+        # Every alert goes to all configured sinks at once
+        self.notifier = NotifierDispatcher(default_sinks())
+
+        # Detect sources that are off by a constant timezone offset
+        self.offset_detector = OffsetDetector()
+        self.offset_detector.load_history()
+
+        # Track conflicts we've already alerted on (dropped after kickoff + grace)
+        self.alerted_conflicts = ExpiryWheel()
+
+        # Alerted conflicts some sinks still failed to deliver: conflict_id -> sink names to retry
+        self.pending_sinks = {}
+
+        # Last good result and fetch stats per source
+        self.results = {source_name: [] for source_name in SOURCES}
+        self.source_stats = {}
+
+        # A source that keeps failing is skipped (no browser, no worker) until a probe succeeds
+        self.breakers = {source_name: CircuitBreaker(source_name) for source_name in SOURCES}
+
+        # Listings are shared with other processes; one fetched by someone else within
+        # cache_max_age_seconds is used instead of starting another Firefox (never our own)
+        self.result_cache = ResultCache(skip_own=True)
+        self.cache_max_age_seconds = cache_max_age_seconds
+
+        # Raw content fingerprints let unchanged sources skip parse and compare
+        self.fingerprints = {source_name: SourceFingerprint() for source_name in SOURCES}
+        self.comparison_cache = {}
+        self.compared_offsets = {}
+
+        # The last run's fixture table and conflicts, pre-serialized for the control endpoint
+        self.query_api = QueryApi()
+
+        # Raw per-run match lists, stored as deltas against the previous run
+        self.archive = SnapshotArchive()
+
+        # Last kickoff per (fixture, source), to catch a bookmaker moving a match
+        self.kickoff_tracker = KickoffTracker(normalize_match_key, self.scheduler.grace_minutes)
+        self.last_moves = []
+
+        # Leagues the next run only needs to refresh (None = full listing)
+        self.next_leagues = None
+        self.fetched_leagues = {}
+
+        # cProfile + tracemalloc per stage, only when asked for (--profile)
+        self.profiler = StageProfiler() if profile else None
+
+        self.run_count = 0
+        self.last_run = None
+        self.last_conflicts = []
+        self.last_arbitrage = []
+
+        # Health snapshot for the control endpoint, rebuilt by the run loop (see status())
+        self.publish_status()
+
+    def _stage(self, name):
+        """Profile a block as one stage (a no-op unless profiling)"""
+        return self.profiler.stage(name) if self.profiler else nullcontext()
+
+    def fetch_source(self, source_name, leagues=None, refresh=False):
+        """
+        Fetch one source and record how long it took
+        With `leagues` only those league pages are loaded and merged into the
+        source's last result; sources that can't target all of them fetch everything
+        With refresh=True (an explicit request) the shared result cache is not read
+        """
+        started = time.monotonic()
+        profile_path = self.profiler.path(f"fetch_{source_name}.worker") if self.profiler and self.isolated else None
+
+        breaker = self.breakers[source_name]
+        if not breaker.allow():
+            print(f"\n⛔ {source_name}: circuit open, skipping fetch until {breaker.retry_at.strftime('%H:%M:%S')}")
+            self.results[source_name] = []
+            self.fingerprints[source_name].unchanged = False
+            self.fetched_leagues[source_name] = None
+            self.source_stats[source_name] = {
+                'latency_seconds': 0,
+                'matches': 0,
+                'unchanged': False,
+                'leagues': 'none',
+                'circuit': breaker.state,
+                'fetched_at': self.source_stats.get(source_name, {}).get('fetched_at'),
+            }
+            return []
 
-    run_count = 0
+        # A probe has to be a full listing: an empty targeted page doesn't say the source is back
+        if leagues and (breaker.state != CLOSED or not set(leagues) <= SOURCE_LEAGUES[source_name].keys()):
+            leagues = None
 
-    while True:
-        run_count += 1
+        # Explicit and targeted refreshes want the site now, not another process's listing;
+        # so does a probe, or the breaker never learns whether the source is back
+        max_age_seconds = None if refresh or leagues or breaker.state != CLOSED else self.cache_max_age_seconds
+
+        matches = []
+        if leagues:
+            matches = safe_get_matches(
+                SOURCES[source_name], source_name, self.scheduler,
+                isolated=self.isolated, deadline_seconds=self.deadline_seconds, max_rss_mb=self.max_rss_mb,
+                leagues=leagues, profile_path=profile_path, breaker=breaker
+            )
+            if matches:
+                self.fingerprints[source_name].unchanged = False
+            else:
+                print(f"⚠️ {source_name}: targeted fetch came back empty, fetching full listing")
+                leagues = None
+
+        if not leagues:
+            matches = safe_get_matches(
+                SOURCES[source_name], source_name, self.scheduler,
+                isolated=self.isolated, deadline_seconds=self.deadline_seconds, max_rss_mb=self.max_rss_mb,
+                fingerprint=self.fingerprints[source_name], profile_path=profile_path, breaker=breaker,
+                cache=self.result_cache, max_age_seconds=max_age_seconds
+            )
+        matches = self.offset_detector.correct_matches(matches, source_name)
+
+        if leagues:
+            matches = self._merge_partial(self.results[source_name], matches, leagues)
+
+        self.results[source_name] = matches
+        self.fetched_leagues[source_name] = set(leagues) if leagues else None
+        self.source_stats[source_name] = {
+            'latency_seconds': round(time.monotonic() - started, 2),
+            'matches': len(matches),
+            'unchanged': self.fingerprints[source_name].unchanged,
+            'leagues': sorted(leagues) if leagues else 'all',
+            'circuit': breaker.state,
+            'fetched_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        return matches
+
+    def _merge_partial(self, previous, fresh, leagues):
+        """Replace the targeted leagues' fixtures in the last full result with a fresh fetch"""
+        fresh_keys = {(normalize_match_key(m['home'], m['away']), m['date']) for m in fresh}
+        kept = [
+            m for m in previous
+            if m.get('league_id') not in leagues
+            and (normalize_match_key(m['home'], m['away']), m['date']) not in fresh_keys
+        ]
+        return kept + fresh
+
+    def run_once(self, sources=None, leagues=None, refresh=False):
+        """
+        Run one cycle. With `sources` only those are re-fetched and the others
+        reuse their last result. With `leagues` only those leagues' pages are
+        re-fetched. refresh=True (explicit requests) skips the shared result cache.
+        Returns minutes until the next run.
+        """
+        self.run_count += 1
         print(f"\n{'#' * 60}")
-        print(f"🔄 RUN #{run_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"🔄 RUN #{self.run_count} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'#' * 60}")
-
-        try:
-            # Safely fetch matches from all FOUR sources with scheduler tracking
-            flashscore_matches = safe_get_matches(get_flashscore_matches, "Flashscore", scheduler)
-            odibets_matches = safe_get_matches(fetch_odibets_matches, "Odibets", scheduler)
-            mozzartbet_matches = safe_get_matches(fetch_mozzartbet_matches, "MozzartBet", scheduler)
-            betika_matches = safe_get_matches(fetch_betika_matches, "Betika", scheduler)
-
-            # Compare them
-            discrepancies = compare_all_sources(flashscore_matches, odibets_matches, mozzartbet_matches, betika_matches)
-
-            # Send Telegram alerts for NEW conflicts only
-            for conflict in discrepancies:
-                conflict_id = conflict.get('conflict_id')
-
-                if conflict_id and conflict_id not in alerted_conflicts:
-                    # Send Telegram alert
-                    if telegram_alert.send_alert(conflict):
-                        alerted_conflicts.add(conflict_id)
-                        print(f"📱 Telegram alert sent for {conflict['home']} vs {conflict['away']}")
-
-            # Send desktop notifications
-            if discrepancies:
-                send_desktop_alert(discrepancies)
-
-            # Print summary
-            print_summary(
-                len(flashscore_matches),
-                len(odibets_matches),
-                len(mozzartbet_matches),
-                len(betika_matches),
-                discrepancies
+        if self.profiler:
+            self.profiler.start_run(self.run_count)
+        if leagues:
+            print(f"🎯 Targeted run for {', '.join(league_name(league_id) for league_id in sorted(leagues))}")
+
+        # Safely fetch matches from all FOUR sources with scheduler tracking
+        fetched = list(sources or SOURCES)
+        self.fetched_leagues = {}
+        for source_name in fetched:
+            with self._stage(f"fetch_{source_name}"):
+                self.fetch_source(source_name, leagues, refresh)
+
+        # Kickoff moves are their own signal, alerted separately from cross-source conflicts
+        with self._stage("moves"):
+            moves = []
+            for source_name in fetched:
+                moves.extend(self.kickoff_tracker.observe_source(
+                    self.results[source_name],
+                    lambda m: self.scheduler.get_kickoff_datetime(m['date'], m['kickoff'])
+                ))
+            for event in moves:
+                print(f"🔀 {event['source']} moved {event['home']} vs {event['away']}: "
+                      f"{' -> '.join(move_times(event))}")
+            self.notifier.notify_moves(moves)
+            self.last_moves = moves
+            self.observe_change_rates(fetched, moves)
+
+        # Keep the raw data of this run, not just the conflicts
+        with self._stage("archive"):
+            try:
+                self.archive.append(self.results)
+            except Exception as e:
+                print(f"⚠️ Could not archive snapshot: {e}")
+
+        # Sources that weren't fetched or whose content didn't change can short-circuit
+        unchanged = {
+            source_name for source_name in SOURCES
+            if source_name not in fetched or self.fingerprints[source_name].unchanged
+        }
+
+        # Auto-corrected kickoffs depend on the detected offsets, so a new offset invalidates the cache
+        if self.offset_detector.offsets != self.compared_offsets:
+            self.comparison_cache.clear()
+            self.compared_offsets = dict(self.offset_detector.offsets)
+
+        flashscore_matches = self.results["Flashscore"]
+        odibets_matches = self.results["Odibets"]
+        mozzartbet_matches = self.results["MozzartBet"]
+        betika_matches = self.results["Betika"]
+
+        # Compare them
+        with self._stage("compare"):
+            discrepancies = compare_all_sources(
+                flashscore_matches, odibets_matches, mozzartbet_matches, betika_matches,
+                unchanged_sources=unchanged, comparison_cache=self.comparison_cache
             )
 
-            # Save conflicts (all of them, not just new ones)
+            # Conflicts fully explained by a systematic source offset don't get alerts
+            self.offset_detector.update(discrepancies)
+            alertable, explained = self.offset_detector.filter_conflicts(discrepancies)
+        if explained:
+            print(f"🔇 {len(explained)} conflicts explained by source offsets {self.offset_detector.offsets}")
+
+        # Alert on NEW conflicts only; sinks that failed get the conflict again next run
+        with self._stage("alert"):
+            new_conflicts = [
+                conflict for conflict in alertable
+                if conflict.get('conflict_id') and (
+                    conflict['conflict_id'] not in self.alerted_conflicts
+                    or conflict['conflict_id'] in self.pending_sinks
+                )
+            ]
+            all_sinks = set(self.notifier.names())
+            pending = [self.pending_sinks.get(conflict['conflict_id'], all_sinks) for conflict in new_conflicts]
+            delivered = self.notifier.notify_conflicts(new_conflicts, pending)
+
+            for conflict, wanted, sent in zip(new_conflicts, pending, delivered):
+                if not sent:
+                    continue
+                conflict_id = conflict['conflict_id']
+                missing = wanted - sent
+                if missing:
+                    self.pending_sinks[conflict_id] = missing
+                else:
+                    self.pending_sinks.pop(conflict_id, None)
+
+                kickoff_at = self.scheduler.get_kickoff_datetime(
+                    conflict.get('date', ''),
+                    next(iter(conflict['times'].values()))
+                ) or datetime.now()
+                self.alerted_conflicts.add(
+                    conflict_id, kickoff_at + timedelta(minutes=self.scheduler.grace_minutes)
+                )
+                print(f"📱 Alert sent for {conflict['home']} vs {conflict['away']} via {', '.join(sorted(sent))}"
+                      + (f" (retrying {', '.join(sorted(missing))})" if missing else ""))
+
+        # Print summary
+        print_summary(
+            len(flashscore_matches),
+            len(odibets_matches),
+            len(mozzartbet_matches),
+            len(betika_matches),
+            discrepancies
+        )
+
+        # Save conflicts (all of them, not just new ones)
+        with self._stage("save"):
             if discrepancies:
                 save_discrepancies(discrepancies)
 
-            # Calculate dynamic next run time based on matches
-            all_matches = flashscore_matches + odibets_matches + mozzartbet_matches + betika_matches
-            if all_matches:
-                # Find the match that needs scraping soonest
-                soonest_interval = float('inf')
-
-                for match in all_matches:
-                    match_key = scheduler.generate_match_key(
-                        match['home'],
-                        match['away'],
-                        match['date']
-                    )
-
-                    minutes_until = scheduler.parse_match_datetime(
-                        match['date'],
-                        match['kickoff']
-                    )
-
-                    should_scrape, next_in = scheduler.should_scrape(
-                        match_key,
-                        minutes_until,
-                        match.get('league', 'Football'),
-                        match['source']
-                    )
-
-                    if next_in < soonest_interval:
-                        soonest_interval = next_in
-
-                next_wait = max(1, min(soonest_interval, 30))  # Cap at 30 mins max
-            else:
-                next_wait = 20  # Fallback to 20 minutes
+        # Best price per outcome across bookmakers for every fixture at once
+        with self._stage("arbitrage"):
+            self.last_arbitrage = find_arbitrage(self.results, normalize_team_name)
+        print_arbitrage(self.last_arbitrage)
+
+        self.last_conflicts = discrepancies
+        self.last_run = datetime.now()
+        self.query_api.publish(self.comparison_cache.get('fixtures') or [], discrepancies, explained, self.last_run)
+
+        next_wait = self.next_wait(flashscore_matches + odibets_matches + mozzartbet_matches + betika_matches)
+
+        # Forget matches (and their alerts) that kicked off a while ago
+        self.scheduler.evict_expired()
+        for conflict_id in self.alerted_conflicts.expire():
+            self.pending_sinks.pop(conflict_id, None)
+        self.kickoff_tracker.evict_expired()
+        if self.run_count % PROFILE_CLEANUP_EVERY == 0:
+            cleanup_profiles()
+
+        if self.profiler:
+            self.profiler.end_run()
+
+        self.publish_status()
+        return next_wait
+
+    def observe_change_rates(self, fetched, moves):
+        """Feed this run's listings and kickoff moves into the change-rate estimator"""
+        now = self.scheduler.clock()
+        for source_name in fetched:
+            refreshed = self.fetched_leagues.get(source_name)
+            listings = {}
+            for match in self.results[source_name]:
+                if refreshed is None or match.get('league_id') in refreshed:
+                    league = self.scheduler.get_rate_key(match.get('league', 'Football'))
+                    listings[league] = listings.get(league, 0) + 1
+
+            changes = {}
+            for event in moves:
+                if event['source'] == source_name:
+                    league = self.scheduler.get_rate_key(event['league'])
+                    changes[league] = changes.get(league, 0) + 1
+
+            self.change_rates.observe_listings(source_name, listings, changes, now)
+        self.change_rates.save()
+
+    def next_wait(self, all_matches):
+        """
+        Calculate dynamic next run time (minutes) based on matches
+        Also sets next_leagues when only close-to-kickoff matches in targetable
+        leagues are due before the rest, so the next run stays small
+        """
+        self.next_leagues = None
+        if not all_matches:
+            return 20  # Fallback to 20 minutes
+
+        # Find the match that needs scraping soonest
+        soonest_interval = float('inf')
+        soonest_other = float('inf')
+        urgent_leagues = set()
+
+        minutes = [self.scheduler.parse_match_datetime(match['date'], match['kickoff']) for match in all_matches]
+
+        # Scale every interval to the target latency, stretched if the projected scrape rate is over budget
+        self.scheduler.plan_budget(
+            (minutes_until, match.get('league', 'Football'), match['source'])
+            for match, minutes_until in zip(all_matches, minutes)
+        )
+
+        for match, minutes_until in zip(all_matches, minutes):
+            match_key = self.scheduler.generate_match_key(
+                match['home'],
+                match['away'],
+                match['date']
+            )
+
+            league_id = match.get('league_id')
+            fetched = self.fetched_leagues.get(match['source'])
+
+            should_scrape, next_in = self.scheduler.should_scrape(
+                match_key,
+                minutes_until,
+                match.get('league', 'Football'),
+                match['source'],
+                kickoff_at=self.scheduler.get_kickoff_datetime(match['date'], match['kickoff']),
+                # A targeted run didn't refresh other leagues, so they keep their last scrape time
+                record=fetched is None or league_id in fetched
+            )
+
+            if next_in < soonest_interval:
+                soonest_interval = next_in
+
+            targetable = league_id is not None and any(league_id in urls for urls in SOURCE_LEAGUES.values())
+            if targetable and self.scheduler.get_time_category(minutes_until) in URGENT_CATEGORIES:
+                urgent_leagues.add(league_id)
+            elif next_in < soonest_other:
+                soonest_other = next_in
+
+        if urgent_leagues and soonest_interval < soonest_other:
+            self.next_leagues = urgent_leagues
+
+        return max(1, min(soonest_interval, 30))  # Cap at 30 mins max
+
+    def publish_status(self):
+        """
+        Build the health snapshot on the thread that runs the monitor. The
+        control endpoint reads it from its own thread while a run is changing
+        source_stats, backoff and change rates, so it never walks those itself;
+        the snapshot is replaced, never modified, like QueryApi.publish.
+        """
+        self.last_status = {
+            'run_count': self.run_count,
+            'last_run': self.last_run.strftime('%Y-%m-%d %H:%M:%S') if self.last_run else None,
+            'sources': {name: dict(stats) for name, stats in self.source_stats.items()},
+            'domain_backoff': dict(self.scheduler.domain_backoff),
+            'domain_failures': dict(self.scheduler.domain_failures),
+            'circuits': {name: breaker.status() for name, breaker in self.breakers.items()},
+            'offsets': dict(self.offset_detector.offsets),
+            'open_conflicts': len(self.last_conflicts),
+            'last_run_moves': len(self.last_moves),
+            'arbitrage_opportunities': len(self.last_arbitrage),
+            'tracked_matches': len(self.scheduler.last_scrape),
+            'next_leagues': sorted(self.next_leagues) if self.next_leagues else None,
+            'notifiers': self.notifier.names(),
+            'change_rates': self.change_rates.summary(),
+            'budget_scale': round(self.scheduler.budget_scale, 2),
+        }
+
+    def status(self):
+        """Monitor health as of the last finished run (a copy callers can add to)"""
+        return dict(self.last_status)
+
+
+def main_loop(profile=False, scrape_budget_per_hour=None, target_latency_minutes=None):
+    """
+    Main loop that runs with dynamic scheduling and Telegram alerts
+    With profile=True every run writes per-stage cProfile/tracemalloc output to profiling/
+    """
+    print("=" * 80)
+    print("⚽ KICKOFF TIME COMPARISON MONITOR - 4 SOURCES (DYNAMIC + TELEGRAM)")
+    print("=" * 80)
+
+    monitor = KickoffMonitor(profile=profile, scrape_budget_per_hour=scrape_budget_per_hour,
+                             target_latency_minutes=target_latency_minutes)
+
+    print(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+
+    while True:
+        try:
+            next_wait = monitor.run_once(leagues=monitor.next_leagues)
 
             next_run = datetime.now().timestamp() + (next_wait * 60)
             next_run_time = datetime.fromtimestamp(next_run)
@@ -417,15 +925,19 @@ def main_loop():
             time.sleep(5 * 60)
 
 
-def quick_test():
-    """Run one comparison immediately"""
+def quick_test(max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+    """Run one comparison immediately (max_age_seconds=0 forces live fetches)"""
     print("🔧 QUICK TEST MODE - 4 SOURCES")
     print("=" * 60)
 
-    flashscore_matches = safe_get_matches(get_flashscore_matches, "Flashscore")
-    odibets_matches = safe_get_matches(fetch_odibets_matches, "Odibets")
-    mozzartbet_matches = safe_get_matches(fetch_mozzartbet_matches, "MozzartBet")
-    betika_matches = safe_get_matches(fetch_betika_matches, "Betika")
+    # Listings fetched in the last few minutes (by the monitor or another check) are reused
+    cache = ResultCache()
+    fetch = partial(safe_get_matches, cache=cache, max_age_seconds=max_age_seconds)
+
+    flashscore_matches = fetch(get_flashscore_matches, "Flashscore")
+    odibets_matches = fetch(fetch_odibets_matches, "Odibets")
+    mozzartbet_matches = fetch(fetch_mozzartbet_matches, "MozzartBet")
+    betika_matches = fetch(fetch_betika_matches, "Betika")
 
     discrepancies = compare_all_sources(flashscore_matches, odibets_matches, mozzartbet_matches, betika_matches)
 
@@ -442,6 +954,26 @@ def quick_test():
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Kickoff time comparison system")
+    parser.add_argument('--daemon', action='store_true', help="run unattended with a local control endpoint")
+    parser.add_argument('--host', default="127.0.0.1", help="control endpoint host (daemon mode)")
+    parser.add_argument('--port', type=int, default=8765, help="control endpoint port (daemon mode)")
+    parser.add_argument('--profile', action='store_true', help="write cProfile/tracemalloc output per run stage")
+    parser.add_argument('--scrape-budget', type=float, default=None,
+                        help="cap on projected match scrapes per hour (intervals stretch to fit)")
+    parser.add_argument('--target-latency', type=float, default=None,
+                        help="mean minutes from a kickoff change to detecting it (intervals scale to fit)")
+    args = parser.parse_args()
+
+    if args.daemon:
+        from daemon import run_daemon
+
+        run_daemon(args.host, args.port, profile=args.profile, scrape_budget_per_hour=args.scrape_budget,
+                   target_latency_minutes=args.target_latency)
+        raise SystemExit(0)
+
     print("⚽ KICKOFF TIME COMPARISON SYSTEM - 4 BOOKMAKERS")
     print("=" * 60)
     print("1. Run once (quick test)")
@@ -453,7 +985,8 @@ if __name__ == "__main__":
     if choice == "1":
         quick_test()
     elif choice == "2":
-        main_loop()
+        main_loop(profile=args.profile, scrape_budget_per_hour=args.scrape_budget,
+                  target_latency_minutes=args.target_latency)
     elif choice == "3":
         try:
             minutes = int(input("Enter interval in minutes: "))
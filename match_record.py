@@ -0,0 +1,151 @@
+# match_record.py - COMPACT MATCH RECORDS WITH INTERNED NAMES
+# Interned team/league/source names are shared by every run's records
+MAX_INTERNED_NAMES = 50000
+
+
+class NameTable:
+    """
+    One shared string object per distinct name (team, league, date, ...), kept
+    across runs, so a daemon re-reading the same fixtures every few minutes
+    holds each name once instead of once per match per run. Cleared when it
+    grows past max_names (names of long-finished fixtures stop being shared).
+    """
+
+    def __init__(self, max_names=MAX_INTERNED_NAMES):
+        self.max_names = max_names
+        self.names = {}
+
+    def intern(self, value):
+        if value.__class__ is not str:
+            return value
+        name = self.names.get(value)
+        if name is None:
+            if len(self.names) >= self.max_names:
+                self.names.clear()
+            name = self.names[value] = value
+        return name
+
+    def __len__(self):
+        return len(self.names)
+
+
+NAMES = NameTable()
+
+
+class Match:
+    """
+    One normalized listing from one source. Reads like the dicts it replaces
+    (match['home'], match.get('odds'), dict(match), 'kickoff' in match) so the
+    comparer and everything downstream take either; to_dict() for JSON.
+    """
+
+    __slots__ = ('home', 'away', 'kickoff', 'league', 'league_id', 'date', 'odds', 'source', 'offset_corrected')
+
+    # Only present as a key once set (by auto-correct)
+    OPTIONAL = ('offset_corrected',)
+
+    def __init__(self, home, away, kickoff, league, league_id, date, odds=None, source=None, names=NAMES):
+        intern = names.intern
+        self.home = intern(home)
+        self.away = intern(away)
+        self.kickoff = intern(kickoff)
+        self.league = intern(league)
+        self.league_id = league_id
+        self.date = intern(date)
+        self.odds = odds
+        self.source = intern(source)
+        self.offset_corrected = None
+
+    def __getitem__(self, key):
+        try:
+            value = getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+        if value is None and key in self.OPTIONAL:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        try:
+            setattr(self, key, value)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__ and not (key in self.OPTIONAL and getattr(self, key) is None)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key in self.__slots__ if key in self]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, Match):
+            return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+        return isinstance(other, dict) and self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Match({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, key) for key in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+
+# Quick test
+if __name__ == "__main__":
+    import json
+    import sys
+    import time
+    import tracemalloc
+
+    def raw(n):
+        # Fresh string objects every run, as a scraper's parse produces them
+        return [{'home': ''.join(['Home ', str(i % 400)]), 'away': ''.join(['Away ', str(i % 400)]),
+                 'kickoff': ''.join([str(12 + i % 10), ':30']), 'league': ''.join(['League ', str(i % 30)]),
+                 'date': '20/02', 'odds': None} for i in range(n)]
+
+    def as_dict(m):
+        return {'home': m['home'], 'away': m['away'], 'kickoff': m['kickoff'], 'league': m['league'],
+                'league_id': None, 'date': m['date'], 'odds': m['odds'], 'source': 'Betika'}
+
+    def as_record(m):
+        return Match(m['home'], m['away'], m['kickoff'], m['league'], None, m['date'], m['odds'], 'Betika')
+
+    for label, build in (("dict", as_dict), ("Match", as_record)):
+        rows = raw(20000)
+        tracemalloc.start()
+        started = time.perf_counter()
+        built = [build(m) for m in rows]
+        elapsed = time.perf_counter() - started
+        del rows
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"📦 {label:<5} 20000 matches: {current / 1024:>7.0f} KiB retained, {elapsed * 1000:.1f} ms")
+
+    match = built[0]
+    match['kickoff'] = '13:30'
+    assert match['kickoff'] == '13:30' and 'offset_corrected' not in match and match.get('nope', 1) == 1
+    assert dict(match) == match.to_dict() == match and json.loads(json.dumps(match.to_dict()))['home'] == 'Home 0'
+    print(f"✅ mapping checks pass, {len(NAMES)} interned names, Match is {sys.getsizeof(match)} bytes")
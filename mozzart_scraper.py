@@ -1,13 +1,34 @@
 # mozzartbet_scraper.py - UPDATED WITH TIMEOUT FIXES
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from datetime import datetime, timedelta
-import time
 import re
 import json
 
+from browser import (
+    build_firefox_options, browser_session, dismiss_popup, get_profile, load_page,
+    BudgetExceeded, LOAD_RETRY_BACKOFF_SECONDS
+)
+from arbitrage import parse_1x2
+from result_cache import cached_fetch
+from page_tokenizer import PageGrammar, iter_rows
+from fixture_index import local_kickoff_date, weekday_date
+
+SOCCER_URL = "https://www.mozzartbet.co.ke/en#/betting/?sid=1"
+
+# League pages for targeted fetches, keyed by canonical league ID (see leagues.py).
+# MozzartBet addresses competitions by numeric ids in the hash route; add them
+# here once known, until then targeted fetches load the full listing.
+LEAGUE_URLS = {}
+
+# The page is slow: longer page loads, and a bigger share of the run than the other sources
+PAGE_LOAD_TIMEOUT = 90
+FETCH_BUDGET_SECONDS = 180
+
+# "Thu 23:00|11722" starts each fixture; the line before it names the league
+PAGE_GRAMMAR = PageGrammar(r'([A-Za-z]+ \d{2}:\d{2})\|(\d+)')
+KICKOFF_PATTERN = re.compile(r'(\d{2}:\d{2})')
+
 
 def convert_to_kenya_time(time_str):
     """
@@ -22,160 +43,134 @@ def convert_to_kenya_time(time_str):
         return time_str
 
 
-def fetch_mozzartbet_matches(headless=True, max_retries=3):
+def iter_mozzartbet_matches(text):
+    """
+    Yield MozzartBet matches from the body text (or its lines) as they are parsed:
+    league line, "Thu 23:00|11722" header, home, away, then 1X2 odds
+    """
+    for row in iter_rows(text, PAGE_GRAMMAR):
+        # Teams are in the 2 lines after the header
+        if len(row['teams']) < 2:
+            continue
+        home, away = row['teams']
+
+        # Validate we have real team names
+        if home == away or len(home) <= 2 or len(away) <= 2:
+            continue
+
+        # Extract day and time ("Thu 23:00": the next Thursday, today included)
+        time_match = KICKOFF_PATTERN.search(row['header'].group(1))
+        gmt_time = time_match.group(1) if time_match else "00:00"
+        gmt_date = weekday_date(row['header'].group(1).split()[0])
+
+        # CONVERT TO KENYA TIME (a late GMT kickoff is on the next day in Kenya)
+        kenya_time = convert_to_kenya_time(gmt_time)
+        date = local_kickoff_date(gmt_date, gmt_time, kenya_time)
+
+        # Print in Odibets style with fixed width columns
+        print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{date}]")
+        yield {
+            'home': home,
+            'away': away,
+            'kickoff': kenya_time,  # KENYA TIME
+            'date': date,
+            # Clean up league name (capitalize properly)
+            'league': row['league'].title(),
+            'bookie': 'MozzartBet',
+            'odds': parse_1x2(row['odds'])
+        }
+
+
+def parse_mozzartbet_lines(lines):
+    """All matches in the body text (or its lines)"""
+    return list(iter_mozzartbet_matches(lines))
+
+
+def fetch_mozzartbet_matches(headless=True, max_retries=3, fingerprint=None, leagues=None,
+                             budget_seconds=FETCH_BUDGET_SECONDS):
     """
     Fetch football matches from MozzartBet with KENYA TIMEZONE
-    Includes timeout handling and retry logic
+    Load errors and empty pages are retried in the same browser session, all
+    within `budget_seconds`; when the budget runs out the fetch gives up with []
+    If a SourceFingerprint is given and the page text is unchanged, the previous parse is reused
+    `leagues` is accepted for a targeted fetch, but without LEAGUE_URLS the full listing is loaded
     """
 
     print("=" * 70)
     print("⚽ FETCHING MOZZARTBET KENYA FOOTBALL MATCHES")
     print("=" * 70)
 
-    options = Options()
-    if headless:
-        options.add_argument("--headless")
+    missing = sorted(league for league in leagues or () if league not in LEAGUE_URLS)
+    if missing:
+        print(f"⚠️ No league page configured for {missing}, loading full listing")
 
-    options.add_argument("--width=1920")
-    options.add_argument("--height=1080")
-    options.set_preference("dom.webnotifications.enabled", False)
+    options = build_firefox_options(headless)
+    profile = get_profile("mozzartbet")
 
     # Set longer timeouts
     options.set_preference("pageLoadStrategy", "normal")  # Wait for full page load
 
-    for attempt in range(max_retries):
-        driver = None
-        try:
-            print(f"\n📡 Attempt {attempt + 1}/{max_retries} - Loading MozzartBet football page...")
-
-            driver = webdriver.Firefox(options=options)
-            driver.set_page_load_timeout(180)  # 3 minutes timeout
-
-            # Try loading with retry
-            football_url = "https://www.mozzartbet.co.ke/en#/betting/?sid=1"
-            driver.get(football_url)
-
-            # Wait for page to stabilize
-            time.sleep(10)
-
-            # Handle popup
-            try:
-                cancel_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Cancel')]")
-                cancel_btn.click()
-                print("✅ Closed notification popup")
-                time.sleep(2)
-            except:
-                pass
-
-            # Scroll to load matches
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(2)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
-
-            # Get all text
-            page_text = driver.find_element(By.TAG_NAME, "body").text
-            lines = page_text.split('\n')
-
-            print(f"\n📦 Scanning {len(lines)} lines for match containers...")
-
-            matches = []
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-
-                # Look for date+time pattern with match ID (e.g., "Thu 23:00|11722")
-                match_header = re.search(r'([A-Za-z]+ \d{2}:\d{2})\|(\d+)', line)
-
-                if match_header:
-                    datetime_str = match_header.group(1)
-                    match_id = match_header.group(2)
-
-                    # Extract time
-                    time_match = re.search(r'(\d{2}:\d{2})', datetime_str)
-                    gmt_time = time_match.group(1) if time_match else "00:00"
-
-                    # CONVERT TO KENYA TIME
-                    kenya_time = convert_to_kenya_time(gmt_time)
-
-                    # Get today's date in DD/MM format
-                    today = datetime.now().strftime('%d/%m')
-
-                    # League is usually in the previous line
-                    league = "Football"
-                    if i > 0 and lines[i - 1].strip():
-                        league = lines[i - 1].strip()
-                        # Clean up league name (capitalize properly)
-                        league = league.title()
-
-                    # Teams are in the next 2 lines
-                    home = "Unknown"
-                    away = "Unknown"
-
-                    if i + 1 < len(lines):
-                        home = lines[i + 1].strip()
-                    if i + 2 < len(lines):
-                        away = lines[i + 2].strip()
-
-                    # Validate we have real team names
-                    if home and away and home != away and len(home) > 2 and len(away) > 2:
-                        # Clean team names
-                        home = home.strip()
-                        away = away.strip()
-
-                        match = {
-                            'home': home,
-                            'away': away,
-                            'kickoff': kenya_time,  # KENYA TIME
-                            'date': today,
-                            'league': league,
-                            'bookie': 'MozzartBet'
-                        }
-                        matches.append(match)
-
-                        # Print in Odibets style with fixed width columns
-                        print(f"✅ {home:30} vs {away:30} @ {kenya_time} [{today}]")
-
-                        # Skip ahead past the odds
-                        i += 5
-                        continue
-
-                i += 1
-
-            print(f"\n📊 Total matches found: {len(matches)}")
-
-            # If we got here, success! Return matches
-            if matches or attempt == max_retries - 1:
-                return matches
-            else:
-                print(f"⏳ No matches found on attempt {attempt + 1}, retrying...")
-                time.sleep(5)
-
-        except TimeoutException:
-            print(f"⏱️ Timeout on attempt {attempt + 1}")
-            if attempt == max_retries - 1:
-                print("❌ Max retries reached. Returning empty list.")
-                return []
-            time.sleep(10)
-
-        except WebDriverException as e:
-            print(f"⚠️ WebDriver error on attempt {attempt + 1}: {e}")
-            if attempt == max_retries - 1:
-                print("❌ Max retries reached. Returning empty list.")
-                return []
-            time.sleep(10)
-
-        except Exception as e:
-            print(f"❌ Unexpected error on attempt {attempt + 1}: {e}")
-            if attempt == max_retries - 1:
-                return []
-            time.sleep(10)
-
-        finally:
-            if driver:
-                driver.quit()
+    try:
+        with browser_session(headless, budget_seconds, page_load_timeout=PAGE_LOAD_TIMEOUT,
+                             options=options, profile=profile) as (driver, budget):
+            for attempt in range(max_retries):
+                print(f"\n📡 Attempt {attempt + 1}/{max_retries} - Loading MozzartBet football page...")
+                # One retry loop for load errors and empty pages alike: at most max_retries loads
+                try:
+                    load_page(driver, SOCCER_URL, budget, attempts=1,
+                              page_load_timeout=PAGE_LOAD_TIMEOUT, reload=attempt > 0)
+                except (TimeoutException, WebDriverException):
+                    if attempt == max_retries - 1:
+                        raise
+                    budget.sleep(LOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                    continue
+
+                # Wait for page to stabilize
+                budget.sleep(10)
+
+                # Handle popup
+                dismiss_popup(driver, "//button[contains(text(), 'Cancel')]", "✅ Closed notification popup", profile,
+                              budget=budget)
+
+                # Scroll to load matches
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                budget.sleep(3)
+                driver.execute_script("window.scrollTo(0, 0);")
+                budget.sleep(2)
+                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                budget.sleep(3)
+
+                # Get all text
+                page_text = driver.find_element(By.TAG_NAME, "body").text
+
+                # Weekday headers are dated from today, so a new day is new content
+                if fingerprint is not None and fingerprint.check(datetime.now().strftime('%d/%m') + page_text):
+                    print("♻️ Page unchanged since last run, reusing previous matches")
+                    return fingerprint.previous_matches()
+
+                line_count = page_text.count('\n') + 1
+                print(f"\n📦 Scanning {line_count} lines for match containers...")
+
+                matches = parse_mozzartbet_lines(page_text)
+
+                print(f"\n📊 Total matches found: {len(matches)}")
+                if fingerprint is not None:
+                    fingerprint.update(matches)
+
+                if matches or attempt == max_retries - 1:
+                    return matches
+
+                print(f"⏳ No matches found on attempt {attempt + 1}, reloading...")
+                budget.sleep(LOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    except BudgetExceeded as e:
+        print(f"⌛ MozzartBet: {e}, giving up")
+    except TimeoutException:
+        print("⏱️ Timeout, max retries reached. Returning empty list.")
+    except WebDriverException as e:
+        print(f"⚠️ WebDriver error, max retries reached: {e}")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
 
     return []
 
@@ -207,7 +202,7 @@ def quick_test():
     print("🔧 TESTING MOZZARTBET FOOTBALL SCRAPER")
     print("-" * 50)
 
-    matches = fetch_mozzartbet_matches(headless=False, max_retries=3)
+    matches = cached_fetch("MozzartBet", lambda: fetch_mozzartbet_matches(headless=False, max_retries=3))
 
     if matches:
         print(f"\n✅ MozzartBet: {len(matches)} valid matches with kickoff times")
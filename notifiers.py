@@ -0,0 +1,250 @@
+# notifiers.py - ALERT SINKS WITH CONCURRENT FAN-OUT
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import json
+import shutil
+import subprocess
+import threading
+
+import requests
+
+import config
+from kickoff_tracker import move_times
+from telegram_alert import TelegramAlert
+
+
+class Notifier:
+    """
+    One alert channel. Sinks get a whole batch per run and return one
+    delivered flag per alert; override send_conflict/send_move for
+    one-at-a-time channels or send_conflicts/send_moves to batch.
+    """
+
+    name = "notifier"
+
+    def send_conflict(self, conflict):
+        raise NotImplementedError
+
+    def send_move(self, event):
+        raise NotImplementedError
+
+    def send_conflicts(self, conflicts):
+        return [self.send_conflict(conflict) for conflict in conflicts]
+
+    def send_moves(self, events):
+        return [self.send_move(event) for event in events]
+
+
+class DesktopNotifier(Notifier):
+    """notify-send run directly (no shell), a few alerts per run at most"""
+
+    name = "desktop"
+
+    def __init__(self, command="notify-send", max_per_batch=3, timeout=5):
+        self.command = shutil.which(command)
+        self.max_per_batch = max_per_batch
+        self.timeout = timeout
+
+    def _notify(self, title, body):
+        if not self.command:
+            return False
+        try:
+            result = subprocess.run([self.command, title, body], timeout=self.timeout,
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return result.returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    def send_conflict(self, conflict):
+        times_str = ' vs '.join(f"{s}:{t}" for s, t in conflict['times'].items())
+        return self._notify("🚨 Time Conflict", f"{conflict['home']} vs {conflict['away']}: {times_str}")
+
+    def send_move(self, event):
+        return self._notify("🔀 Kickoff Moved", f"{event['home']} vs {event['away']} ({event['source']}): "
+                                               f"{' -> '.join(move_times(event))}")
+
+    def send_conflicts(self, conflicts):
+        """
+        At most max_per_batch popups, then one summary for the rest. Those are
+        skipped on purpose and count as delivered, so they aren't retried as
+        failures; False is only a notify-send that failed.
+        """
+        shown = [self.send_conflict(conflict) for conflict in conflicts[:self.max_per_batch]]
+        skipped = len(conflicts) - len(shown)
+        if skipped:
+            self._notify("🚨 Time Conflicts", f"...and {skipped} more this run")
+        return shown + [True] * skipped
+
+
+class WebhookNotifier(Notifier):
+    """POST each alert as JSON ({'type': 'conflict'|'move', ...})"""
+
+    name = "webhook"
+
+    def __init__(self, url, timeout=10):
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, kind, payload):
+        try:
+            response = requests.post(self.url, json={'type': kind, **payload}, timeout=self.timeout)
+            return 200 <= response.status_code < 300
+        except Exception as e:
+            print(f"❌ Webhook exception: {e}")
+            return False
+
+    def send_conflict(self, conflict):
+        return self._post('conflict', conflict)
+
+    def send_move(self, event):
+        return self._post('move', event)
+
+
+class FileNotifier(Notifier):
+    """Append each alert as one JSON line"""
+
+    name = "file"
+
+    def __init__(self, path="alerts.jsonl"):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def _append(self, kind, items):
+        sent_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lines = ''.join(json.dumps({'type': kind, 'sent_at': sent_at, **item}) + '\n' for item in items)
+        try:
+            with self.lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            return [True] * len(items)
+        except OSError as e:
+            print(f"❌ Could not write alerts to {self.path}: {e}")
+            return [False] * len(items)
+
+    def send_conflicts(self, conflicts):
+        return self._append('conflict', conflicts)
+
+    def send_moves(self, events):
+        return self._append('move', events)
+
+
+class TelegramNotifier(Notifier):
+    """The existing Telegram bot as a sink"""
+
+    name = "telegram"
+
+    def __init__(self, telegram_alert=None):
+        self.telegram_alert = telegram_alert or TelegramAlert()
+
+    def send_conflict(self, conflict):
+        return self.telegram_alert.send_alert(conflict)
+
+    def send_move(self, event):
+        return self.telegram_alert.send_move_alert(event)
+
+
+class NotifierDispatcher:
+    """
+    Sends each batch to every sink at once on a thread pool, so a slow
+    channel adds its own latency once instead of on top of the others.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, len(self.sinks)), thread_name_prefix="notifier")
+
+    def _fan_out(self, method, items, pending=None):
+        """
+        Names of the sinks that delivered each item. pending (one set of sink
+        names per item) sends an item only to those sinks, for retries.
+        """
+        delivered = [set() for _ in items]
+        if not items or not self.sinks:
+            return delivered
+
+        futures = []
+        for sink in self.sinks:
+            indexes = [i for i in range(len(items)) if pending is None or sink.name in pending[i]]
+            if indexes:
+                batch = [items[i] for i in indexes]
+                futures.append((sink.name, indexes, self.pool.submit(getattr(sink, method), batch)))
+
+        for name, indexes, future in futures:
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"❌ {name} notifier failed: {e}")
+                continue
+            for i, result in zip(indexes, results):
+                if result:
+                    delivered[i].add(name)
+
+        return delivered
+
+    def notify_conflicts(self, conflicts, pending=None):
+        """Per conflict, the set of sinks that delivered it (pending: sinks still owed each one)"""
+        return self._fan_out('send_conflicts', list(conflicts), pending)
+
+    def notify_moves(self, events):
+        """Per move, True if any sink delivered it (moves aren't retried)"""
+        return [bool(names) for names in self._fan_out('send_moves', list(events))]
+
+    def names(self):
+        return [sink.name for sink in self.sinks]
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+
+def default_sinks():
+    """
+    Telegram and desktop as before, plus a webhook and/or file sink when
+    ALERT_WEBHOOK_URL / ALERT_FILE are set in config.py
+    """
+    sinks = [TelegramNotifier()]
+
+    desktop = DesktopNotifier()
+    if desktop.command:
+        sinks.append(desktop)
+
+    webhook_url = getattr(config, 'ALERT_WEBHOOK_URL', None)
+    if webhook_url:
+        sinks.append(WebhookNotifier(webhook_url))
+
+    alert_file = getattr(config, 'ALERT_FILE', None)
+    if alert_file:
+        sinks.append(FileNotifier(alert_file))
+
+    return sinks
+
+
+# Quick test
+if __name__ == "__main__":
+    import time
+
+    class SlowSink(Notifier):
+        def __init__(self, name, ok=True):
+            self.name = name
+            self.ok = ok
+
+        def send_conflict(self, conflict):
+            time.sleep(1)
+            return self.ok
+
+    conflict = {
+        'home': 'Manchester United', 'away': "Nott'm \"Forest\"; rm -rf", 'league': 'Premier League',
+        'date': '20/02', 'times': {'Flashscore': '17:30', 'Betika': '20:30'},
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+    sinks = [SlowSink("slow1"), SlowSink("slow2", ok=False), FileNotifier("alerts_selftest.jsonl"), DesktopNotifier()]
+    dispatcher = NotifierDispatcher(sinks)
+    started = time.perf_counter()
+    delivered = dispatcher.notify_conflicts([conflict])
+    print(f"📊 {len(dispatcher.sinks)} sinks ({', '.join(dispatcher.names())}) in {time.perf_counter() - started:.2f}s, delivered={delivered}")
+
+    # Next run only the failed sink gets it again
+    started = time.perf_counter()
+    retried = dispatcher.notify_conflicts([conflict], [{"slow2"}])
+    assert retried == [set()] and "slow1" in delivered[0] and "slow2" not in delivered[0]
+    print(f"✅ retry sent to slow2 only in {time.perf_counter() - started:.2f}s")
+    dispatcher.close()
@@ -1,98 +1,144 @@
 # odibets_scraper.py
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
 from datetime import datetime
-import time
 import re
 import json
 
+from browser import browser_session, dismiss_popup, get_profile, load_page, BudgetExceeded, FETCH_BUDGET_SECONDS
+from arbitrage import parse_1x2
+from result_cache import cached_fetch
+from leagues import league_name
 
-def fetch_odibets_matches(headless=True):
+SOCCER_URL = "https://www.odibets.com/sports/soccer"
+
+# League pages for targeted fetches, keyed by canonical league ID (see leagues.py)
+LEAGUE_URLS = {
+    'ENG-PL': "https://www.odibets.com/sports/soccer/england/premier-league",
+    'ENG-CH': "https://www.odibets.com/sports/soccer/england/championship",
+    'ENG-FAC': "https://www.odibets.com/sports/soccer/england/fa-cup",
+    'ESP-LL': "https://www.odibets.com/sports/soccer/spain/laliga",
+    'GER-BL': "https://www.odibets.com/sports/soccer/germany/bundesliga",
+    'ITA-SA': "https://www.odibets.com/sports/soccer/italy/serie-a",
+    'FRA-L1': "https://www.odibets.com/sports/soccer/france/ligue-1",
+    'UEFA-CL': "https://www.odibets.com/sports/soccer/international-clubs/uefa-champions-league",
+    'UEFA-EL': "https://www.odibets.com/sports/soccer/international-clubs/uefa-europa-league",
+}
+
+
+def parse_odibets_containers(match_containers, league='Football'):
+    """
+    Parse Odibets a.t match containers: div.t-l team names,
+    "DD/MM HH:MM" in div.t-m span.font-bold, and the 1X2 prices
+    """
+    matches = []
+
+    for container in match_containers:
+        try:
+            # Get all divs with class "t-l" (team names)
+            team_divs = container.find_elements(By.CSS_SELECTOR, "div.t-l")
+
+            if len(team_divs) >= 2:
+                home = team_divs[0].text.strip()
+                away = team_divs[1].text.strip()
+
+                # Find time element (inside t-m div with font-bold span)
+                try:
+                    time_element = container.find_element(By.CSS_SELECTOR, "div.t-m span.font-bold")
+                    time_text = time_element.text.strip()
+
+                    # Parse date and time (format: "16/02 23:00")
+                    time_match = re.search(r'(\d{2}/\d{2})\s+(\d{2}:\d{2})', time_text)
+                    if time_match:
+                        date = time_match.group(1)
+                        kickoff = time_match.group(2)
+
+                        # 1X2 prices are the decimal numbers after the teams in the container
+                        odds = parse_1x2(re.findall(r'\b\d+\.\d{2}\b', container.text))
+
+                        match = {
+                            'home': home,
+                            'away': away,
+                            'kickoff': kickoff,
+                            'date': date,
+                            'league': league,
+                            'bookie': 'Odibets',
+                            'datetime': f"{datetime.now().year}-{date.replace('/', '-')} {kickoff}",
+                            'odds': odds
+                        }
+                        matches.append(match)
+                        print(f"✅ {home:30} vs {away:30} @ {kickoff} [{date}]")
+                except:
+                    continue
+
+        except Exception as e:
+            continue
+
+    return matches
+
+
+def fetch_odibets_matches(headless=True, fingerprint=None, leagues=None, budget_seconds=FETCH_BUDGET_SECONDS):
     """
     Fetch football matches from Odibets - HEADLESS VERSION
     Based on the actual HTML structure with a.t elements
+    If a SourceFingerprint is given and the container list is unchanged, the previous parse is reused
+    With `leagues`, only those leagues' pages are loaded (see LEAGUE_URLS)
+    Loads (retried in the same browser) and waits share one `budget_seconds` time budget
     """
 
     print("=" * 70)
     print("⚽ FETCHING ODIBETS MATCHES")
     print("=" * 70)
 
-    options = Options()
-    if headless:
-        options.add_argument("--headless")
-
-    options.add_argument("--width=1920")
-    options.add_argument("--height=1080")
+    missing = sorted(league for league in leagues or () if league not in LEAGUE_URLS)
+    if missing:
+        print(f"⚠️ No league page configured for {missing}, loading full listing")
+    pages = [(LEAGUE_URLS[league], league_name(league)) for league in sorted(leagues)] if leagues and not missing else []
+    if pages:
+        # A partial page says nothing about the full listing's fingerprint
+        fingerprint = None
 
-    driver = webdriver.Firefox(options=options)
     matches = []
+    profile = get_profile("odibets")
 
     try:
-        print("\n📡 Loading Odibets soccer page...")
-        driver.get("https://www.odibets.com/sports/soccer")
-        time.sleep(5)
-
-        # Close popup if exists
-        try:
-            close_btn = driver.find_element(By.XPATH, "//button[contains(text(), 'Cancel')]")
-            driver.execute_script("arguments[0].click();", close_btn)
-            print("✅ Popup closed")
-            time.sleep(2)
-        except:
-            pass
-
-        # Find all match containers (a tags with class "t")
-        match_containers = driver.find_elements(By.CSS_SELECTOR, "a.t")
-        print(f"📦 Found {len(match_containers)} match containers")
-
-        for container in match_containers:
-            try:
-                # Get all divs with class "t-l" (team names)
-                team_divs = container.find_elements(By.CSS_SELECTOR, "div.t-l")
-
-                if len(team_divs) >= 2:
-                    home = team_divs[0].text.strip()
-                    away = team_divs[1].text.strip()
-
-                    # Find time element (inside t-m div with font-bold span)
-                    try:
-                        time_element = container.find_element(By.CSS_SELECTOR, "div.t-m span.font-bold")
-                        time_text = time_element.text.strip()
-
-                        # Parse date and time (format: "16/02 23:00")
-                        time_match = re.search(r'(\d{2}/\d{2})\s+(\d{2}:\d{2})', time_text)
-                        if time_match:
-                            date = time_match.group(1)
-                            kickoff = time_match.group(2)
-
-                            match = {
-                                'home': home,
-                                'away': away,
-                                'kickoff': kickoff,
-                                'date': date,
-                                'league': 'Football',
-                                'bookie': 'Odibets',
-                                'datetime': f"{datetime.now().year}-{date.replace('/', '-')} {kickoff}"
-                            }
-                            matches.append(match)
-                            print(f"✅ {home:30} vs {away:30} @ {kickoff} [{date}]")
-                    except:
-                        continue
-
-            except Exception as e:
-                continue
+        with browser_session(headless, budget_seconds, profile=profile) as (driver, budget):
+            for n, (url, league) in enumerate(pages or [(SOCCER_URL, 'Football')]):
+                print(f"\n📡 Loading Odibets {'league' if pages else 'soccer'} page: {url}")
+                load_page(driver, url, budget)
+                budget.sleep(5 if n == 0 else 3)
+
+                # Close popup if exists
+                if n == 0:
+                    dismiss_popup(driver, "//button[contains(text(), 'Cancel')]", "✅ Popup closed", profile,
+                                  js_click=True, budget=budget)
+
+                # One round trip for the text of every container, much cheaper than parsing them
+                if fingerprint is not None:
+                    containers_text = driver.execute_script(
+                        "return Array.from(document.querySelectorAll('a.t')).map(e => e.innerText).join('\\n');"
+                    )
+                    if fingerprint.check(containers_text or ''):
+                        print("♻️ Match list unchanged since last run, reusing previous matches")
+                        return fingerprint.previous_matches()
+
+                # Find all match containers (a tags with class "t")
+                match_containers = driver.find_elements(By.CSS_SELECTOR, "a.t")
+                print(f"📦 Found {len(match_containers)} match containers")
+
+                matches.extend(parse_odibets_containers(match_containers, league))
 
         print(f"\n📊 Total matches found: {len(matches)}")
+        if fingerprint is not None:
+            fingerprint.update(matches)
         return matches
 
+    except BudgetExceeded as e:
+        print(f"⌛ Odibets: {e}, giving up")
+        return []
     except Exception as e:
         print(f"❌ Error: {e}")
         return []
 
-    finally:
-        driver.quit()
-
 
 def save_matches(matches, filename=None):
     """Save matches to JSON file"""
@@ -144,7 +190,7 @@ def quick_test():
     print("🔧 QUICK TEST - ODIBETS SCRAPER")
     print("-" * 50)
 
-    matches = fetch_odibets_matches(headless=True)
+    matches = cached_fetch("Odibets", lambda: fetch_odibets_matches(headless=True))
 
     if matches:
         display_matches(matches)
@@ -0,0 +1,232 @@
+# offset_detector.py - SYSTEMATIC TIMEZONE OFFSET DETECTION
+from collections import Counter, OrderedDict
+import json
+import os
+
+
+def time_to_minutes(time_str):
+    """Convert 'HH:MM' to minutes since midnight (None if unparseable)"""
+    try:
+        hour, minute = map(int, time_str.split(':'))
+        return hour * 60 + minute
+    except (AttributeError, ValueError):
+        return None
+
+
+def time_offset_minutes(time_str, reference_str):
+    """
+    Signed difference time - reference in minutes, wrapped into [-720, 720)
+    so that 01:00 vs 22:00 is +180 and not -1260
+    """
+    t = time_to_minutes(time_str)
+    ref = time_to_minutes(reference_str)
+    if t is None or ref is None:
+        return None
+    return ((t - ref + 720) % 1440) - 720
+
+
+def shift_time(time_str, minutes):
+    """Shift an 'HH:MM' string by a number of minutes (wraps around midnight)"""
+    t = time_to_minutes(time_str)
+    if t is None:
+        return time_str
+    t = (t + minutes) % 1440
+    return f"{t // 60:02d}:{t % 60:02d}"
+
+
+def conflict_deviations(conflict):
+    """
+    Work out how far each source is from the consensus of the others.
+    With 3+ sources the majority time is the reference; with 2 sources
+    each side is recorded against the other and the evidence across many
+    conflicts decides who is wrong.
+    Returns (source, offset_minutes, partner_sources, weight) tuples.
+    """
+    times = conflict.get('times', {})
+    if len(times) < 2:
+        return []
+
+    counts = Counter(times.values())
+    majority, majority_count = counts.most_common(1)[0]
+    deviations = []
+
+    if len(times) >= 3 and majority_count > len(times) / 2:
+        partners = tuple(sorted(s for s, t in times.items() if t == majority))
+        for source, time_str in times.items():
+            if time_str != majority:
+                offset = time_offset_minutes(time_str, majority)
+                if offset:
+                    deviations.append((source, offset, partners, 2))
+    elif len(times) == 2:
+        (a, time_a), (b, time_b) = times.items()
+        offset = time_offset_minutes(time_a, time_b)
+        if offset:
+            deviations.append((a, offset, (b,), 1))
+            deviations.append((b, -offset, (a,), 1))
+
+    return deviations
+
+
+def fixture_key(conflict):
+    """One key per fixture, whatever run (or log entry) the conflict came from"""
+    return f"{conflict.get('home', '')}|{conflict.get('away', '')}|{conflict.get('date', '')}".lower()
+
+
+class OffsetDetector:
+    """
+    Detects sources that are off by a constant amount (usually +/-3h timezone bugs)
+    across many conflicts at once, and suppresses alerts the offset explains.
+    Each fixture counts once however many runs report it, and an offset needs
+    at least min_fixtures different fixtures behind it.
+    """
+
+    def __init__(self, window=500, min_samples=5, min_ratio=0.6, min_partners=2, min_fixtures=5,
+                 auto_correct=False):
+        # fixture -> its latest deviations; only the most recent `window` fixtures
+        # count, so a fixed source un-flags itself
+        self.window = window
+        self.observations = OrderedDict()
+        self.min_samples = min_samples
+        self.min_ratio = min_ratio
+        self.min_partners = min_partners
+        self.min_fixtures = min_fixtures
+        self.auto_correct = auto_correct
+
+        # source -> detected offset in minutes
+        self.offsets = {}
+
+    def update(self, conflicts):
+        """Add a batch of conflicts (a fixture seen before replaces its old entry) and re-detect"""
+        for conflict in conflicts:
+            key = fixture_key(conflict)
+            self.observations.pop(key, None)
+            self.observations[key] = conflict_deviations(conflict)
+            if len(self.observations) > self.window:
+                self.observations.popitem(last=False)
+        return self.detect()
+
+    def reset(self):
+        """Forget every observation (offsets are re-detected on the next update)"""
+        self.observations.clear()
+
+    def detect(self):
+        """
+        Single pass over the window: weight every (source, offset) pair and
+        flag a source whose disagreements are dominated by one constant offset
+        """
+        per_source = Counter()
+        per_offset = Counter()
+        fixtures = Counter()
+        partners = {}
+
+        for deviations in self.observations.values():
+            for source, offset, partner_sources, weight in deviations:
+                per_source[source] += weight
+                per_offset[(source, offset)] += weight
+                fixtures[(source, offset)] += 1
+                partners.setdefault((source, offset), set()).update(partner_sources)
+
+        candidates = {}
+        for (source, offset), weight in per_offset.items():
+            if weight < self.min_samples or fixtures[(source, offset)] < self.min_fixtures:
+                continue
+            if weight / per_source[source] < self.min_ratio:
+                continue
+            if len(partners[(source, offset)]) < self.min_partners:
+                continue
+            if source not in candidates or weight > candidates[source][1]:
+                candidates[source] = (offset, weight)
+
+        # Two-source conflicts are symmetric: if A looks +180 and B looks -180
+        # only because of each other, keep the one with more evidence
+        offsets = {}
+        for source, (offset, weight) in candidates.items():
+            mirrored = [
+                w for s, (o, w) in candidates.items()
+                if s != source and o == -offset and w >= weight
+                and s in partners[(source, offset)] and source in partners[(s, o)]
+            ]
+            if not mirrored:
+                offsets[source] = offset
+
+        for source, offset in offsets.items():
+            if self.offsets.get(source) != offset:
+                print(f"🕒 {source}: systematic offset detected ({offset:+d} mins)")
+        for source in set(self.offsets) - set(offsets):
+            print(f"✅ {source}: offset no longer detected")
+
+        self.offsets = offsets
+        return dict(offsets)
+
+    def corrected_times(self, times):
+        """Return a conflict's times with every flagged source's offset removed"""
+        return {
+            source: shift_time(time_str, -self.offsets[source]) if source in self.offsets else time_str
+            for source, time_str in times.items()
+        }
+
+    def is_explained(self, conflict):
+        """True if the conflict disappears once known offsets are removed"""
+        times = conflict.get('times', {})
+        if not any(source in self.offsets for source in times):
+            return False
+        return len(set(self.corrected_times(times).values())) <= 1
+
+    def filter_conflicts(self, conflicts):
+        """
+        Split conflicts into (alertable, explained_by_offset)
+        """
+        alertable = []
+        explained = []
+        for conflict in conflicts:
+            if self.is_explained(conflict):
+                conflict['explained_offset'] = {
+                    s: self.offsets[s] for s in conflict['times'] if s in self.offsets
+                }
+                explained.append(conflict)
+            else:
+                alertable.append(conflict)
+        return alertable, explained
+
+    def correct_matches(self, matches, source):
+        """Shift a source's kickoffs back by its detected offset (auto-correct mode)"""
+        offset = self.offsets.get(source)
+        if not self.auto_correct or not offset:
+            return matches
+
+        for match in matches:
+            match['kickoff'] = shift_time(match['kickoff'], -offset)
+            match['offset_corrected'] = offset
+        print(f"🕒 {source}: corrected {len(matches)} kickoffs by {-offset:+d} mins")
+        return matches
+
+    def load_history(self, log_filename="discrepancy_log.json"):
+        """
+        Rebuild the window from the tail of the running discrepancy log (every
+        run's conflicts end up there, so nothing already observed is lost)
+        """
+        if not os.path.exists(log_filename):
+            return {}
+        try:
+            with open(log_filename, 'r') as f:
+                log = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read {log_filename}: {e}")
+            return {}
+
+        self.reset()
+        return self.update(log[-self.window:])
+
+
+# Quick test
+if __name__ == "__main__":
+    detector = OffsetDetector()
+    offsets = detector.load_history()
+    print(f"\n📊 Offsets from history: {offsets}")
+
+    with open("discrepancy_log.json") as f:
+        history = json.load(f)
+
+    alertable, explained = detector.filter_conflicts(history)
+    print(f"🚨 Alertable: {len(alertable)}")
+    print(f"🔇 Explained by offset: {len(explained)}")
@@ -0,0 +1,172 @@
+# page_tokenizer.py - ONE-PASS LINE TOKENIZER FOR BOOKMAKER BODY TEXT
+import io
+import re
+
+from arbitrage import ODDS_PATTERN
+
+LEAGUE = 'league'
+HEADER = 'header'
+ODDS = 'odds'
+TEXT = 'text'
+
+
+class PageGrammar:
+    """
+    How one site's body text marks its lines: a header regex (kickoff line that
+    starts a fixture) and optionally a league regex. Sites without league lines
+    (MozzartBet) take the text line right before a header as its league.
+    """
+
+    def __init__(self, header, league=None):
+        self.header = re.compile(header)
+        self.league = re.compile(league) if league else None
+
+
+def tokenize(text, grammar):
+    """
+    Classify each non-empty line as odds, header, league or text and yield
+    (kind, line, header re.Match or None); `text` is the page text or an iterable of lines
+    """
+    lines = io.StringIO(text) if isinstance(text, str) else text
+    odds, header, league = ODDS_PATTERN.match, grammar.header.search, grammar.league
+
+    # Prices are most of the page and the anchored match is the cheapest test, so it goes first
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if odds(line):
+            yield ODDS, line, None
+            continue
+        found = header(line)
+        if found:
+            yield HEADER, line, found
+        elif league is not None and league.search(line):
+            yield LEAGUE, line, None
+        else:
+            yield TEXT, line, None
+
+
+def iter_rows(text, grammar, default_league="Football"):
+    """
+    Group tokens into fixture rows as they come:
+    {'league': str, 'header': re.Match, 'teams': [home, away], 'odds': [up to 3 price strings]}
+    Every header starts a new row, so a stray or missing line only affects the
+    fixture it is in. A row ends at the next header or league line, or after
+    its third price; text after the two teams (market counts, banners) is skipped.
+    """
+    league = default_league
+    before = None  # Last text line that isn't part of a row
+    row = None
+    league_before_header = grammar.league is None
+
+    for kind, line, found in tokenize(text, grammar):
+        if kind is ODDS:
+            if row is not None and row['teams']:
+                odds = row['odds']
+                odds.append(line)
+                if len(odds) == 3:
+                    yield row
+                    row = None
+            before = None
+        elif kind is TEXT:
+            if row is not None and not row['odds'] and len(row['teams']) < 2:
+                row['teams'].append(line)
+            else:
+                before = line
+        elif kind is HEADER:
+            if row is not None:
+                yield row
+            if league_before_header and before is not None:
+                league = before
+            row = {'league': league, 'header': found, 'teams': [], 'odds': []}
+            before = None
+        else:
+            if row is not None:
+                yield row
+                row = None
+            league = line
+            before = None
+
+    if row is not None:
+        yield row
+
+
+# Quick test on recorded page text
+if __name__ == "__main__":
+    import time
+
+    BETIKA_TEXT = """Soccer
+Highlights
+England • Premier League
+21/02, 12:30
+Arsenal
+Chelsea
++212
+2.10
+3.40
+3.20
+Spain • LaLiga
+21/02, 17:00
+Real Sociedad de Fut...
+Getafe
+1.85
+GET 50% BONUS ON YOUR FIRST DEPOSIT
+21/02, 19:00
+Sevilla
+1.90
+3.30
+4.10
+"""
+
+    MOZZART_TEXT = """Football
+Premier League
+Sat 12:30|11722
+Arsenal
+Chelsea
+2.12
+3.35
+3.25
+Sat 15:00|11723
+Everton
+Brentford
+Live stream
+2.60
+3.10
+2.85
+serie a
+Sun 20:45|11801
+Inter
+Milan
+"""
+
+    from betika_scraper import PAGE_GRAMMAR as betika, parse_betika_lines
+    from mozzart_scraper import PAGE_GRAMMAR as mozzart, parse_mozzartbet_lines
+
+    expected = [
+        ('England • Premier League', '12:30', ['Arsenal', 'Chelsea'], ['2.10', '3.40', '3.20']),
+        ('Spain • LaLiga', '17:00', ['Real Sociedad de Fut...', 'Getafe'], ['1.85']),
+        ('Spain • LaLiga', '19:00', ['Sevilla'], ['1.90', '3.30', '4.10']),
+    ]
+    got = [(r['league'], r['header'].group(2), r['teams'], r['odds']) for r in iter_rows(BETIKA_TEXT, betika)]
+    assert got == expected, got
+    print(f"✅ Betika: {len(got)} rows, a banner and a missing team only affect their own fixture")
+
+    expected = [
+        ('Premier League', 'Sat 12:30', ['Arsenal', 'Chelsea'], ['2.12', '3.35', '3.25']),
+        ('Premier League', 'Sat 15:00', ['Everton', 'Brentford'], ['2.60', '3.10', '2.85']),
+        ('serie a', 'Sun 20:45', ['Inter', 'Milan'], []),
+    ]
+    got = [(r['league'], r['header'].group(1), r['teams'], r['odds']) for r in iter_rows(MOZZART_TEXT, mozzart)]
+    assert got == expected, got
+    print(f"✅ MozzartBet: {len(got)} rows, league carried over to the next header")
+
+    matches = parse_betika_lines(BETIKA_TEXT) + parse_mozzartbet_lines(MOZZART_TEXT)
+    assert [m['kickoff'] for m in matches] == ['15:30', '20:00', '22:00', '15:30', '18:00', '23:45'], matches
+    assert matches[1]['home'] == 'Real Sociedad de Fut' and matches[1]['odds'] is None
+    assert matches[3]['odds'] == {'home': 2.12, 'draw': 3.35, 'away': 3.25} and matches[5]['league'] == 'Serie A'
+
+    text = BETIKA_TEXT * 2000
+    started = time.perf_counter()
+    count = sum(1 for _ in iter_rows(text, betika))
+    print(f"📊 {count} rows from {text.count(chr(10))} lines in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,135 @@
+# profiler.py - OPT-IN cProfile + tracemalloc AROUND EACH RUN STAGE
+from contextlib import contextmanager
+from datetime import datetime
+import cProfile
+import io
+import os
+import pstats
+import shutil
+import time
+import tracemalloc
+
+PROFILE_DIR = "profiling"
+
+
+def _write_top_allocations(path, snapshot, baseline, top):
+    """Top allocation sites since `baseline`, grouped by line"""
+    stats = snapshot.compare_to(baseline, 'lineno')
+    with open(path, 'w', encoding='utf-8') as f:
+        for stat in stats[:top]:
+            f.write(f"{stat}\n")
+
+
+@contextmanager
+def profile_block(prof_path, top=15):
+    """
+    cProfile + tracemalloc around a block: writes <prof_path> (pstats) and
+    <prof_path minus .prof>.mem.txt (top allocations). Yields a dict that gets
+    'seconds' and 'peak_mb' once the block is done.
+    """
+    result = {}
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.take_snapshot()
+
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    profile.enable()
+    try:
+        yield result
+    finally:
+        profile.disable()
+        result['seconds'] = time.perf_counter() - started
+        result['peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+
+        profile.dump_stats(prof_path)
+        _write_top_allocations(prof_path[:-len('.prof')] + '.mem.txt', tracemalloc.take_snapshot(), baseline, top)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def profiled_call(func, args, prof_path):
+    """func(*args) under profile_block; picklable, so isolated workers can run it"""
+    with profile_block(prof_path):
+        return func(*args)
+
+
+class StageProfiler:
+    """
+    Writes one directory per run under `directory` with a .prof and a
+    .mem.txt per stage plus summary.txt, keeping the newest `keep_runs` runs
+    """
+
+    def __init__(self, directory=PROFILE_DIR, keep_runs=20, top=15):
+        self.directory = directory
+        self.keep_runs = keep_runs
+        self.top = top
+        self.run_dir = None
+        self.timings = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def start_run(self, run_number):
+        self.run_dir = os.path.join(self.directory, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{run_number:05d}")
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.timings = {}
+
+    def path(self, name, suffix='.prof'):
+        return os.path.join(self.run_dir, f"{name}{suffix}")
+
+    @contextmanager
+    def stage(self, name):
+        with profile_block(self.path(name), self.top) as result:
+            yield
+        self.timings[name] = result
+
+    def end_run(self):
+        """Write summary.txt for the run and drop the oldest runs"""
+        lines = [f"{'STAGE':<28} {'SECONDS':>9} {'PEAK MB':>9}"]
+        for name, result in self.timings.items():
+            lines.append(f"{name:<28} {result['seconds']:>9.3f} {result['peak_mb']:>9.1f}")
+
+        # Parsing happens inside the fetch stages (and their workers); pull it out by function name
+        lines.append("\nparse_* functions (cumulative seconds):")
+        for name in sorted(os.listdir(self.run_dir)):
+            if not name.endswith('.prof'):
+                continue
+            stats = pstats.Stats(os.path.join(self.run_dir, name)).stats
+            for (filename, line, func), (cc, nc, tt, ct, callers) in stats.items():
+                if func.startswith('parse_'):
+                    lines.append(f"   {name[:-5]:<25} {func:<32} {ct:>8.3f}")
+
+        for name in sorted(os.listdir(self.run_dir)):
+            if name.endswith('.prof'):
+                lines.append(f"\n=== {name} (top {self.top} by cumulative time) ===")
+                stream = io.StringIO()
+                pstats.Stats(os.path.join(self.run_dir, name), stream=stream).sort_stats('cumulative').print_stats(self.top)
+                lines.append(stream.getvalue().strip('\n'))
+
+        with open(self.path('summary', '.txt'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        print(f"🔬 Profile written to {self.run_dir}")
+
+        self._rotate()
+
+    def _rotate(self):
+        runs = sorted(name for name in os.listdir(self.directory) if name.startswith('run_'))
+        for name in runs[:-self.keep_runs]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+
+# Quick test
+if __name__ == "__main__":
+    from workload import generate_fixtures
+
+    profiler = StageProfiler(directory=os.path.join(PROFILE_DIR, "selftest"), keep_runs=2)
+    for run in range(1, 4):
+        profiler.start_run(run)
+        with profiler.stage("generate"):
+            workload = generate_fixtures(2000)
+        with profiler.stage("sort"):
+            sorted(m['kickoff'] for matches in workload.values() for m in matches)
+        profiler.end_run()
+
+    print(f"✅ Kept {len(os.listdir(profiler.directory))} runs (keep_runs=2)")
@@ -0,0 +1,138 @@
+# query_api.py - READ-ONLY QUERY API OVER THE LATEST FIXTURE TABLE
+from datetime import datetime
+from hashlib import sha1
+from urllib.parse import parse_qs
+import json
+
+QUERY_PATHS = ('/fixtures', '/conflicts')
+QUERY_FILTERS = ('league', 'date', 'source')
+
+# Filtered responses kept per snapshot (a dashboard polls a handful of views)
+MAX_CACHED_RESPONSES = 256
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+class FixtureSnapshot:
+    """
+    One published run: the joined fixture table and its open conflicts.
+    Never modified after publishing, so request threads can read it without
+    locks. The tag hashes the content (not when it was computed), so a run
+    that changed nothing keeps every ETag valid; ETags are weak for that reason.
+    """
+
+    def __init__(self, fixtures, conflicts, generated_at=None):
+        self.fixtures = fixtures
+        self.conflicts = conflicts
+        self.generated_at = (generated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S')
+        content = [fixtures, [{k: v for k, v in c.items() if k != 'timestamp'} for c in conflicts]]
+        self.tag = sha1(_dumps(content)).hexdigest()[:16]
+
+        # (path, filters) -> serialized body
+        self.responses = {}
+
+    def etag(self, key):
+        return f'W/"{self.tag}-{sha1(repr(key).encode()).hexdigest()[:8]}"'
+
+    def body(self, key):
+        """Serialized response for a (path, filters) key, built once per snapshot"""
+        body = self.responses.get(key)
+        if body is None:
+            path, filters = key
+            rows = self.fixtures if path == '/fixtures' else self.conflicts
+            rows = [row for row in rows if _matches(row, dict(filters))]
+            body = _dumps({'generated_at': self.generated_at, 'count': len(rows), path.strip('/'): rows})
+            if len(self.responses) < MAX_CACHED_RESPONSES:
+                self.responses[key] = body
+        return body
+
+
+def _matches(row, filters):
+    """league matches the canonical ID or display name, source any source listing the fixture"""
+    league = filters.get('league')
+    if league and league not in ((row.get('league_id') or '').lower(), (row.get('league') or '').lower()):
+        return False
+    if filters.get('date') and row.get('date') != filters['date']:
+        return False
+    # Fixtures list 'kickoffs', conflicts 'times', both {source: kickoff}
+    source = filters.get('source')
+    if source and source not in (name.lower() for name in row.get('kickoffs', row.get('times', {}))):
+        return False
+    return True
+
+
+class QueryApi:
+    """
+    GET /fixtures?league=ENG-PL&date=20/02&source=Betika  -> every joined fixture with per-source kickoffs
+    GET /conflicts?league=...&date=...&source=...        -> open conflicts (explained ones flagged)
+
+    The monitor publishes a new snapshot after each run; requests only look up
+    (or build once) the serialized body, and If-None-Match gets a 304 without
+    touching the body at all.
+    """
+
+    def __init__(self):
+        self.snapshot = FixtureSnapshot([], [])
+
+    def publish(self, fixtures, conflicts, explained=(), generated_at=None):
+        """Swap in the table from a run (explained: conflicts attributed to source offsets)"""
+        explained_ids = {conflict.get('conflict_id') for conflict in explained}
+        conflicts = [
+            dict(conflict, explained_by_offset=conflict.get('conflict_id') in explained_ids)
+            for conflict in conflicts
+        ]
+        snapshot = FixtureSnapshot(list(fixtures), conflicts, generated_at)
+
+        # Unfiltered views are what dashboards poll most, serialize them up front
+        for path in QUERY_PATHS:
+            snapshot.body((path, ()))
+
+        self.snapshot = snapshot
+        return snapshot.tag
+
+    def handles(self, path):
+        return path in QUERY_PATHS
+
+    def respond(self, path, query='', if_none_match=None):
+        """(status, etag, body) for a GET; body is None for 304"""
+        params = parse_qs(query)
+        filters = tuple(
+            (name, params[name][0].strip() if name == 'date' else params[name][0].strip().lower())
+            for name in QUERY_FILTERS if params.get(name, [''])[0].strip()
+        )
+        key = (path, filters)
+
+        snapshot = self.snapshot
+        etag = snapshot.etag(key)
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+            return 304, etag, None
+        return 200, etag, snapshot.body(key)
+
+
+# Quick test
+if __name__ == "__main__":
+    api = QueryApi()
+    fixtures = [
+        {'fixture_id': 'arsenal_chelsea_17:30', 'home': 'Arsenal', 'away': 'Chelsea', 'league': 'Premier League',
+         'league_id': 'ENG-PL', 'date': '20/02', 'kickoffs': {'Flashscore': '17:30', 'Betika': '18:30'},
+         'conflict': True},
+        {'fixture_id': 'inter_milan_20:45', 'home': 'Inter', 'away': 'Milan', 'league': 'Serie A',
+         'league_id': 'ITA-SA', 'date': '21/02', 'kickoffs': {'Flashscore': '20:45', 'Odibets': '20:45'},
+         'conflict': False},
+    ]
+    conflicts = [{'home': 'Arsenal', 'away': 'Chelsea', 'times': {'Flashscore': '17:30', 'Betika': '18:30'},
+                  'league': 'Premier League', 'league_id': 'ENG-PL', 'date': '20/02',
+                  'conflict_id': 'arsenal_chelsea_17:30'}]
+    api.publish(fixtures, conflicts)
+
+    status, etag, body = api.respond('/fixtures', 'source=odibets')
+    print(f"✅ {status} {etag} {body.decode()}")
+    print(f"✅ revalidate: {api.respond('/fixtures', 'source=odibets', etag)[0]}")
+    print(f"✅ /conflicts?league=eng-pl: {json.loads(api.respond('/conflicts', 'league=eng-pl')[2])['count']}")
+
+    api.publish(fixtures, conflicts)
+    print(f"✅ same table republished, ETag still valid: {api.respond('/fixtures', 'source=odibets', etag)[0]}")
+    api.publish(fixtures[:1], conflicts)
+    print(f"✅ table changed: {api.respond('/fixtures', 'source=odibets', etag)[0]}")
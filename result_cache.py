@@ -0,0 +1,119 @@
+# result_cache.py - LAST-GOOD SCRAPER RESULTS SHARED ACROSS PROCESSES
+from contextlib import closing
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# SQLite in WAL mode: any number of readers (CLI, analytics, a second monitor)
+# while one process writes, and every write is an atomic replace of a source's row
+RESULT_CACHE_FILE = "result_cache.sqlite"
+RESULT_CACHE_ENV = "RESULT_CACHE_PATH"
+
+# How old a cached listing may be before an ad-hoc check fetches live again
+DEFAULT_MAX_AGE_SECONDS = 300
+
+# Who wrote a row, so a process can tell its own listings from other processes'
+PROCESS_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class ResultCache:
+    """
+    One row per source with the scraper's last non-empty full listing and when
+    it was fetched. Connections are opened per call, so an instance is cheap
+    and safe to use from isolated workers and other processes.
+    With skip_own=True get() ignores rows this process wrote: the monitor only
+    wants listings some other process fetched, never its own last run back.
+    """
+
+    def __init__(self, path=None, skip_own=False):
+        self.path = path or os.environ.get(RESULT_CACHE_ENV, RESULT_CACHE_FILE)
+        self.skip_own = skip_own
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "source TEXT PRIMARY KEY, fetched_at REAL NOT NULL, count INTEGER NOT NULL, matches TEXT NOT NULL, "
+                "writer TEXT)"
+            )
+            # Caches created before rows recorded their writer
+            if 'writer' not in [row[1] for row in conn.execute("PRAGMA table_info(results)")]:
+                conn.execute("ALTER TABLE results ADD COLUMN writer TEXT")
+            conn.commit()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def put(self, source, matches, fetched_at=None):
+        """Store a source's listing (empty lists are failures and are not stored)"""
+        if not matches:
+            return False
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (source, fetched_at, count, matches, writer) VALUES (?, ?, ?, ?, ?)",
+                (source, fetched_at or time.time(), len(matches), json.dumps(matches), PROCESS_ID)
+            )
+            conn.commit()
+        return True
+
+    def get(self, source, max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+        """The cached listing if it is at most `max_age_seconds` old, else None"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT fetched_at, matches, writer FROM results WHERE source = ?", (source,)
+            ).fetchone()
+        if row is None or time.time() - row[0] > max_age_seconds:
+            return None
+        if self.skip_own and row[2] == PROCESS_ID:
+            return None
+        return json.loads(row[1])
+
+    def age(self, source):
+        """Seconds since the source was cached (None if never)"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT fetched_at FROM results WHERE source = ?", (source,)).fetchone()
+        return time.time() - row[0] if row else None
+
+    def entries(self):
+        """[(source, age_seconds, match count)] for every cached source"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT source, fetched_at, count FROM results ORDER BY source").fetchall()
+        now = time.time()
+        return [(source, now - fetched_at, count) for source, fetched_at, count in rows]
+
+
+def cached_fetch(source, fetch, max_age_seconds=DEFAULT_MAX_AGE_SECONDS, cache=None):
+    """A fresh cached listing for `source`, otherwise fetch() live and cache the result"""
+    cache = cache or ResultCache()
+    matches = cache.get(source, max_age_seconds)
+    if matches is not None:
+        print(f"♻️ {source}: using cached result ({cache.age(source):.0f}s old, {len(matches)} matches)")
+        return matches
+
+    matches = fetch()
+    cache.put(source, matches)
+    return matches
+
+
+# Quick test / listing
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--selftest":
+        cache = ResultCache("result_cache_selftest.sqlite")
+        calls = []
+        fetch = lambda: calls.append(1) or [{'home': 'Arsenal', 'away': 'Chelsea', 'kickoff': '17:30', 'date': '20/02'}]
+        cached_fetch("Selftest", fetch, cache=cache)
+        cached_fetch("Selftest", fetch, cache=cache)
+        print(f"✅ 2 lookups, {len(calls)} live fetch, stale after 0s: {cache.get('Selftest', max_age_seconds=-1)}")
+        print(f"✅ own rows skipped with skip_own: {ResultCache(cache.path, skip_own=True).get('Selftest')}")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache.path + suffix):
+                os.remove(cache.path + suffix)
+        sys.exit(0)
+
+    cache = ResultCache()
+    print(f"📦 {cache.path}")
+    for source, age, count in cache.entries():
+        print(f"   {source:<12} {count:>5} matches, {age:>7.0f}s old")
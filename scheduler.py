@@ -2,13 +2,20 @@
 from datetime import datetime, timedelta
 import random
 
+from expiry import ExpiryWheel
+from leagues import TAXONOMY
+
 
 class DynamicScheduler:
     """
     Complete smart scheduler with time-based intervals, priority, jitter, and backoff
     """
 
-    def __init__(self):
+    def __init__(self, clock=None, grace_minutes=180, change_rates=None, scrape_budget_per_hour=None,
+                 target_latency_minutes=None):
+        # Injectable clock so the scheduler can run on simulated time
+        self.clock = clock or datetime.now
+
         self.base_intervals = {
             'far': 120,  # > 24 hours: every 2 hours
             'near': 30,  # 6-24 hours: every 30 mins
@@ -24,23 +31,36 @@ class DynamicScheduler:
             'low': 1.5,
         }
 
-        # Popular leagues
-        self.high_priority_leagues = [
-            'Premier League', 'LaLiga', 'Bundesliga',
-            'Serie A', 'Ligue 1', 'Champions League',
-            'Europa League', 'World Cup', 'Euro'
-        ]
+        # +/- share of each interval that is randomized
+        self.jitter_percent = 0.2
+
+        # Per-domain backoff after failures: backoff_base * 2^(failures-1) minutes, capped
+        self.backoff_base = 5
+        self.backoff_max = 120
+
+        # Optional ChangeRateEstimator: sources/leagues that move kickoffs more get shorter intervals
+        self.change_rates = change_rates
 
-        self.medium_priority_leagues = [
-            'Championship', 'FA Cup', 'Carabao Cup',
-            'Primeira Liga', 'Eredivisie', 'Super Lig'
-        ]
+        # Optional cap on scrapes per hour; plan_budget() stretches every interval to stay under it
+        self.scrape_budget_per_hour = scrape_budget_per_hour
+
+        # Optional mean minutes from a kickoff change to its detection; plan_budget() scales
+        # every interval (up or down) to meet it, the budget cap still wins
+        self.target_latency_minutes = target_latency_minutes
+        self.budget_scale = 1.0
+
+        # League priorities come from the canonical taxonomy (leagues.COMPETITIONS)
+        self.leagues = TAXONOMY
 
         # Tracking
         self.last_scrape = {}
         self.domain_failures = {}
         self.domain_backoff = {}
 
+        # Drop last_scrape entries once a match has kicked off plus a grace period
+        self.grace_minutes = grace_minutes
+        self.expiry = ExpiryWheel()
+
         print("✅ DynamicScheduler initialized")
 
     def parse_match_datetime(self, date_str, time_str):
@@ -49,7 +69,7 @@ class DynamicScheduler:
             day, month = map(int, date_str.split('/'))
             hour, minute = map(int, time_str.split(':'))
 
-            now = datetime.now()
+            now = self.clock()
             match_time = datetime(now.year, month, day, hour, minute)
 
             if match_time < now:
@@ -60,19 +80,37 @@ class DynamicScheduler:
         except:
             return 1440  # Default 24 hours
 
+    def get_kickoff_datetime(self, date_str, time_str):
+        """
+        Convert match date/time to a kickoff datetime.
+        Unlike parse_match_datetime, a match that already kicked off today stays
+        in the past; only dates months behind roll over to next year.
+        """
+        try:
+            day, month = map(int, date_str.split('/'))
+            hour, minute = map(int, time_str.split(':'))
+
+            now = self.clock()
+            match_time = datetime(now.year, month, day, hour, minute)
+
+            if match_time < now - timedelta(days=180):
+                match_time = match_time.replace(year=now.year + 1)
+
+            return match_time
+        except:
+            return None
+
     def get_league_priority(self, league):
         """Determine priority based on league name"""
-        league_lower = league.lower()
-
-        for high in self.high_priority_leagues:
-            if high.lower() in league_lower:
-                return 'high'
+        return self.leagues.priority(league)
 
-        for medium in self.medium_priority_leagues:
-            if medium.lower() in league_lower:
-                return 'medium'
+    def get_league_id(self, league):
+        """Canonical competition ID a source's league string refers to (None if unknown)"""
+        return self.leagues.canonical(league)
 
-        return 'low'
+    def get_rate_key(self, league):
+        """League key for change-rate stats: canonical ID, else the raw string"""
+        return self.get_league_id(league) or league
 
     def get_time_category(self, minutes_until):
         """Categorize how far away a match is"""
@@ -96,14 +134,56 @@ class DynamicScheduler:
         """Get scraping interval for a match"""
         base = self.base_intervals[self.get_time_category(minutes_until)]
 
-        priority = self.get_league_priority(league)
-        multiplier = self.priority_multipliers[priority]
-        adjusted = base * multiplier
+        adjusted = base * self.get_policy_multiplier(league, domain) * self.budget_scale
 
         if domain and domain in self.domain_backoff:
             adjusted += self.domain_backoff[domain]
 
-        return self.add_jitter(adjusted)
+        return self.add_jitter(adjusted, self.jitter_percent)
+
+    def get_policy_multiplier(self, league, domain=None):
+        """League priority multiplier, times the learned change-rate factor when enabled"""
+        multiplier = self.priority_multipliers[self.get_league_priority(league)]
+        if self.change_rates is not None:
+            multiplier *= self.change_rates.interval_factor(domain, self.get_rate_key(league))
+        return multiplier
+
+    def plan_budget(self, matches):
+        """
+        Projected scrapes per hour for (minutes_until, league, domain) tuples.
+        Sets budget_scale: with target_latency_minutes, the scale at which the
+        expected detection latency (half an interval, averaged over listings
+        weighted by how often they change) meets the target; stretched further
+        if needed so the scrapes stay under scrape_budget_per_hour
+        """
+        demand = 0.0
+        latency = weight = 0.0
+        for minutes_until, league, domain in matches:
+            interval = max(1, self.base_intervals[self.get_time_category(minutes_until)]
+                           * self.get_policy_multiplier(league, domain))
+            demand += 60 / interval
+            if self.target_latency_minutes:
+                relative = 1.0
+                if self.change_rates is not None:
+                    relative = self.change_rates.relative(domain, self.get_rate_key(league))
+                latency += relative * interval / 2
+                weight += relative
+
+        scale = 1.0
+        if self.target_latency_minutes and latency > 0:
+            scale = self.target_latency_minutes / (latency / weight)
+        if self.scrape_budget_per_hour and demand / scale > self.scrape_budget_per_hour:
+            scale = demand / self.scrape_budget_per_hour
+        if abs(scale - self.budget_scale) > 0.05:
+            print(f"💰 Projected {demand / scale:.0f} scrapes/hour, intervals x{scale:.2f} "
+                  f"(target latency {self.target_latency_minutes or 'none'}, "
+                  f"budget {self.scrape_budget_per_hour or 'unlimited'})")
+        self.budget_scale = scale
+        return demand
+
+    def get_backoff(self, failures):
+        """Minutes added to a domain's intervals after `failures` consecutive failures"""
+        return min(self.backoff_base * (2 ** (failures - 1)), self.backoff_max)
 
     def record_failure(self, domain):
         """Record a failure for exponential backoff"""
@@ -113,7 +193,7 @@ class DynamicScheduler:
             self.domain_failures[domain] += 1
 
         failures = self.domain_failures[domain]
-        backoff = min(5 * (2 ** (failures - 1)), 120)
+        backoff = self.get_backoff(failures)
         self.domain_backoff[domain] = backoff
 
         print(f"⚠️ {domain}: Failure #{failures}, backoff {backoff} mins")
@@ -130,7 +210,7 @@ class DynamicScheduler:
                 print(f"✅ {domain}: Fully recovered")
             else:
                 failures = self.domain_failures[domain]
-                backoff = min(5 * (2 ** (failures - 1)), 120)
+                backoff = self.get_backoff(failures)
                 self.domain_backoff[domain] = backoff
                 print(f"✅ {domain}: Improving, backoff now {backoff} mins")
 
@@ -138,23 +218,49 @@ class DynamicScheduler:
         """Create unique match identifier"""
         return f"{home}_{away}_{date}".replace(" ", "_")
 
-    def should_scrape(self, match_key, minutes_until, league="Football", domain=None):
-        """Determine if a match should be scraped now"""
+    def should_scrape(self, match_key, minutes_until, league="Football", domain=None, kickoff_at=None, record=True):
+        """
+        Determine if a match should be scraped now
+        With record=False the answer is computed without marking the match as scraped
+        (used for matches a targeted fetch didn't cover)
+        """
         interval = self.get_interval(minutes_until, league, domain)
+        now = self.clock()
 
         if match_key not in self.last_scrape:
-            self.last_scrape[match_key] = datetime.now()
+            if record:
+                self.last_scrape[match_key] = now
+                self._schedule_expiry(match_key, minutes_until, kickoff_at)
             return True, interval
 
         last = self.last_scrape[match_key]
-        minutes_since = (datetime.now() - last).total_seconds() / 60
+        minutes_since = (now - last).total_seconds() / 60
 
         if minutes_since >= interval:
-            self.last_scrape[match_key] = datetime.now()
+            if not record:
+                return True, 0
+            self.last_scrape[match_key] = now
+            self._schedule_expiry(match_key, minutes_until, kickoff_at)
             return True, interval
         else:
             return False, interval - minutes_since
 
+    def _schedule_expiry(self, match_key, minutes_until, kickoff_at=None):
+        """Remember when this match's state can be dropped"""
+        if kickoff_at is None:
+            kickoff_at = self.clock() + timedelta(minutes=minutes_until)
+        self.expiry.add(match_key, kickoff_at + timedelta(minutes=self.grace_minutes))
+
+    def evict_expired(self):
+        """Forget matches that kicked off more than grace_minutes ago"""
+        expired = self.expiry.expire(self.clock())
+        for match_key in expired:
+            self.last_scrape.pop(match_key, None)
+
+        if expired:
+            print(f"🧹 Evicted {len(expired)} finished matches from scheduler state")
+        return len(expired)
+
     def get_next_run_times(self, matches_by_source):
         """
         Generate report of when each match will be scraped next
@@ -0,0 +1,256 @@
+# simulator.py - DISCRETE-EVENT REPLAY OF A DAY THROUGH DynamicScheduler
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+import argparse
+import heapq
+import io
+import random
+import time
+
+from change_rate import ChangeRateEstimator
+from scheduler import DynamicScheduler
+from workload import generate_fixtures, SOURCE_NAMES
+
+# How far a listing's kickoff moves when it changes (minutes)
+KICKOFF_SHIFTS = [-60, -30, -15, 15, 30, 60, 120]
+
+
+class VirtualClock:
+    """Callable clock for DynamicScheduler(clock=...) that only moves when told to"""
+
+    def __init__(self, start):
+        self.start = start
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def set(self, minutes):
+        """Jump to `minutes` after start"""
+        self.now = self.start + timedelta(seconds=minutes * 60)
+
+
+def build_day(fixtures=120, sources=4, hours=24, change_rate=0.2, seed=42, start=None, source_change_rates=None):
+    """
+    Listings (one per source per fixture) kicking off within `hours`, plus a
+    kickoff change for `change_rate` of them (or source_change_rates[source])
+    at a random time before kickoff. Times are minutes after `start`.
+    """
+    rng = random.Random(seed)
+    start = start or datetime.now().replace(second=0, microsecond=0)
+    workload = generate_fixtures(
+        fixtures, sources=sources, seed=seed, start=start, days=max(1, -(-hours // 24)),
+        conflict_rate=0, offset_sources={}, noise=0, swap_rate=0
+    )
+
+    listings = []
+    for source, matches in workload.items():
+        for match in matches:
+            kickoff_at = datetime.strptime(f"{start.year} {match['date']} {match['kickoff']}", '%Y %d/%m %H:%M')
+            if kickoff_at < start:
+                kickoff_at = kickoff_at.replace(year=start.year + 1)
+            kickoff = (kickoff_at - start).total_seconds() / 60
+            if kickoff > hours * 60:
+                continue
+
+            listing = {
+                'key': f"{source}:{match['home']}_{match['away']}_{match['date']}",
+                'source': source,
+                'league': match['league'],
+                'kickoff': kickoff,
+                'change_at': None,
+                'new_kickoff': None,
+            }
+            if rng.random() < (source_change_rates or {}).get(source, change_rate) and kickoff > 10:
+                listing['change_at'] = rng.uniform(0, kickoff - 10)
+                listing['new_kickoff'] = max(listing['change_at'] + 5, kickoff + rng.choice(KICKOFF_SHIFTS))
+            listings.append(listing)
+
+    return start, listings
+
+
+def _percentile(values, share):
+    return values[min(len(values) - 1, int(share * len(values)))] if values else None
+
+
+def simulate(start, listings, settings=None, failure_rate=0.0, seed=42, adaptive=False,
+             scrape_budget_per_hour=None, plan_every=15, target_latency_minutes=None):
+    """
+    Run every listing through a fresh scheduler on a virtual clock.
+    `settings` overrides scheduler policy: base_intervals / priority_multipliers
+    keys (e.g. 'critical', 'high') or 'jitter_percent', 'backoff_base', 'backoff_max'.
+    adaptive=True learns change rates as it goes; the budget (and target
+    latency) is re-planned every `plan_every` minutes. Returns {priority: stats} plus an 'all' row.
+    """
+    random.seed(seed)  # add_jitter uses the module RNG
+    failures = random.Random(seed + 1)
+    clock = VirtualClock(start)
+    change_rates = ChangeRateEstimator() if adaptive else None
+
+    with redirect_stdout(io.StringIO()):
+        scheduler = DynamicScheduler(
+            clock=clock, change_rates=change_rates, scrape_budget_per_hour=scrape_budget_per_hour,
+            target_latency_minutes=target_latency_minutes
+        )
+    for name, value in (settings or {}).items():
+        if name in scheduler.base_intervals:
+            scheduler.base_intervals[name] = value
+        elif name in scheduler.priority_multipliers:
+            scheduler.priority_multipliers[name] = value
+        elif hasattr(scheduler, name):
+            setattr(scheduler, name, value)
+        else:
+            raise ValueError(f"Unknown scheduler setting: {name}")
+
+    stats = {}
+    priorities = []
+    for listing in listings:
+        priority = scheduler.get_league_priority(listing['league'])
+        priorities.append(priority)
+        row = stats.setdefault(priority, {'listings': 0, 'scrapes': 0, 'changes': 0, 'missed': 0, 'latencies': []})
+        row['listings'] += 1
+        row['changes'] += listing['change_at'] is not None
+
+    # State per listing: the kickoff the scheduler has seen and whether its change was picked up
+    inf = float('inf')
+    change_at = [inf if listing['change_at'] is None else listing['change_at'] for listing in listings]
+    seen_kickoff = [listing['kickoff'] for listing in listings]
+    kickoff_at = [start + timedelta(minutes=listing['kickoff']) for listing in listings]
+    detected = [listing['change_at'] is None for listing in listings]
+    last_ok = [0.0] * len(listings)
+    rate_keys = [scheduler.get_rate_key(listing['league']) for listing in listings]
+    rows = [stats[priority] for priority in priorities]
+    next_plan = 0.0
+    queue = [(0.0, n) for n in range(len(listings))]
+    heapq.heapify(queue)
+
+    with redirect_stdout(io.StringIO()):  # Backoff changes print per failure
+        while queue:
+            now, n = heapq.heappop(queue)
+            listing = listings[n]
+            actual_kickoff = listing['kickoff'] if now < change_at[n] else listing['new_kickoff']
+            if now >= seen_kickoff[n] or now >= actual_kickoff:
+                if not detected[n]:
+                    rows[n]['missed'] += 1
+                continue
+
+            clock.set(now)
+            if now >= next_plan:
+                scheduler.plan_budget(
+                    (seen_kickoff[m] - now, listings[m]['league'], listings[m]['source'])
+                    for m in range(len(listings)) if seen_kickoff[m] > now
+                )
+                next_plan = now + plan_every
+
+            should, next_in = scheduler.should_scrape(
+                listing['key'], seen_kickoff[n] - now, listing['league'], listing['source'],
+                kickoff_at=kickoff_at[n]
+            )
+
+            if should:
+                rows[n]['scrapes'] += 1
+                if failures.random() < failure_rate:
+                    scheduler.record_failure(listing['source'])
+                else:
+                    scheduler.record_success(listing['source'])
+                    changed = not detected[n] and now >= change_at[n]
+                    if changed:
+                        detected[n] = True
+                        rows[n]['latencies'].append(now - change_at[n])
+                        seen_kickoff[n] = actual_kickoff
+                        kickoff_at[n] = start + timedelta(minutes=actual_kickoff)
+                    if change_rates is not None:
+                        change_rates.observe(listing['source'], rate_keys[n], (now - last_ok[n]) / 60, changed, clock.now)
+                    last_ok[n] = now
+
+            heapq.heappush(queue, (now + max(next_in, 0.01), n))
+
+    report = {}
+    for priority, row in list(stats.items()) + [('all', None)]:
+        if row is None:
+            row = {
+                'listings': sum(r['listings'] for r in stats.values()),
+                'scrapes': sum(r['scrapes'] for r in stats.values()),
+                'changes': sum(r['changes'] for r in stats.values()),
+                'missed': sum(r['missed'] for r in stats.values()),
+                'latencies': [lat for r in stats.values() for lat in r['latencies']],
+            }
+        latencies = sorted(row['latencies'])
+        report[priority] = {
+            'listings': row['listings'],
+            'scrapes': row['scrapes'],
+            'scrapes_per_listing': row['scrapes'] / row['listings'] if row['listings'] else 0,
+            'changes': row['changes'],
+            'detected': len(latencies),
+            'missed': row['missed'],
+            'latency_mean': sum(latencies) / len(latencies) if latencies else None,
+            'latency_p50': _percentile(latencies, 0.5),
+            'latency_p95': _percentile(latencies, 0.95),
+        }
+    return report
+
+
+def print_report(report, label=""):
+    fmt = lambda value: f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+    print(f"\n📊 {label}")
+    print(f"   {'PRIORITY':<8} {'LISTINGS':>8} {'SCRAPES':>8} {'PER':>6} {'CHANGES':>8} {'MISSED':>7} "
+          f"{'MEAN':>8} {'P50':>8} {'P95':>8}  (latency, mins)")
+    for priority in ('high', 'medium', 'low', 'all'):
+        row = report.get(priority)
+        if row:
+            print(f"   {priority:<8} {row['listings']:>8} {row['scrapes']:>8} {row['scrapes_per_listing']:>6.1f} "
+                  f"{row['changes']:>8} {row['missed']:>7} {fmt(row['latency_mean'])} "
+                  f"{fmt(row['latency_p50'])} {fmt(row['latency_p95'])}")
+
+
+def _parse_setting(text):
+    name, value = text.split('=', 1)
+    return name, [float(v) for v in value.split(',')]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a simulated day of fixtures through DynamicScheduler")
+    parser.add_argument('--fixtures', type=int, default=120, help="fixtures in the day")
+    parser.add_argument('--sources', type=int, default=len(SOURCE_NAMES), help="sources listing them")
+    parser.add_argument('--hours', type=int, default=24, help="simulated hours")
+    parser.add_argument('--change-rate', type=float, default=0.2, help="share of listings whose kickoff moves")
+    parser.add_argument('--failure-rate', type=float, default=0.02, help="share of scrapes that fail (drives backoff)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--set', action='append', default=[], metavar="NAME=VALUE",
+                        help="policy override, e.g. critical=1 or high=0.5 or jitter_percent=0")
+    parser.add_argument('--sweep', metavar="NAME=V1,V2,...", help="run once per value, e.g. critical=1,2,3")
+    parser.add_argument('--source-change-rates', metavar="SOURCE=RATE,...",
+                        help="per-source change share, e.g. Flashscore=0.02,Betika=0.5")
+    parser.add_argument('--adaptive', action='store_true', help="learn intervals from observed change rates")
+    parser.add_argument('--budget', type=float, default=None, help="cap on projected scrapes per hour")
+    parser.add_argument('--target-latency', type=float, default=None,
+                        help="mean minutes from a kickoff change to its detection")
+    args = parser.parse_args()
+
+    source_change_rates = {}
+    for text in (args.source_change_rates.split(',') if args.source_change_rates else []):
+        source, rate = text.split('=')
+        source_change_rates[source] = float(rate)
+
+    settings = {}
+    for text in args.set:
+        name, values = _parse_setting(text)
+        settings[name] = values[0]
+
+    start, listings = build_day(
+        args.fixtures, args.sources, args.hours, args.change_rate, args.seed, source_change_rates=source_change_rates
+    )
+    runs = [(f"settings {settings}" if settings else "defaults", settings)]
+    if args.sweep:
+        name, values = _parse_setting(args.sweep)
+        runs = [(f"{name}={value}", {**settings, name: value}) for value in values]
+
+    print("=" * 80)
+    print(f"🧪 SIMULATED DAY - {len(listings)} listings over {args.hours}h, "
+          f"{sum(1 for l in listings if l['change_at'] is not None)} kickoff changes")
+    print("=" * 80)
+    for label, run_settings in runs:
+        started = time.perf_counter()
+        report = simulate(start, listings, run_settings, args.failure_rate, args.seed, args.adaptive, args.budget,
+                          target_latency_minutes=args.target_latency)
+        print_report(report, f"{label} ({(time.perf_counter() - started) * 1000:.0f} ms)")
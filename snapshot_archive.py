@@ -0,0 +1,258 @@
+# snapshot_archive.py - DELTA-ENCODED ARCHIVE OF PER-RUN MATCH SNAPSHOTS
+from datetime import datetime, timedelta
+import gzip
+import json
+import os
+
+
+def row_keys(matches):
+    """
+    Stable key per row: home|away|date, with a #n suffix when the same
+    pair appears more than once on a day so no row is lost
+    """
+    keyed = {}
+    for match in matches:
+        base = f"{match.get('home')}|{match.get('away')}|{match.get('date')}"
+        key = base
+        n = 1
+        while key in keyed:
+            n += 1
+            key = f"{base}#{n}"
+        # Plain dicts (also for Match records) so rows can be diffed and written as JSON
+        keyed[key] = dict(match)
+    return keyed
+
+
+def diff_rows(old, new):
+    """Delta between two {key: row} dicts (None if nothing changed)"""
+    added = [new[k] | {'_key': k} for k in new.keys() - old.keys()]
+    removed = sorted(old.keys() - new.keys())
+    changed = [new[k] | {'_key': k} for k in new.keys() & old.keys() if new[k] != old[k]]
+
+    if not (added or removed or changed):
+        return None
+    return {'added': added, 'removed': removed, 'changed': changed}
+
+
+def apply_delta(rows, delta):
+    """Apply a delta to a {key: row} dict in place"""
+    for key in delta.get('removed', []):
+        rows.pop(key, None)
+    for row in delta.get('added', []) + delta.get('changed', []):
+        row = dict(row)
+        rows[row.pop('_key')] = row
+
+
+class SnapshotArchive:
+    """
+    Stores every run's per-source match list as a delta against the previous
+    run; a run that changed nothing writes nothing. Every `keyframe_every`
+    written runs a full keyframe starts a new gzip segment, so reconstructing
+    any run replays at most one segment. Each segment is a single gzip stream,
+    rewritten whole (and atomically) when a run adds to it; segments older
+    than `retention_days` are dropped.
+    """
+
+    def __init__(self, directory="snapshots", keyframe_every=48, retention_days=30):
+        self.directory = directory
+        self.keyframe_every = keyframe_every
+        self.retention_days = retention_days
+        os.makedirs(directory, exist_ok=True)
+
+        # Current state (source -> {key: row}), the segment being appended to and its lines
+        self.state = {}
+        self.segment = None
+        self.lines = []
+
+        self._resume()
+
+    @property
+    def runs_in_segment(self):
+        return len(self.lines)
+
+    def segments(self):
+        """Segment filenames, oldest first"""
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith('segment_') and name.endswith('.jsonl.gz')
+        )
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_segment(self, name):
+        with gzip.open(self._path(name), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _write_segment(self):
+        """Rewrite the open segment as one gzip stream; readers see the old or the new file"""
+        path = self._path(self.segment)
+        with gzip.open(path + '.tmp', 'wt', encoding='utf-8') as f:
+            f.write(''.join(self.lines))
+        os.replace(path + '.tmp', path)
+
+    def _resume(self):
+        """Rebuild the current state from the newest segment after a restart"""
+        segments = self.segments()
+        if not segments:
+            return
+
+        state = {}
+        lines = []
+        try:
+            for record in self._read_segment(segments[-1]):
+                state = self._apply(state, record)
+                lines.append(json.dumps(record, separators=(',', ':')) + '\n')
+        except (OSError, EOFError, ValueError) as e:
+            # A damaged segment just forces a new keyframe
+            print(f"⚠️ Could not resume snapshot archive from {segments[-1]}: {e}")
+            return
+
+        self.state = state
+        self.segment = segments[-1]
+        self.lines = lines
+
+    def _prune(self, now):
+        """Drop segments whose successor already starts before the retention cutoff (never the newest)"""
+        if not self.retention_days:
+            return
+        cutoff = 'segment_' + (now - timedelta(days=self.retention_days)).strftime('%Y%m%d_%H%M%S')
+        segments = self.segments()
+        for name, successor in zip(segments, segments[1:]):
+            if successor[:len(cutoff)] <= cutoff:
+                os.remove(self._path(name))
+
+    @staticmethod
+    def _apply(state, record):
+        if record['type'] == 'key':
+            return {source: row_keys(matches) for source, matches in record['sources'].items()}
+
+        for source, delta in record['sources'].items():
+            apply_delta(state.setdefault(source, {}), delta)
+        return state
+
+    def append(self, matches_by_source, timestamp=None):
+        """Archive one run. Returns the number of bytes written (0 if nothing changed)."""
+        timestamp = timestamp or datetime.now()
+        ts = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        new_state = {source: row_keys(matches) for source, matches in matches_by_source.items()}
+
+        if self.segment is None or self.runs_in_segment >= self.keyframe_every:
+            record = {
+                'ts': ts,
+                'type': 'key',
+                'sources': {source: list(rows.values()) for source, rows in new_state.items()},
+            }
+            self.segment = f"segment_{timestamp.strftime('%Y%m%d_%H%M%S')}.jsonl.gz"
+            self.lines = []
+            self._prune(timestamp)
+        else:
+            deltas = {}
+            for source in self.state.keys() | new_state.keys():
+                delta = diff_rows(self.state.get(source, {}), new_state.get(source, {}))
+                if delta:
+                    deltas[source] = delta
+            if not deltas:
+                return 0
+            record = {'ts': ts, 'type': 'delta', 'sources': deltas}
+
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        self.lines.append(line)
+        self._write_segment()
+
+        self.state = new_state
+        return len(line)
+
+    def reconstruct(self, at=None):
+        """
+        Match lists per source as of the last run at or before `at`
+        (a datetime or 'YYYY-mm-dd HH:MM:SS'; default: latest run).
+        Returns (timestamp of the last archived change, {source: [matches]}) or (None, {}).
+        """
+        if isinstance(at, datetime):
+            at = at.strftime('%Y-%m-%d %H:%M:%S')
+
+        # Segment names sort by their keyframe time, so only one segment is replayed
+        candidates = self.segments()
+        if at is not None:
+            cutoff = 'segment_' + at.replace('-', '').replace(' ', '_').replace(':', '')
+            candidates = [name for name in candidates if name[:len(cutoff)] <= cutoff]
+        if not candidates:
+            return None, {}
+
+        state = {}
+        found = None
+        for record in self._read_segment(candidates[-1]):
+            if at is not None and record['ts'] > at:
+                break
+            state = self._apply(state, record)
+            found = record['ts']
+
+        return found, {source: list(rows.values()) for source, rows in state.items()}
+
+    def runs(self):
+        """Timestamps of every archived run that changed something"""
+        for name in self.segments():
+            for record in self._read_segment(name):
+                yield record['ts']
+
+
+# Quick test - round-trip keyframe and delta runs in a temp directory
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    def listings(n, moved=()):
+        return [{'home': f"Home {i}", 'away': f"Away {i}", 'date': '20/02', 'league': 'Premier League',
+                 'kickoff': '18:30' if i in moved else '17:30', 'odds': None} for i in range(n)]
+
+    def as_sets(sources):
+        # A source with no rows is the same as a missing one
+        return {source: sorted(json.dumps(m, sort_keys=True) for m in matches)
+                for source, matches in sources.items() if matches}
+
+    def disk_size(archive):
+        return sum(os.path.getsize(archive._path(name)) for name in archive.segments())
+
+    with tempfile.TemporaryDirectory() as directory:
+        archive = SnapshotArchive(directory, keyframe_every=5)
+        clock = datetime(2026, 2, 1, 12, 0)
+        expected = {}
+
+        archive.append({'Betika': listings(400)}, clock)
+        first = disk_size(archive)
+        for _ in range(199):
+            clock += timedelta(minutes=10)
+            assert archive.append({'Betika': listings(400)}, clock) == 0
+        assert disk_size(archive) == first, "static runs grew the archive"
+        print(f"✅ 200 identical runs of 400 listings: {first / 1024:.1f} KB, nothing written after the first")
+
+        for run in range(12):
+            clock += timedelta(minutes=10)
+            sources = {'Betika': listings(400 + run, moved=range(run)), 'Odibets': listings(run)}
+            archive.append(sources, clock)
+            expected[clock] = sources
+            clock += timedelta(minutes=10)
+            archive.append(sources, clock)  # unchanged, reconstructs the same state
+            expected[clock] = sources
+
+        for at, sources in expected.items():
+            _, got = archive.reconstruct(at)
+            assert as_sets(got) == as_sets(sources), at
+        print(f"✅ {len(expected)} runs reconstructed from {len(archive.segments())} segments, "
+              f"{disk_size(archive) / 1024:.1f} KB")
+
+        resumed = SnapshotArchive(directory, keyframe_every=5)
+        assert resumed.segment == archive.segment and resumed.runs_in_segment == archive.runs_in_segment
+
+        resumed.retention_days = 1
+        resumed.keyframe_every = resumed.runs_in_segment
+        resumed.append({'Betika': listings(3)}, clock + timedelta(days=3))
+        assert len(resumed.segments()) == 2, resumed.segments()
+        print(f"✅ resumed after restart, retention kept {resumed.segments()}")
+
+    if len(sys.argv) > 1:
+        ts, sources = SnapshotArchive().reconstruct(sys.argv[1])
+        print(f"🕒 State as of run {ts}: " + ', '.join(f"{s} {len(m)}" for s, m in sources.items()))
@@ -1,6 +1,7 @@
 # telegram_alert.py - STEP 3: Working Version
 import requests
 from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+from kickoff_tracker import move_times
 
 
 class TelegramAlert:
@@ -46,6 +47,12 @@ class TelegramAlert:
         # Send it
         return self.send_message(message)
 
+    def send_move_alert(self, event):
+        """
+        Send an alert about a bookmaker moving a fixture's kickoff
+        """
+        return self.send_message(self._format_move_message(event))
+
     def send_message(self, message):
         """
         Send a text message to Telegram
@@ -97,6 +104,25 @@ class TelegramAlert:
 
         return "\n".join(lines)
 
+    def _format_move_message(self, event):
+        """
+        Format a kickoff move nicely for Telegram
+        """
+        old, new = move_times(event)
+        lines = [
+            "🔀 <b>KICKOFF MOVED!</b>",
+            "",
+            f"⚽ <b>{event['home']} vs {event['away']}</b>",
+            f"🏆 League: {event.get('league', 'Unknown')}",
+            f"📅 Date: {event.get('date', 'Unknown')}",
+            f"🏦 Source: {event['source']}",
+            "",
+            f"⏰ {old} ➜ <b>{new}</b> ({event['shift_minutes']:+d} mins)",
+            "",
+            f"⏱️ <i>Detected at: {event['timestamp'][:16]}</i>"
+        ]
+        return "\n".join(lines)
+
     def send_test_message(self):
         """Send a test message to verify everything works"""
         test_conflict = {
@@ -0,0 +1,121 @@
+# workload.py - SYNTHETIC FIXTURE LISTS FOR BENCHMARKS AND SIMULATION
+from datetime import datetime, timedelta
+import random
+
+from leagues import COMPETITIONS
+
+# The four real bookmakers first, then made-up ones for scale tests
+SOURCE_NAMES = ["Flashscore", "Odibets", "MozzartBet", "Betika"]
+
+SYLLABLES = [
+    'ka', 'lo', 'ra', 'tu', 'vi', 'mo', 'ne', 'si', 'da', 'be',
+    'go', 'ri', 'za', 'mi', 'po', 'le', 'ta', 'nu', 'fe', 'ho',
+]
+
+# Suffixes normalize_team_name strips, so these still join across sources
+JOINABLE_SUFFIXES = ['', '', '', ' FC', ' United', ' Utd', ' City', ' F.C.']
+
+UNKNOWN_LEAGUES = ['Kenya • Premier League', 'Brazil: Carioca', 'Colombia: Primera B', 'Israel • Premier League']
+
+
+def source_names(count):
+    """`count` source names, real bookmakers first"""
+    return SOURCE_NAMES[:count] + [f"Source{n}" for n in range(len(SOURCE_NAMES) + 1, count + 1)]
+
+
+def _team_name(rng):
+    word = lambda: ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    return f"{word()} {word()}"
+
+
+def _variant(name, rng, noise):
+    """How one source spells a team: suffixes and case that still join, rarely a spelling that doesn't"""
+    if rng.random() < noise:
+        return name.replace(' ', '-')  # Breaks the join, as real listings sometimes do
+    name = name + rng.choice(JOINABLE_SUFFIXES)
+    return name.upper() if rng.random() < 0.05 else name
+
+
+def generate_fixtures(count, sources=4, seed=42, start=None, days=3, coverage=0.8,
+                      conflict_rate=0.02, offset_sources=None, noise=0.01, swap_rate=0.02):
+    """
+    Build {source: [match dicts]} for `count` fixtures over `days` days.
+    Each source lists a fixture with probability `coverage`, spells team names its
+    own way, sometimes swaps home/away, applies its timezone offset from
+    `offset_sources` ({source: minutes}) and disagrees on `conflict_rate` of kickoffs.
+    """
+    rng = random.Random(seed)
+    start = start or datetime.now().replace(second=0, microsecond=0)
+    names = source_names(sources)
+    offset_sources = offset_sources if offset_sources is not None else {names[-1]: 180} if sources > 1 else {}
+
+    leagues = [info['name'] for info in COMPETITIONS.values()] + UNKNOWN_LEAGUES
+    matches_by_source = {name: [] for name in names}
+    seen = set()
+
+    while len(seen) < count:
+        home, away = _team_name(rng), _team_name(rng)
+        if (home, away) in seen or home == away:
+            continue
+        seen.add((home, away))
+
+        # Kickoffs on the quarter hour, spread across the window
+        kickoff = start + timedelta(minutes=15 * rng.randint(4, days * 96))
+        league = rng.choice(leagues)
+        conflicting = rng.choice(names) if rng.random() < conflict_rate else None
+
+        for name in names:
+            if rng.random() > coverage:
+                continue
+
+            at = kickoff + timedelta(minutes=offset_sources.get(name, 0))
+            if name == conflicting:
+                at += timedelta(minutes=rng.choice([-60, -30, -15, 15, 30, 60]))
+
+            h, a = _variant(home, rng, noise), _variant(away, rng, noise)
+            if rng.random() < swap_rate:
+                h, a = a, h
+
+            odds = {outcome: round(rng.uniform(1.3, 6.0), 2) for outcome in ('home', 'draw', 'away')}
+            matches_by_source[name].append({
+                'home': h,
+                'away': a,
+                'kickoff': at.strftime('%H:%M'),
+                'date': at.strftime('%d/%m'),
+                'league': league,
+                'odds': odds,
+                'source': name,
+            })
+
+    return matches_by_source
+
+
+def render_page_text(matches, layout, seed=42, banner_rate=0.02):
+    """
+    Lay matches out as a bookmaker's body text ('betika' or 'mozzartbet'), with
+    market counts and the odd promo banner in between, for parser benchmarks
+    """
+    rng = random.Random(seed)
+    lines = ["Soccer", "Highlights"]
+    league = None
+    for n, match in enumerate(matches):
+        if layout == 'betika':
+            name = match['league'] if '•' in match['league'] else f"International • {match['league']}"
+            lines += [name, f"{match['date']}, {match['kickoff']}", match['home'], match['away'], f"+{rng.randint(20, 250)}"]
+        else:
+            if match['league'] != league:
+                league = match['league']
+                lines.append(league)
+            lines += [f"Sat {match['kickoff']}|{10000 + n}", match['home'], match['away']]
+        odds = match.get('odds') or {}
+        lines += [f"{odds.get(outcome, 1.5):.2f}" for outcome in ('home', 'draw', 'away')]
+        if rng.random() < banner_rate:
+            lines.append("GET 50% BONUS ON YOUR FIRST DEPOSIT")
+    return '\n'.join(lines)
+
+
+# Quick test
+if __name__ == "__main__":
+    workload = generate_fixtures(1000, sources=6)
+    for source, matches in workload.items():
+        print(f"📊 {source:<12} {len(matches):>6} listings, e.g. {matches[0]['home']} vs {matches[0]['away']} @ {matches[0]['kickoff']}")